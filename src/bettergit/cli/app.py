@@ -0,0 +1,173 @@
+﻿from __future__ import annotations
+
+import importlib
+import textwrap
+
+import typer
+from typer.core import TyperGroup
+
+from bettergit import __version__
+from bettergit.cli.manifest import COMMANDS
+
+
+HELP_TEXT = textwrap.dedent(
+    """
+    +======================================================================+
+    | BetterGit CLI (bg)                                                   |
+    +======================================================================+
+
+    Usage
+      bg [GLOBAL OPTIONS] COMMAND [ARGS...]
+
+    Global Options
+      -h, --help            Show this message and exit.
+      -V, --version         Print the installed BetterGit version and exit.
+      -c, --config PATH     Override the config file for commands that accept it.
+
+    ----------------------------------------------------------------------
+    Workflow
+      1) Stage changes        -> bg add [PATHS...]
+      2) Craft a message      -> bg suggest (interactive) | bg commit
+      3) Publish your work    -> bg push (current) | bg push-to <branch>
+
+    ----------------------------------------------------------------------
+    Staging & Commits
+      bg add            Stage everything (no args) or selected paths.
+      bg suggest        Interactive commit assistant.
+      bg commit         Fire-and-forget Conventional Commit generator.
+      bg llm-stats      Model latency/throughput percentiles from local metrics.
+
+    ----------------------------------------------------------------------
+    Branch Management
+      bg branch         Grouped, color-coded view for current, standalone, derived, 
+                          and remote branches (add --all/-a for remotes).
+      bg branch-info    Ahead/behind stats, tracking target, last commit snapshot.
+      bg switch         Checkout another branch.
+      bg create-branch  Start from HEAD by default; can switch automatically.
+      bg delete-branch  Drop local branch, optionally clean remote copy.
+      bg prune          Delete merged/gone branches in one go (-n to preview).
+
+    ----------------------------------------------------------------------
+    Speed
+      bg daemon         Keep a warm process; run `bgc COMMAND` to use it
+                          (-d to detach, --status, --stop).
+
+    ----------------------------------------------------------------------
+    Sync & Sharing
+      bg push           Push current or specific branch.
+      bg push-to        Push any branch without switching.
+
+    ----------------------------------------------------------------------
+    Examples
+      bg add src/bettergit/core/gitio.py
+      bg suggest --llm
+      bg create-branch feature/payments --from main
+      bg delete-branch feature/payments --remote-delete
+      bg prune --base main --remote-delete --dry-run
+      bg delete-remote-tag 'v1.*' --atomic
+      bg push --branch feature/payments --remote origin
+      bg push-to release/v1.0 --remote upstream
+
+    ----------------------------------------------------------------------
+    Pro Tips
+      * Most commands honor --config/-c for per-run overrides.
+      * Force flags map directly to git; use them carefully.
+      * BetterGit surfaces git's stderr verbatim, so errors stay familiar.
+      * Run `bg COMMAND --help` for command-specific switches.
+
+    +======================================================================+
+    """
+)
+
+
+def _short_help(text: str, limit: int = 45) -> str:
+    """Shorten *text* to its first sentence and *limit* characters, like Click's listing."""
+
+    words: list[str] = []
+    for word in text.split():
+        if len(" ".join([*words, word])) > limit:
+            while words and len(" ".join(words)) + 3 > limit:
+                words.pop()
+            return " ".join(words) + "..."
+        words.append(word)
+        if word.endswith("."):
+            break
+    return " ".join(words)
+
+
+class BetterGitGroup(TyperGroup):
+    """Custom Typer group that prints a structured help banner.
+
+    Commands are listed from :data:`~bettergit.cli.manifest.COMMANDS` and their
+    modules are imported only when a command is actually looked up, so
+    `bg --help` or `bg switch` never pay for the LLM stack.
+    """
+
+    def list_commands(self, ctx) -> list[str]:  # type: ignore[override]
+        return list(dict.fromkeys([*COMMANDS, *super().list_commands(ctx)]))
+
+    def get_command(self, ctx, name: str):  # type: ignore[override]
+        command = super().get_command(ctx, name)
+        if command is None and name in COMMANDS:
+            self._load(COMMANDS[name][0])
+            command = super().get_command(ctx, name)
+        return command
+
+    def _load(self, module_name: str) -> None:
+        module = importlib.import_module(f"bettergit.cli.commands.{module_name}")
+        holder = typer.Typer()
+        module.register(holder)
+        for name, command in typer.main.get_group(holder).commands.items():
+            self.add_command(command, name)
+
+    def format_help(self, ctx, formatter) -> None:  # type: ignore[override]
+        formatter.write(HELP_TEXT)
+        formatter.write("\n\nCommands\n")
+        commands_list: list[tuple[str, str]] = []
+        for name in self.list_commands(ctx):
+            if name in COMMANDS:
+                help_str = _short_help(COMMANDS[name][1])
+            else:
+                command = self.get_command(ctx, name)
+                if command is None:
+                    continue
+                help_str = command.get_short_help_str()
+            commands_list.append((name, help_str))
+        if commands_list:
+            width = max(len(name) for name, _ in commands_list)
+            for name, help_str in commands_list:
+                formatter.write(f"  {name.ljust(width)}  {help_str}\n")
+        else:
+            formatter.write("  (no commands registered)\n")
+        formatter.write("\nOptions\n")
+        formatter.write("  -h, --help      Show this message and exit.\n")
+        formatter.write("  -V, --version   Show the BetterGit version and exit.\n")
+
+
+app = typer.Typer(
+    add_completion=False,
+    cls=BetterGitGroup,
+    context_settings={"help_option_names": ["-h", "--help"], "max_content_width": 110},
+)
+
+
+@app.callback(invoke_without_command=True)
+def main(
+        ctx: typer.Context,
+        version: bool = typer.Option(
+            False,
+            "--version",
+            "-V",
+            help="Show the BetterGit version and exit.",
+            is_eager=True,
+        ),
+) -> None:
+    """Top-level callback that powers global flags like --version."""
+
+    if version:
+        typer.echo(f"BetterGit {__version__}")
+        raise typer.Exit()
+
+    if ctx.invoked_subcommand is None and not ctx.resilient_parsing:
+        typer.echo(ctx.get_help())
+        raise typer.Exit()
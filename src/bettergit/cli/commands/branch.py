@@ -3,7 +3,7 @@
 import typer
 
 from bettergit.cli.utils import resolve_config, show_error, show_success
-from bettergit.core import gitio, branchmeta
+from bettergit.core import gitio, branchmeta, lineage
 from bettergit.core.gitio import GitError
 
 
@@ -29,6 +29,9 @@ def register(app: typer.Typer) -> None:
     @app.command("branch", help="Show a grouped, color-coded list of branches.")
     def branch(
         all_: bool = typer.Option(False, "--all", "-a", help="Include remote branches."),
+        infer: bool = typer.Option(
+            False, "--infer/--no-infer", help="Infer parents of branches not created with `bg create-branch --from`."
+        ),
         config_path: str | None = typer.Option(None, "--config", "-c", help="Path to a configuration file."),
     ) -> None:
         resolve_config(config_path)
@@ -41,6 +44,12 @@ def register(app: typer.Typer) -> None:
 
         show_success("branch", "list")
         origins = branchmeta.load_all()
+        inferred: dict[str, str] = {}
+        if infer and any(name not in origins and not name.startswith("remotes/") for name in items):
+            try:
+                inferred = {name: item.parent for name, item in lineage.infer_parents().items() if name not in origins}
+            except GitError:
+                inferred = {}
 
         current_lines: list[str] = []
         standalone_lines: list[str] = []
@@ -51,7 +60,7 @@ def register(app: typer.Typer) -> None:
 
         for name in items:
             prefix = "*" if name == current else " "
-            display = _style_branch(name, current, origins)
+            display = _style_branch(name, current, {**inferred, **origins})
 
             if name == current:
                 prefix = typer.style(prefix, fg=typer.colors.BRIGHT_GREEN)
@@ -74,6 +83,11 @@ def register(app: typer.Typer) -> None:
                 else:
                     parent_note = ""
                 derived_lines.append(f"{prefix} {display}{parent_note}")
+            elif name in inferred:
+                parent = inferred[name]
+                derived_parents.add(parent)
+                parent_note = " " + typer.style(f"(from {parent}, inferred)", fg=typer.colors.BRIGHT_BLACK)
+                derived_lines.append(f"{prefix} {display}{parent_note}")
             else:
                 standalone_lines.append(f"{prefix} {display}")
 
@@ -4,7 +4,20 @@ import typer
 
 from bettergit.cli.utils import resolve_config, show_error, show_success
 from bettergit.core import gitio
-from bettergit.core.gitio import GitError
+from bettergit.core.gitio import BranchInfo, GitError
+
+
+def _render_all(infos: list[BranchInfo]) -> None:
+    width = max(len(info.name) for info in infos)
+    for info in infos:
+        if info.upstream_gone:
+            tracking = "gone"
+        elif info.tracking:
+            tracking = f"{info.tracking} +{info.ahead}/-{info.behind}"
+        else:
+            tracking = "-"
+        sha = (info.last_commit_sha or "-")[:12]
+        typer.echo(f"{info.name.ljust(width)} | {sha.ljust(12)} | {tracking} | {info.last_commit_title or '-'}")
 
 
 def register(app: typer.Typer) -> None:
@@ -13,9 +26,27 @@ def register(app: typer.Typer) -> None:
     @app.command("branch-info", help="Show concise information about a branch.")
     def branch_info(
         branch: str | None = typer.Option(None, "--branch", "-b", help="Branch name (defaults to current)."),
+        all_: bool = typer.Option(False, "--all", "-a", help="Show a one-line summary for every local branch."),
+        patterns: list[str] = typer.Option(
+            [],
+            "--pattern",
+            "-p",
+            help="Limit --all to branches matching this for-each-ref pattern (repeatable).",
+        ),
         config_path: str | None = typer.Option(None, "--config", "-c", help="Path to a configuration file."),
     ) -> None:
         resolve_config(config_path)
+        if all_ or patterns:
+            try:
+                infos = gitio.branch_infos(patterns)
+            except GitError as exc:
+                show_error("branch-info", "all", str(exc))
+                raise typer.Exit(code=1)
+            show_success("branch-info", "all", f"{len(infos)} branches")
+            if infos:
+                _render_all(infos)
+            return
+
         try:
             info = gitio.branch_info(branch)
         except GitError as exc:
@@ -28,7 +59,7 @@ def register(app: typer.Typer) -> None:
         def render(label: str, value: str | None) -> None:
             typer.echo(f"{label.rjust(10)} | {value or '-'}")
 
-        render("tracking", info.tracking)
+        render("tracking", "gone" if info.upstream_gone else info.tracking)
         render("ahead", str(info.ahead))
         render("behind", str(info.behind))
         if info.last_commit_sha:
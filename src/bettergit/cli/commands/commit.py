@@ -6,6 +6,7 @@ import typer
 
 from bettergit.cli.utils import (
     ensure_staged_changes_or_exit,
+    read_staged_diff,
     resolve_config,
     show_error,
     show_success,
@@ -13,6 +14,8 @@ from bettergit.cli.utils import (
 from bettergit.core import classify, gitio, template
 from bettergit.core.gitio import GitError
 from bettergit.llm import generate_commit as llm_generate
+from bettergit.llm import warm_up as llm_warm_up
+from bettergit.llm.pipeline import circuit_breaker
 
 
 def register(app: typer.Typer) -> None:
@@ -43,20 +46,26 @@ def register(app: typer.Typer) -> None:
     ) -> None:
         cfg = resolve_config(config_path)
         use_llm = llm_override if llm_override is not None else cfg.llm.enabled
-
-        diff = ensure_staged_changes_or_exit()
-
         manual_message = message if message is not None else message_arg
+        # One breaker for warm-up and generation, so the server is probed once.
+        breaker = circuit_breaker(cfg) if use_llm and manual_message is None else None
+        if breaker is not None:
+            # Load the model while the staged changes are being inspected.
+            llm_warm_up(cfg, breaker)
+
+        stats = ensure_staged_changes_or_exit()
 
         if manual_message is not None:
             final_message = manual_message if manual_message.endswith("\n") else f"{manual_message}\n"
         else:
-            files = gitio.get_changed_files()
-            commit_type, scope = classify.detect_type_scope(diff, files, cfg)
-            added, removed = template.summarize_diff(diff)
+            files = stats.paths
+            commit_type, scope = classify.detect_type_scope(stats, files, cfg)
+            added, removed = template.summarize_diff(stats)
 
             if use_llm:
-                result = llm_generate(diff, files, commit_type, scope, added, removed, cfg)
+                result = llm_generate(
+                    read_staged_diff, files, commit_type, scope, added, removed, cfg, breaker=breaker
+                )
                 final_message = template.render_commit(
                     result["type"],
                     result.get("scope"),
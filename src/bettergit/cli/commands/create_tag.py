@@ -5,7 +5,7 @@ from typing import Optional
 import typer
 
 from bettergit.cli.utils import resolve_config, show_error, show_success, style_prompt
-from bettergit.core import gitio
+from bettergit.core import gitio, remotes
 from bettergit.core.gitio import GitError
 
 def register(app: typer.Typer) -> None:
@@ -30,8 +30,10 @@ def register(app: typer.Typer) -> None:
             if should_push:
                 try:
                     gitio.push_tag(name, remote)
+                    remotes.record_push(remote, [f"refs/tags/{name}"])
                     show_success("push-tag", f"{name}/{remote}", remote)
                 except GitError as exc:
+                    remotes.invalidate(remote)
                     show_error("push-tag", f"{name}/{remote}", str(exc))
                     raise typer.Exit(code=1)
 
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import time
+
+import typer
+
+from bettergit.cli import thin
+from bettergit.cli.utils import show_error, show_success
+
+
+def register(app: typer.Typer) -> None:
+    """Register the `bg daemon` command."""
+
+    @app.command("daemon", help="Keep a warm BetterGit process that the `bgc` client forwards commands to.")
+    def daemon(
+        detach: bool = typer.Option(False, "--detach", "-d", help="Run in the background and return immediately."),
+        stop: bool = typer.Option(False, "--stop", help="Stop the running daemon."),
+        status: bool = typer.Option(False, "--status", help="Show whether a daemon is running."),
+        idle_timeout: float = typer.Option(
+            1800.0, "--idle-timeout", help="Exit after this many idle seconds (0 = never)."
+        ),
+    ) -> None:
+        path = thin.socket_path()
+        running = thin.request({"control": "ping"}, path)
+
+        if status:
+            if running is None:
+                show_error("daemon", str(path), "not running")
+                raise typer.Exit(code=1)
+            uptime = time.time() - float(running.get("started", time.time()))
+            note = f"pid {running.get('pid')}, v{running.get('version')}, {running.get('served')} commands, up {uptime:.0f}s"
+            show_success("daemon", str(path), note)
+            return
+
+        if stop:
+            if running is None or thin.request({"control": "stop"}, path) is None:
+                show_error("daemon", str(path), "not running")
+                raise typer.Exit(code=1)
+            show_success("daemon", str(path), f"stopped pid {running.get('pid')}")
+            return
+
+        if running is not None:
+            show_error("daemon", str(path), f"already running (pid {running.get('pid')})")
+            raise typer.Exit(code=1)
+
+        from bettergit.cli.daemon import DaemonRunning, serve, spawn
+
+        if detach:
+            try:
+                pid = spawn(path, idle_timeout)
+            except (OSError, RuntimeError) as exc:
+                show_error("daemon", str(path), str(exc))
+                raise typer.Exit(code=1)
+            show_success("daemon", str(path), f"pid {pid}")
+            return
+
+        show_success("daemon", str(path), "listening, Ctrl-C to stop")
+        try:
+            served = serve(path, idle_timeout)
+        except (DaemonRunning, OSError) as exc:
+            show_error("daemon", str(path), str(exc))
+            raise typer.Exit(code=1)
+        except KeyboardInterrupt:
+            served = None
+        show_success("daemon", "stopped", None if served is None else f"{served} commands")
@@ -2,8 +2,8 @@
 
 import typer
 
-from bettergit.cli.utils import resolve_config, show_error, show_success, style_prompt
-from bettergit.core import gitio, branchmeta
+from bettergit.cli.utils import delete_remote_refs, resolve_config, show_error, show_success, style_prompt
+from bettergit.core import gitio, branchmeta, remotes
 from bettergit.core.gitio import GitError
 
 
@@ -20,9 +20,10 @@ def register(app: typer.Typer) -> None:
         remote: str = typer.Option("origin", "--remote", "-r", help="Remote name used for deletion."),
         no_prompt: bool = typer.Option(False, "--no-prompt", help="Skip the remote deletion prompt."),
         remote_delete: bool = typer.Option(False, "--remote-delete", help="Delete the remote branch without prompting."),
+        refresh: bool = typer.Option(False, "--refresh", help="Re-read the remote's branches instead of using the cached snapshot."),
         config_path: str | None = typer.Option(None, "--config", "-c", help="Path to a configuration file."),
     ) -> None:
-        resolve_config(config_path)
+        cfg = resolve_config(config_path)
         try:
             gitio.delete_branch(branch_name=branch, force=force)
         except GitError as exc:
@@ -43,10 +44,15 @@ def register(app: typer.Typer) -> None:
 
         if should_delete_remote:
             try:
-                if not gitio.remote_branch_exists(remote=remote, branch=branch):
+                if not remotes.branch_exists(branch, remote, max_age=cfg.remote_snapshot_ttl, refresh=refresh):
                     typer.secho(f"Remote branch {remote}/{branch} already absent; nothing to delete.", fg=typer.colors.YELLOW)
                 else:
-                    gitio.delete_remote_branch(remote=remote, branch=branch)
+                    try:
+                        gitio.delete_remote_branch(remote=remote, branch=branch)
+                    except GitError:
+                        remotes.invalidate(remote)
+                        raise
+                    remotes.record_updates(remote, {f"refs/heads/{branch}": None})
                     show_success("delete-branch", f"{remote}/{branch}", "remote")
             except GitError as exc:
                 show_error("delete-branch", f"{remote}/{branch}", str(exc))
@@ -56,19 +62,26 @@ def register(app: typer.Typer) -> None:
 
     @app.command(
         "delete-remote-branch",
-        help="Delete a remote branch.",
+        help="Delete remote branches by name or glob pattern.",
     )
     def delete_remote_branch_cmd(
-        branch: str = typer.Argument(..., help="Name of the branch to delete."),
+        branches: list[str] = typer.Argument(..., help="Branch names or glob patterns (e.g. 'feature/*')."),
         remote: str = typer.Option("origin", "--remote", "-r", help="Remote name used for deletion."),
+        atomic: bool = typer.Option(False, "--atomic", help="Delete each push's refs all or nothing (`git push --atomic`)."),
+        chunk_size: int | None = typer.Option(None, "--chunk-size", min=1, help="Refs per push (default 200)."),
+        refresh: bool = typer.Option(False, "--refresh", help="Re-read the remote's branches instead of using the cached snapshot."),
+        dry_run: bool = typer.Option(False, "--dry-run", "-n", help="Only show which branches would be deleted."),
         config_path: str | None = typer.Option(None, "--config", "-c", help="Path to a configuration file."),
     ) -> None:
-        resolve_config(config_path)
-        try:
-            gitio.delete_remote_branch(remote, branch)
-        except GitError as exc:
-            show_error("delete-remote-branch", branch, str(exc))
-            raise typer.Exit(code=1)
-        show_success("delete-remote-branch", branch)
-        
-        
\ No newline at end of file
+        cfg = resolve_config(config_path)
+        delete_remote_refs(
+            "delete-remote-branch",
+            "refs/heads/",
+            branches,
+            remote=remote,
+            cfg=cfg,
+            atomic=atomic,
+            chunk_size=chunk_size,
+            refresh=refresh,
+            dry_run=dry_run,
+        )
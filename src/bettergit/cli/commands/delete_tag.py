@@ -2,8 +2,8 @@ from __future__ import annotations
 
 import typer
 
-from bettergit.cli.utils import resolve_config, show_error, show_success, style_prompt
-from bettergit.core import gitio
+from bettergit.cli.utils import delete_remote_refs, resolve_config, show_error, show_success, style_prompt
+from bettergit.core import gitio, remotes
 from bettergit.core.gitio import GitError
 
 def register(app: typer.Typer) -> None:
@@ -13,45 +13,55 @@ def register(app: typer.Typer) -> None:
     def delete_tag_cmd(
         name: str,
         remote: str = typer.Option("origin", "--remote", "-r", help="Remote name used pushing tags."),
+        refresh: bool = typer.Option(False, "--refresh", help="Re-read the remote's tags instead of using the cached snapshot."),
         config_path: str | None = typer.Option(None, "--config", "-c", help="Path to a configuration file.")
     ):
-        resolve_config(config_path)
+        cfg = resolve_config(config_path)
         try:
             gitio.delete_tag(name)
-            target = gitio.find_tag(name, remote)
-
-            if target is not None:
-                try:
-                    prompt = style_prompt(f"Delete {name} from {remote} as well?")
-                    should_delete = typer.confirm(prompt, default=False)
-                    if should_delete:
-                        try:
-                            gitio.delete_remote_tag(name, remote)
-                            show_success("delete-remote-tag", name)
-                        except GitError as exc:
-                            show_error("delete-remote-tag", str(exc))
-                            raise typer.Exit(code=1)
-                except GitError as exc:
-                            show_error("delete-tag", str(exc))
-                            raise typer.Exit(code=1)
         except GitError as exc:
-            show_error("delete-tag", str(exc))
+            show_error("delete-tag", name, str(exc))
             raise typer.Exit(code=1)
         show_success("delete-tag", name)
 
-    @app.command("delete-remote-tag", help="Deletes the tag with remote by name.")
-    def delete_remote_tag_cmd(
-         name: str,
-         remote: str = typer.Option("origin", "--remote", "-r", help="Remote name used pushing tags."),
-         config_path: str | None = typer.Option(None, "--config", "-c", help="Path to a configuration file.")
-    ):
-        resolve_config(config_path)
-        target = gitio.find_tag(name, remote)
+        try:
+            target = remotes.find_tag(name, remote, max_age=cfg.remote_snapshot_ttl, refresh=refresh)
+        except GitError as exc:
+            show_error("delete-tag", f"{remote}/{name}", str(exc))
+            raise typer.Exit(code=1)
+        if target is None:
+            return
 
-        if target is not None:
+        prompt = style_prompt(f"Delete {name} from {remote} as well?")
+        if typer.confirm(prompt, default=False):
             try:
                 gitio.delete_remote_tag(name, remote)
             except GitError as exc:
-                show_error("delete-remote-tag", str(exc))
+                remotes.invalidate(remote)
+                show_error("delete-remote-tag", name, str(exc))
                 raise typer.Exit(code=1)
-            show_success("delete-remote-tag", name)
\ No newline at end of file
+            remotes.record_updates(remote, {f"refs/tags/{name}": None})
+            show_success("delete-remote-tag", name, remote)
+
+    @app.command("delete-remote-tag", help="Deletes tags on the remote by name or glob pattern.")
+    def delete_remote_tag_cmd(
+         names: list[str] = typer.Argument(..., help="Tag names or glob patterns (e.g. 'v1.*')."),
+         remote: str = typer.Option("origin", "--remote", "-r", help="Remote name used pushing tags."),
+         atomic: bool = typer.Option(False, "--atomic", help="Delete each push's refs all or nothing (`git push --atomic`)."),
+         chunk_size: int | None = typer.Option(None, "--chunk-size", min=1, help="Refs per push (default 200)."),
+         refresh: bool = typer.Option(False, "--refresh", help="Re-read the remote's tags instead of using the cached snapshot."),
+         dry_run: bool = typer.Option(False, "--dry-run", "-n", help="Only show which tags would be deleted."),
+         config_path: str | None = typer.Option(None, "--config", "-c", help="Path to a configuration file.")
+    ):
+        cfg = resolve_config(config_path)
+        delete_remote_refs(
+            "delete-remote-tag",
+            "refs/tags/",
+            names,
+            remote=remote,
+            cfg=cfg,
+            atomic=atomic,
+            chunk_size=chunk_size,
+            refresh=refresh,
+            dry_run=dry_run,
+        )
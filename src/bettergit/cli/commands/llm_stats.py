@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Optional
+
+import typer
+
+from bettergit.cli.utils import resolve_config, show_error, show_success
+from bettergit.core import gitio
+from bettergit.core.gitio import GitError
+from bettergit.llm.metrics import MetricsLog, RequestStats, percentile
+
+# Ollama reports a model load above this as a cold start.
+_COLD_LOAD_S = 1.0
+
+
+def _fmt(value: Optional[float], unit: str = "s") -> str:
+    if value is None:
+        return "-"
+    return f"{value:.2f}{unit}" if unit == "s" else f"{value:.0f}{unit}"
+
+
+def _row(model: str, records: list[RequestStats]) -> list[str]:
+    ok = [item for item in records if item.ok]
+    walls = [item.wall_s for item in ok]
+    ttfts = [item.ttft_s for item in ok if item.ttft_s is not None]
+    warm = [item for item in ok if item.load_s is None or item.load_s < _COLD_LOAD_S]
+    cold = [item.load_s for item in ok if item.load_s is not None and item.load_s >= _COLD_LOAD_S]
+    prompt_tps = [item.prompt_tps for item in warm if item.prompt_tps]
+    eval_tps = [item.eval_tps for item in warm if item.eval_tps]
+    contexts = sorted({item.num_ctx for item in records if item.num_ctx})
+    return [
+        model,
+        str(len(records)),
+        str(len(records) - len(ok)),
+        str(sum(item.retries for item in records)),
+        _fmt(percentile(walls, 50)),
+        _fmt(percentile(walls, 90)),
+        _fmt(percentile(walls, 99)),
+        _fmt(percentile(ttfts, 50)),
+        f"{len(cold)} ({_fmt(percentile(cold, 50))})" if cold else "0",
+        _fmt(percentile(prompt_tps, 50), " t/s"),  # type: ignore[arg-type]
+        _fmt(percentile(eval_tps, 50), " t/s"),  # type: ignore[arg-type]
+        "/".join(str(size) for size in contexts) or "-",
+    ]
+
+
+_HEADERS = ["model", "reqs", "err", "retry", "p50", "p90", "p99", "ttft p50", "cold loads", "prompt", "gen", "num_ctx"]
+
+
+def register(app: typer.Typer) -> None:
+    """Register the `bg llm-stats` command."""
+
+    @app.command("llm-stats", help="Show LLM latency and throughput percentiles by model.")
+    def llm_stats(
+        model: Optional[str] = typer.Option(None, "--model", "-m", help="Only show this model."),
+        last: int = typer.Option(0, "--last", "-n", help="Only use the most recent N requests (0 = all)."),
+        config_path: Optional[str] = typer.Option(None, "--config", "-c", help="Path to a configuration file."),
+    ) -> None:
+        cfg = resolve_config(config_path)
+        try:
+            log = MetricsLog(gitio.git_dir(), max_bytes=cfg.llm.metrics_max_bytes)
+        except GitError as exc:
+            show_error("llm-stats", message=str(exc))
+            raise typer.Exit(code=1)
+
+        records = [item for item in log if model is None or item.model == model]
+        if last > 0:
+            records = records[-last:]
+        show_success("llm-stats", model or "all models", f"{len(records)} requests")
+        if not records:
+            return
+
+        by_model: dict[str, list[RequestStats]] = defaultdict(list)
+        for item in records:
+            by_model[item.model].append(item)
+        rows = [_HEADERS] + [_row(name, items) for name, items in sorted(by_model.items())]
+        widths = [max(len(row[index]) for row in rows) for index in range(len(_HEADERS))]
+        for row in rows:
+            typer.echo(" | ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+        typer.echo("Latencies are wall-clock per successful request; throughput excludes cold loads.")
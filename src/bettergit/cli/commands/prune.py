@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import typer
+
+from bettergit.cli.utils import resolve_config, show_error, show_success, style_prompt
+from bettergit.core import gitio, branchmeta, remotes
+from bettergit.core.gitio import GitError
+
+# Long-lived branches that are never pruned, whatever they are merged into.
+_PROTECTED = ("main", "master", "trunk", "develop")
+
+
+def _render(rows: list[tuple[str, str]]) -> None:
+    width = max(len(name) for name, _ in rows)
+    for name, reason in rows:
+        typer.echo(f"  {name.ljust(width)} | {reason}")
+
+
+def register(app: typer.Typer) -> None:
+    """Register the `bg prune` command."""
+
+    @app.command("prune", help="Delete branches that are merged or whose upstream is gone.")
+    def prune_cmd(
+        base: str | None = typer.Option(None, "--base", "-b", help="Branch merged branches are checked against (defaults to current)."),
+        gone: bool = typer.Option(True, "--gone/--no-gone", help="Also prune branches whose upstream was deleted."),
+        remote: str = typer.Option("origin", "--remote", "-r", help="Remote name used for deletion."),
+        remote_delete: bool = typer.Option(False, "--remote-delete", help="Also delete merged branches on the remote."),
+        force: bool = typer.Option(False, "--force", "-F", help="Delete local branches even if not fully merged."),
+        dry_run: bool = typer.Option(False, "--dry-run", "-n", help="Only show what would be deleted."),
+        yes: bool = typer.Option(False, "--yes", "-y", help="Skip the confirmation prompt."),
+        config_path: str | None = typer.Option(None, "--config", "-c", help="Path to a configuration file."),
+    ) -> None:
+        resolve_config(config_path)
+        remote_prefix = f"refs/remotes/{remote}/"
+        try:
+            current = gitio.current_branch()
+            base_name = base or current
+            infos = gitio.branch_infos()
+            merged = gitio.merged_refs(base_name, ["refs/heads", *([remote_prefix] if remote_delete else [])])
+        except GitError as exc:
+            show_error("prune", base or "(current)", str(exc))
+            raise typer.Exit(code=1)
+
+        protected = {current, base_name, base_name.removeprefix(f"{remote}/"), *_PROTECTED}
+        local_rows: list[tuple[str, str]] = []
+        for info in infos:
+            if info.name in protected:
+                continue
+            reasons = []
+            if f"refs/heads/{info.name}" in merged:
+                reasons.append(f"merged into {base_name}")
+            if gone and info.upstream_gone:
+                reasons.append("upstream gone")
+            if reasons:
+                local_rows.append((info.name, ", ".join(reasons)))
+        remote_names = sorted(
+            name
+            for name in (ref[len(remote_prefix):] for ref in merged if ref.startswith(remote_prefix))
+            if name != "HEAD" and name not in protected
+        )
+
+        if not local_rows and not remote_names:
+            show_success("prune", base_name, "nothing to prune")
+            return
+        if local_rows:
+            typer.echo(f"Local branches ({len(local_rows)})")
+            _render(local_rows)
+        if remote_names:
+            typer.echo(f"Remote branches on {remote} ({len(remote_names)})")
+            _render([(name, f"merged into {base_name}") for name in remote_names])
+        if dry_run:
+            typer.secho("Dry run: nothing deleted.", fg=typer.colors.YELLOW)
+            return
+        if not yes and not typer.confirm(style_prompt("Delete these branches?"), default=False):
+            typer.secho("Nothing deleted.", fg=typer.colors.YELLOW)
+            return
+
+        failed = False
+        deleted, kept = gitio.delete_branches([name for name, _ in local_rows], force=force)
+        branchmeta.forget(deleted)
+        if deleted:
+            show_success("prune", ", ".join(deleted), "local, force" if force else "local")
+        for name, message in kept.items():
+            failed = True
+            typer.secho(f"Kept {name}: {message}", fg=typer.colors.YELLOW)
+
+        if remote_names:
+            results = gitio.delete_remote_branches(remote, remote_names)
+            remotes.record_deletions(remote, results)
+            removed = [result.ref[len("refs/heads/"):] for result in results if result.ok]
+            if removed:
+                show_success("prune", ", ".join(f"{remote}/{name}" for name in removed), "remote")
+            for result in results:
+                if not result.ok:
+                    failed = True
+                    show_error("prune", f"{remote}/{result.ref[len('refs/heads/'):]}", result.summary)
+        if failed:
+            raise typer.Exit(code=1)
@@ -3,7 +3,7 @@ from __future__ import annotations
 import typer
 
 from bettergit.cli.utils import resolve_config, show_error, show_success
-from bettergit.core import gitio
+from bettergit.core import gitio, remotes
 from bettergit.core.gitio import GitError
 
 
@@ -29,8 +29,10 @@ def register(app: typer.Typer) -> None:
         try:
             upstream_set = gitio.push(remote=remote, branch=branch, set_upstream=not no_set_upstream)
         except GitError as exc:
+            remotes.invalidate(remote)
             show_error("push", f"{remote}/{branch_name}", str(exc))
             raise typer.Exit(code=1)
+        remotes.record_push(remote, [f"refs/heads/{branch_name}"])
 
         note = "upstream set" if upstream_set else None
         show_success("push", f"{remote}/{branch_name}", note)
@@ -46,8 +48,10 @@ def register(app: typer.Typer) -> None:
         try:
             upstream_set = gitio.push(remote=remote, branch=branch, set_upstream=not no_set_upstream)
         except GitError as exc:
+            remotes.invalidate(remote)
             show_error("push-to", f"{remote}/{branch}", str(exc))
             raise typer.Exit(code=1)
+        remotes.record_push(remote, [f"refs/heads/{branch}"])
 
         note = "upstream set" if upstream_set else None
         show_success("push-to", f"{remote}/{branch}", note)
@@ -1,21 +1,28 @@
 from __future__ import annotations
 
 import shutil
-from typing import Optional
+import threading
+from typing import Callable, Optional
 
 import typer
 
 from bettergit.cli.utils import (
+    BoxStream,
     echo_boxed,
     ensure_staged_changes_or_exit,
+    read_staged_diff,
     resolve_config,
     show_error,
     show_success,
     style_prompt,
 )
 from bettergit.core import classify, gitio, template
+from bettergit.core.diffparse import Diff
 from bettergit.core.gitio import GitError
-from bettergit.llm import generate_commit as llm_generate
+from bettergit.llm import generate_candidates as llm_candidates
+from bettergit.llm import warm_up as llm_warm_up
+from bettergit.llm.pipeline import LLMCommit, SharedPrompt, circuit_breaker, speculative_client
+from bettergit.llm.prefetch import Prefetcher
 
 
 def register(app: typer.Typer) -> None:
@@ -32,68 +39,165 @@ def register(app: typer.Typer) -> None:
     ) -> None:
         cfg = resolve_config(config_path)
         use_llm = llm_override if llm_override is not None else cfg.llm.enabled
-
-        diff = ensure_staged_changes_or_exit()
-        files = gitio.get_changed_files()
-        commit_type, scope = classify.detect_type_scope(diff, files, cfg)
-
-        def build_message() -> str:
-            added, removed = template.summarize_diff(diff)
+        # One breaker for warm-up and every batch, so the server is probed once.
+        breaker = circuit_breaker(cfg) if use_llm else None
+        if breaker is not None:
+            # Load the model while the staged changes are being inspected.
+            llm_warm_up(cfg, breaker)
+
+        stats = ensure_staged_changes_or_exit()
+        files = stats.paths
+        commit_type, scope = classify.detect_type_scope(stats, files, cfg)
+        added, removed = template.summarize_diff(stats)
+        diff: Diff | None = None
+        diff_lock = threading.Lock()
+        # Compacted (or map-reduced) once; every regenerate reuses it.
+        shared_prompt = SharedPrompt()
+
+        def staged_diff() -> Diff:
+            nonlocal diff
+            with diff_lock:
+                if diff is None:
+                    diff = read_staged_diff()
+                return diff
+
+        def render(result: LLMCommit) -> str:
+            return template.render_commit(
+                result["type"],
+                result.get("scope"),
+                result.get("summary", ""),
+                result.get("body"),
+                cfg,
+            )
+
+        def build_messages(use_cache: bool = True) -> list[str]:
             if use_llm:
-                result = llm_generate(diff, files, commit_type, scope, added, removed, cfg)
-                return template.render_commit(
-                    result["type"],
-                    result.get("scope"),
-                    result.get("summary", ""),
-                    result.get("body"),
-                    cfg,
-                )
-            summary = template.build_summary(commit_type, scope, added, removed, cfg)
-            return template.render_commit(commit_type, scope, summary, body=None, cfg=cfg)
-
-        message = build_message()
-        needs_redraw = True
-        previous_width = shutil.get_terminal_size((80, 20)).columns
-
-        while True:
-            width = shutil.get_terminal_size((80, 20)).columns
-            if width != previous_width:
-                needs_redraw = True
-                previous_width = width
-            if needs_redraw:
-                echo_boxed(message)
-                needs_redraw = False
-
-            prompt = style_prompt("Action? [c]ommit / [e]dit / [r]egen / [q]uit")
-            choice = typer.prompt(prompt).strip().lower()
-
-            if choice in {"e", "edit"}:
-                typer.secho("Opening editor...", fg=typer.colors.BLUE)
-                edited = typer.edit(message)
-                if edited is None:
-                    typer.secho("Edit cancelled.", fg=typer.colors.YELLOW)
-                    continue
-                message = edited.rstrip()
-                needs_redraw = True
-                continue
+                preview: BoxStream | None = None
 
-            if choice in {"r", "regen", "regenerate"}:
-                typer.secho("Regenerating", fg=typer.colors.BLUE)
-                message = build_message()
-                needs_redraw = True
-                continue
+                def show_summary(text: str) -> None:
+                    nonlocal preview
+                    if preview is None:
+                        preview = BoxStream()
+                    preview.write(text)
 
-            if choice in {"c", "commit", "y", "yes"}:
                 try:
-                    gitio.commit(message)
-                except GitError as exc:
-                    show_error("commit", message=str(exc))
-                    raise typer.Exit(code=1)
-                show_success("commit", gitio.current_branch())
-                return
-
-            if choice in {"q", "quit", "n", "no", "cancel", "exit"}:
-                typer.secho("Aborted.", fg=typer.colors.YELLOW)
-                return
-
-            typer.secho("Please choose: c for commit, e for edit, r for regenerate, q for quit.", fg=typer.colors.YELLOW)
+                    results = llm_candidates(
+                        staged_diff,
+                        files,
+                        commit_type,
+                        scope,
+                        added,
+                        removed,
+                        cfg,
+                        use_cache=use_cache,
+                        on_summary=show_summary,
+                        prompt=shared_prompt,
+                        breaker=breaker,
+                    )
+                finally:
+                    if preview is not None:
+                        preview.close()
+                        preview.erase()
+                return [render(result) for result in results]
+            summary = template.build_summary(commit_type, scope, added, removed, cfg)
+            return [template.render_commit(commit_type, scope, summary, body=None, cfg=cfg)]
+
+        messages = build_messages()
+
+        # While the user reads the first batch, draft the next one for [r]egen.
+        prefetcher: Prefetcher[list[LLMCommit]] | None = None
+        if use_llm and cfg.llm.prefetch_depth > 0:
+            # Its own connections, so quitting aborts the drafts still generating.
+            drafts = speculative_client(cfg)
+            prefetcher = Prefetcher(
+                lambda: llm_candidates(
+                    staged_diff,
+                    files,
+                    commit_type,
+                    scope,
+                    added,
+                    removed,
+                    cfg,
+                    use_cache=False,
+                    store=False,
+                    prompt=shared_prompt,
+                    client=drafts,
+                    breaker=breaker,
+                ),
+                depth=cfg.llm.prefetch_depth,
+                on_cancel=drafts.close,
+            )
+            prefetcher.start()
+
+        def next_batch() -> list[str]:
+            if prefetcher is None:
+                return build_messages(use_cache=False)
+            return [render(result) for result in prefetcher.take()]
+
+        try:
+            _interact(messages, next_batch)
+        finally:
+            if prefetcher is not None:
+                prefetcher.cancel()
+
+
+def _interact(messages: list[str], next_batch: Callable[[], list[str]]) -> None:
+    index = 0
+    needs_redraw = True
+    previous_width = shutil.get_terminal_size((80, 20)).columns
+
+    while True:
+        message = messages[index]
+        width = shutil.get_terminal_size((80, 20)).columns
+        if width != previous_width:
+            needs_redraw = True
+            previous_width = width
+        if needs_redraw:
+            if len(messages) > 1:
+                typer.secho(f"Candidate {index + 1}/{len(messages)}", fg=typer.colors.BLUE)
+            echo_boxed(message)
+            needs_redraw = False
+
+        cycle = " / [o]ther" if len(messages) > 1 else ""
+        prompt = style_prompt(f"Action? [c]ommit / [e]dit{cycle} / [r]egen / [q]uit")
+        choice = typer.prompt(prompt).strip().lower()
+
+        # "n" always means "no"; cycling has its own key so it cannot abort by accident.
+        if choice in {"o", "other", ">"} and len(messages) > 1:
+            index = (index + 1) % len(messages)
+            needs_redraw = True
+            continue
+
+        if choice in {"e", "edit"}:
+            typer.secho("Opening editor...", fg=typer.colors.BLUE)
+            edited = typer.edit(message)
+            if edited is None:
+                typer.secho("Edit cancelled.", fg=typer.colors.YELLOW)
+                continue
+            messages[index] = edited.rstrip()
+            needs_redraw = True
+            continue
+
+        if choice in {"r", "regen", "regenerate"}:
+            typer.secho("Regenerating", fg=typer.colors.BLUE)
+            messages, index = next_batch(), 0
+            needs_redraw = True
+            continue
+
+        if choice in {"c", "commit", "y", "yes"}:
+            try:
+                gitio.commit(message)
+            except GitError as exc:
+                show_error("commit", message=str(exc))
+                raise typer.Exit(code=1)
+            show_success("commit", gitio.current_branch())
+            return
+
+        if choice in {"q", "quit", "n", "no", "cancel", "exit"}:
+            typer.secho("Aborted.", fg=typer.colors.YELLOW)
+            return
+
+        hint = " o for other candidate," if len(messages) > 1 else ""
+        typer.secho(
+            f"Please choose: c for commit, e for edit,{hint} r for regenerate, q for quit.", fg=typer.colors.YELLOW
+        )
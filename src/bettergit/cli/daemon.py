@@ -0,0 +1,304 @@
+"""Resident `bg daemon` that runs commands for the `bgc` thin client.
+
+The daemon keeps the interpreter, every command module, the Typer command
+tree, the parsed refs/config of each repository (:mod:`bettergit.core.refs`,
+validated by `.git` mtimes) and the `git cat-file` helpers warm between
+requests. Commands run one at a time in the main thread with the client's
+argv, cwd, environment and stdio descriptors swapped in; a second client that
+arrives meanwhile is told to run the command itself. Threads a command leaves
+running must not rely on the cwd or environment, which belong to the next
+request once it returns (see `bettergit.llm.warm_up` and `Prefetcher.cancel`).
+The refs stores and `git cat-file` helpers are kept for the most recently used
+repositories only.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from bettergit import __version__
+from bettergit.cli import thin
+
+__all__ = ["DaemonRunning", "serve", "spawn"]
+
+# How long a connected client may take to send its request.
+_REQUEST_TIMEOUT_S = 5.0
+_PEERCRED = struct.Struct("3i")
+
+
+class DaemonRunning(RuntimeError):
+    """Raised when another daemon already answers on the socket."""
+
+
+def _same_user(conn: socket.socket) -> bool:
+    option = getattr(socket, "SO_PEERCRED", None)
+    if option is None:
+        return True  # the socket directory is private to the user
+    _, uid, _ = _PEERCRED.unpack(conn.getsockopt(socket.SOL_SOCKET, option, _PEERCRED.size))
+    return uid == os.getuid()
+
+
+def _listen(path: Path) -> socket.socket:
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if path.parent.stat().st_uid != os.getuid():
+        raise PermissionError(f"{path.parent} is owned by another user")
+    if path.exists() or path.is_symlink():
+        status = thin.request({"control": "ping"}, str(path))
+        if status is not None:
+            raise DaemonRunning(f"already running (pid {status.get('pid')})")
+        path.unlink()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o177)
+    try:
+        server.bind(str(path))
+    finally:
+        os.umask(umask)
+    server.listen(16)
+    return server
+
+
+def _preload() -> Any:
+    """Import every command and return the Click group built from the Typer app."""
+
+    import typer
+
+    from bettergit.cli.app import app
+    from bettergit.cli.manifest import COMMANDS
+
+    command = typer.main.get_command(app)
+    ctx = typer.Context(command)
+    for name in COMMANDS:
+        command.get_command(ctx, name)
+    return command
+
+
+class _Server:
+    def __init__(self, path: Path, idle_timeout: float) -> None:
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self.busy = threading.Lock()
+        self.pending: "queue.Queue[Optional[Tuple[socket.socket, Dict[str, Any]]]]" = queue.Queue()
+        self.interruptible = threading.Event()
+        self.state: Dict[str, Any] = {"pid": os.getpid(), "version": __version__, "started": time.time(), "served": 0}
+
+    # -- accept thread -----------------------------------------------------
+
+    def accept_loop(self, listener: socket.socket) -> None:
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return  # listener closed on shutdown
+            try:
+                if not self._greet(conn):
+                    conn.close()
+            except (OSError, ValueError):
+                conn.close()
+
+    def _greet(self, conn: socket.socket) -> bool:
+        """Answer control messages here; queue a command. Returns False to close *conn*."""
+
+        if not _same_user(conn):
+            return False
+        conn.settimeout(_REQUEST_TIMEOUT_S)
+        thin.send_message(conn, {"pid": self.state["pid"], "version": __version__})
+        message = thin.recv_message(conn)
+        if message is None:
+            return False
+        control = message.get("control")
+        if control == "ping":
+            thin.send_message(conn, {**self.state, "busy": self.busy.locked()})
+            return False
+        if control == "stop":
+            thin.send_message(conn, {"stopped": True})
+            self.pending.put(None)
+            return False
+        if not isinstance(message.get("argv"), list) or not self.busy.acquire(blocking=False):
+            thin.send_message(conn, {"fallback": "busy"})
+            return False
+        self.pending.put((conn, message))
+        return True
+
+    # -- main thread -------------------------------------------------------
+
+    def run(self, command: Any) -> None:
+        while True:
+            try:
+                item = self.pending.get(timeout=self.idle_timeout or None)
+            except queue.Empty:
+                if self.busy.locked():
+                    continue
+                return
+            if item is None:
+                return
+            conn, message = item
+            try:
+                with conn:
+                    self._serve(conn, message, command)
+            finally:
+                self.busy.release()
+
+    def _serve(self, conn: socket.socket, message: Dict[str, Any], command: Any) -> None:
+        try:
+            _, fds, _, _ = socket.recv_fds(conn, 1, 3)
+        except OSError:
+            return
+        if len(fds) != 3:
+            for fd in fds:
+                os.close(fd)
+            return
+        conn.settimeout(None)
+        try:
+            code = self._run(conn, message, fds, command)
+        finally:
+            for fd in fds:
+                os.close(fd)
+        self.state["served"] += 1
+        try:
+            thin.send_message(conn, {"exit": code})
+        except OSError:
+            pass
+
+    def _interrupt(self, signum: int, frame: Any) -> None:
+        if self.interruptible.is_set():
+            raise KeyboardInterrupt
+
+    def _watch(self, conn: socket.socket, done: threading.Event) -> None:
+        """Turn the client's Ctrl-C (or its disappearance) into SIGINT for the command."""
+
+        main_thread = threading.main_thread().ident
+        assert main_thread is not None
+        while not done.is_set():
+            try:
+                message = thin.recv_message(conn)
+            except (OSError, ValueError):
+                message = None
+            if done.is_set():
+                return
+            signal.pthread_kill(main_thread, signal.SIGINT)
+            if message is None:
+                return
+
+    def _run(self, conn: socket.socket, message: Dict[str, Any], fds: List[int], command: Any) -> int:
+        argv = [str(arg) for arg in message["argv"]]
+        saved_fds = [os.dup(fd) for fd in range(3)]
+        saved_cwd = os.getcwd()
+        saved_env = dict(os.environ)
+        saved_sys = (sys.stdin, sys.stdout, sys.stderr, sys.argv)
+        previous_handler = signal.signal(signal.SIGINT, self._interrupt)
+        done = threading.Event()
+        for stream in (sys.stdout, sys.stderr):
+            stream.flush()
+        try:
+            for target, fd in enumerate(fds):
+                os.dup2(fd, target)
+            sys.stdin = open(0, "r", encoding="utf-8", closefd=False)
+            sys.stdout = open(1, "w", encoding="utf-8", errors="replace", buffering=1, closefd=False)
+            sys.stderr = open(2, "w", encoding="utf-8", errors="replace", buffering=1, closefd=False)
+            sys.argv = ["bg", *argv]
+            os.environ.clear()
+            os.environ.update({str(key): str(value) for key, value in dict(message.get("env") or {}).items()})
+            try:
+                os.chdir(str(message.get("cwd") or "/"))
+            except OSError as exc:
+                sys.stderr.write(f"bg: {exc}\n")
+                return 1
+            threading.Thread(target=self._watch, args=(conn, done), daemon=True).start()
+            return self._invoke(command, argv)
+        finally:
+            done.set()
+            for stream in (sys.stdout, sys.stderr):
+                try:
+                    stream.flush()
+                except (OSError, ValueError):
+                    pass
+            sys.stdin, sys.stdout, sys.stderr, sys.argv = saved_sys
+            os.environ.clear()
+            os.environ.update(saved_env)
+            os.chdir(saved_cwd)
+            for target, fd in enumerate(saved_fds):
+                os.dup2(fd, target)
+                os.close(fd)
+            signal.signal(signal.SIGINT, previous_handler)
+
+    def _invoke(self, command: Any, argv: List[str]) -> int:
+        try:
+            self.interruptible.set()
+            try:
+                command.main(args=argv, prog_name="bg")
+            finally:
+                self.interruptible.clear()
+        except SystemExit as exc:
+            if exc.code is None or isinstance(exc.code, int):
+                return exc.code or 0
+            sys.stderr.write(f"{exc.code}\n")
+            return 1
+        except KeyboardInterrupt:
+            return 130
+        except Exception:
+            traceback.print_exc()
+            return 1
+        return 0
+
+
+def serve(path: Union[str, Path, None] = None, idle_timeout: float = 1800.0) -> int:
+    """Serve `bgc` requests on *path* until stopped or idle; return how many ran.
+
+    Must be called from the main thread (commands are interrupted with SIGINT).
+    *idle_timeout* is in seconds; 0 keeps the daemon running until stopped.
+    """
+
+    path = Path(path or thin.socket_path())
+    command = _preload()
+    listener = _listen(path)
+    server = _Server(path, idle_timeout)
+    threading.Thread(target=server.accept_loop, args=(listener,), daemon=True).start()
+    try:
+        server.run(command)
+    finally:
+        listener.close()
+        try:
+            path.unlink()
+        except OSError:
+            pass
+    return int(server.state["served"])
+
+
+def spawn(path: Union[str, Path, None] = None, idle_timeout: float = 1800.0, wait_s: float = 10.0) -> int:
+    """Start a detached daemon and return its pid once it answers."""
+
+    path = Path(path or thin.socket_path())
+    env = dict(os.environ, BETTERGIT_DAEMON_SOCKET=str(path))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "bettergit.cli.daemon", str(idle_timeout)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        cwd="/",
+        env=env,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + wait_s
+    while time.monotonic() < deadline:
+        status = thin.request({"control": "ping"}, str(path))
+        if status is not None:
+            return int(status["pid"])
+        if process.poll() is not None:
+            raise RuntimeError(f"daemon exited with status {process.returncode}")
+        time.sleep(0.05)
+    raise RuntimeError(f"daemon did not answer within {wait_s:g}s")
+
+
+if __name__ == "__main__":
+    serve(idle_timeout=float(sys.argv[1]) if len(sys.argv) > 1 else 1800.0)
@@ -0,0 +1,31 @@
+"""Static list of `bg` commands, so the CLI can start without importing them.
+
+Keep this in sync with the ``@app.command`` registrations in
+``bettergit.cli.commands``; ``tests/test_cli_startup.py`` checks it.
+"""
+
+from __future__ import annotations
+
+__all__ = ["COMMANDS"]
+
+# Command name -> (module in bettergit.cli.commands, help text), in listing order.
+COMMANDS: dict[str, tuple[str, str]] = {
+    "add": ("add", "Stage files for the next commit."),
+    "branch": ("branch", "Show a grouped, color-coded list of branches."),
+    "branch-info": ("branch_info", "Show concise information about a branch."),
+    "commit": ("commit", "Create a git commit with an auto-generated message (no confirmation)."),
+    "create-branch": ("create_branch", "Create a new branch, optionally switching to it."),
+    "create-tag": ("create_tag", "Create a new tag for your releases."),
+    "daemon": ("daemon", "Keep a warm BetterGit process that the `bgc` client forwards commands to."),
+    "delete-branch": ("delete_branch", "Delete a branch locally and optionally remove it from a remote."),
+    "delete-remote-branch": ("delete_branch", "Delete remote branches by name or glob pattern."),
+    "delete-tag": ("delete_tag", "Delete your tag by name (local deletion with remote deletion request)."),
+    "delete-remote-tag": ("delete_tag", "Deletes tags on the remote by name or glob pattern."),
+    "llm-stats": ("llm_stats", "Show LLM latency and throughput percentiles by model."),
+    "prune": ("prune", "Delete branches that are merged or whose upstream is gone."),
+    "push": ("push", "Push the current (or specified) branch. Sets upstream if needed."),
+    "push-to": ("push", "Push the specified branch to a remote without switching."),
+    "suggest": ("suggest", "Generate a commit message from staged diff and ask for confirmation."),
+    "switch": ("switch", "Switch to a given branch."),
+    "tag": ("tag", "Shows all tags."),
+}
@@ -0,0 +1,174 @@
+"""Thin `bgc` client: run a `bg` command inside a resident `bg daemon`.
+
+Only light standard-library modules are imported on the fast path (no
+typing or pathlib; annotations are never evaluated). The client forwards
+argv, the working directory, the environment and its stdin/stdout/stderr
+descriptors over a Unix domain socket and exits with the daemon's status; when
+no daemon answers (or it is busy, or another version) the command runs in this
+process instead.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+
+from bettergit import __version__
+
+__all__ = ["forward", "main", "recv_message", "request", "send_message", "socket_path"]
+
+_HEADER = struct.Struct("!I")
+_MAX_MESSAGE = 16 * 1024 * 1024
+# The daemon greets every connection from a dedicated thread, so this only
+# expires when it is wedged or the machine is overloaded.
+_CONNECT_TIMEOUT_S = 1.0
+
+
+def socket_path() -> str:
+    """Return the per-user socket path (``$BETTERGIT_DAEMON_SOCKET`` overrides it)."""
+
+    override = os.environ.get("BETTERGIT_DAEMON_SOCKET")
+    if override:
+        return override
+    uid = os.getuid()
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return os.path.join(runtime, f"bettergit-{uid}.sock")
+    return os.path.join(os.environ.get("TMPDIR") or "/tmp", f"bettergit-{uid}", "daemon.sock")
+
+
+def send_message(sock: socket.socket, data: dict[str, object]) -> None:
+    payload = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes | None:
+    chunks: list[bytes] = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock: socket.socket) -> dict[str, object] | None:
+    """Read one length-prefixed JSON object, or None when the peer hung up."""
+
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    (size,) = _HEADER.unpack(header)
+    if size > _MAX_MESSAGE:
+        raise ValueError(f"message too large ({size} bytes)")
+    payload = _recv_exact(sock, size)
+    if payload is None:
+        return None
+    data = json.loads(payload)
+    if not isinstance(data, dict):
+        raise ValueError("message is not a JSON object")
+    return data
+
+
+def _connect(path: str | None = None) -> tuple[socket.socket, dict[str, object]] | None:
+    """Connect to the daemon and return the socket with its greeting."""
+
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(_CONNECT_TIMEOUT_S)
+    try:
+        sock.connect(path or socket_path())
+        hello = recv_message(sock)
+    except (OSError, ValueError):
+        sock.close()
+        return None
+    if hello is None:
+        sock.close()
+        return None
+    return sock, hello
+
+
+def request(message: dict[str, object], path: str | None = None) -> dict[str, object] | None:
+    """Send a control *message* (``{"control": "ping" | "stop"}``) and return the reply."""
+
+    connection = _connect(path)
+    if connection is None:
+        return None
+    sock, _ = connection
+    with sock:
+        try:
+            send_message(sock, message)
+            return recv_message(sock)
+        except (OSError, ValueError):
+            return None
+
+
+def forward(argv: list[str], path: str | None = None) -> int | None:
+    """Run *argv* in the daemon and return its exit status, or None to run it locally."""
+
+    if os.environ.get("BETTERGIT_NO_DAEMON") or not hasattr(socket, "send_fds"):
+        return None
+    try:
+        cwd = os.getcwd()
+    except OSError:
+        return None
+    connection = _connect(path)
+    if connection is None:
+        return None
+    sock, hello = connection
+    with sock:
+        if hello.get("version") != __version__:
+            # A daemon left over from another install retires; the next
+            # `bg daemon` starts one with the current code.
+            try:
+                send_message(sock, {"control": "stop"})
+            except OSError:
+                pass
+            return None
+        try:
+            send_message(sock, {"argv": list(argv), "cwd": cwd, "env": dict(os.environ)})
+            socket.send_fds(sock, [b"\0"], [0, 1, 2])
+        except OSError:
+            return None
+
+        def interrupt(signum: int, frame: object) -> None:
+            try:
+                send_message(sock, {"signal": "SIGINT"})
+            except OSError:
+                pass
+
+        # Ctrl-C reaches this process only; pass it on to the running command.
+        previous = signal.signal(signal.SIGINT, interrupt)
+        sock.settimeout(None)
+        try:
+            reply = recv_message(sock)
+        except (OSError, ValueError):
+            reply = None
+        finally:
+            signal.signal(signal.SIGINT, previous)
+    if reply is not None and "fallback" in reply:
+        return None
+    if reply is None or "exit" not in reply:
+        sys.stderr.write("bg: lost connection to the daemon\n")
+        return 1
+    return int(reply["exit"])  # type: ignore[call-overload]
+
+
+def main() -> None:
+    code = forward(sys.argv[1:])
+    if code is None:
+        from bettergit.cli.main import run
+
+        run()
+        return
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
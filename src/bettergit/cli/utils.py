@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import shutil
+import sys
 import textwrap
 from typing import Optional
 
@@ -8,7 +9,7 @@ import typer
 
 from bettergit import config as config_pkg
 from bettergit.config import Config
-from bettergit.core import gitio
+from bettergit.core import classify, diffparse, gitio
 
 __all__ = [
     "format_success",
@@ -16,9 +17,12 @@ __all__ = [
     "show_success",
     "show_error",
     "ensure_staged_changes_or_exit",
+    "read_staged_diff",
     "echo_boxed",
+    "BoxStream",
     "style_prompt",
     "resolve_config",
+    "delete_remote_refs",
 ]
 
 _ARROW = "->"
@@ -50,16 +54,23 @@ def show_error(action: str, target: Optional[str] = None, message: Optional[str]
         typer.secho(message, fg=typer.colors.RED, err=True)
 
 
-def ensure_staged_changes_or_exit() -> str:
-    diff = gitio.get_staged_diff()
-    if not diff.strip():
+def ensure_staged_changes_or_exit() -> diffparse.Diff:
+    entries = gitio.get_staged_numstat()
+    if not entries:
         typer.secho(
             "[ERR] no staged changes. Run `bg add ...` and try again.",
             fg=typer.colors.RED,
             err=True,
         )
         raise typer.Exit(code=1)
-    return diff
+    keyword_paths = gitio.get_staged_paths_matching(classify.FIX_KEYWORDS)
+    return diffparse.from_numstat(entries, keyword_paths, keywords=classify.FIX_KEYWORDS)
+
+
+def read_staged_diff() -> diffparse.Diff:
+    """Stream and parse the full staged patch; only needed when a prompt is built."""
+
+    return diffparse.parse(gitio.iter_staged_diff(), keywords=classify.FIX_KEYWORDS)
 
 
 def _ascii_box_lines(message: str, padding: int, max_width: int) -> tuple[str, list[str], str]:
@@ -92,9 +103,134 @@ def echo_boxed(
     typer.secho(bottom, fg=typer.colors.BRIGHT_CYAN)
 
 
+class BoxStream:
+    """Draw text inside an `echo_boxed`-style frame while it is still arriving.
+
+    The frame uses the full available width because the final length is not
+    known up front. Words are wrapped as they complete.
+    """
+
+    def __init__(self, *, padding: int = 1, max_width: Optional[int] = None, hard_limit: int = 110) -> None:
+        columns = shutil.get_terminal_size((80, 20)).columns
+        width = max_width or (columns - 4)
+        self._inner = max(10, min(hard_limit, width))
+        self._padding = padding
+        self._column = 0
+        self._word = ""
+        self._lines_drawn = 0
+        self._open_line = False
+        self._border = "+" + "-" * (self._inner + padding * 2) + "+"
+        self._secho(self._border)
+
+    def _secho(self, text: str, nl: bool = True) -> None:
+        typer.secho(text, fg=typer.colors.BRIGHT_CYAN, nl=nl)
+        if nl:
+            self._lines_drawn += 1
+
+    def _emit(self, text: str) -> None:
+        if not self._open_line:
+            self._secho(f"|{' ' * self._padding}", nl=False)
+            self._open_line = True
+        self._secho(text, nl=False)
+        self._column += len(text)
+
+    def _end_line(self) -> None:
+        if not self._open_line:
+            self._emit("")
+        self._secho(" " * (self._inner - self._column + self._padding) + "|")
+        self._column = 0
+        self._open_line = False
+
+    def _flush_word(self) -> None:
+        word, self._word = self._word, ""
+        while word:
+            space = 1 if self._column else 0
+            if self._column + space + len(word) <= self._inner:
+                self._emit(" " * space + word)
+                return
+            if self._column:
+                self._end_line()
+                continue
+            self._emit(word[: self._inner])
+            word = word[self._inner :]
+            self._end_line()
+
+    def write(self, text: str) -> None:
+        for char in text:
+            if char in " \t":
+                self._flush_word()
+            elif char == "\n":
+                self._flush_word()
+                self._end_line()
+            else:
+                self._word += char
+
+    def close(self) -> None:
+        self._flush_word()
+        if self._open_line or self._lines_drawn == 1:
+            self._end_line()
+        self._secho(self._border)
+
+    def erase(self) -> None:
+        """Remove the frame from an interactive terminal (no-op otherwise)."""
+
+        if sys.stdout.isatty() and self._lines_drawn:
+            typer.echo(f"\x1b[{self._lines_drawn}F\x1b[J", nl=False)
+            self._lines_drawn = 0
+
+
 def style_prompt(text: str) -> str:
     return typer.style(text, fg=typer.colors.BRIGHT_YELLOW)
 
 
 def resolve_config(path: Optional[str]) -> Config:
     return config_pkg.load_config(path)
+
+
+def delete_remote_refs(
+    action: str,
+    prefix: str,
+    patterns: list[str],
+    *,
+    remote: str,
+    cfg: Config,
+    atomic: bool = False,
+    chunk_size: Optional[int] = None,
+    refresh: bool = False,
+    dry_run: bool = False,
+) -> None:
+    """Resolve *patterns* under *prefix* on *remote*, delete the matches in bulk and report each ref.
+
+    Shared by `bg delete-remote-branch` and `bg delete-remote-tag`; exits with
+    status 1 when a ref could not be deleted.
+    """
+
+    from bettergit.core import remotes
+
+    try:
+        snapshot = remotes.snapshot(remote, cfg.remote_snapshot_ttl, refresh)
+    except gitio.GitError as exc:
+        show_error(action, remote, str(exc))
+        raise typer.Exit(code=1)
+    refnames, unmatched = snapshot.match(prefix, patterns)
+    for pattern in unmatched:
+        typer.secho(f"{pattern} not found on {remote}; nothing to delete.", fg=typer.colors.YELLOW)
+    if not refnames:
+        return
+    if dry_run:
+        typer.echo(f"Would delete {len(refnames)} from {remote}:")
+        for refname in refnames:
+            typer.echo(f"  {refname[len(prefix):]}")
+        return
+
+    results = gitio.delete_remote_refs(remote, refnames, atomic=atomic, chunk_size=chunk_size or cfg.push_chunk_size)
+    remotes.record_deletions(remote, results)
+    width = max(len(result.ref) - len(prefix) for result in results)
+    for result in results:
+        line = f"  {result.ref[len(prefix):].ljust(width)} | {result.summary}"
+        typer.secho(line, fg=None if result.ok else typer.colors.RED)
+    failed = sum(not result.ok for result in results)
+    if failed:
+        show_error(action, remote, f"{failed} of {len(results)} refs not deleted")
+        raise typer.Exit(code=1)
+    show_success(action, remote, f"{len(results)} deleted")
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Optional, Tuple
 
 __all__ = ["LLMConfig", "Config", "load_config"]
 
@@ -13,13 +13,40 @@ class LLMConfig:
     model: str = "phi3.5:3.8b"
     temperature: float = 0.1
     max_tokens: int = 256
+    context_buckets: Tuple[int, ...] = (2048, 4096, 8192, 16384)
+    structured_output: bool = True
+    repair_attempts: int = 1
     ollama_host: str = "http://localhost:11434"
+    keep_alive: str = "30m"
     http_timeout: int = 180
+    connect_timeout: float = 2.0
+    http_retries: int = 2
+    retry_backoff: float = 0.5
+    probe_timeout: float = 0.5
+    probe_ttl: float = 30.0
+    breaker_threshold: int = 3
+    breaker_cooldown: float = 120.0
+    http_pool_size: int = 4
+    prompt_budget_tokens: int = 1200
+    mapreduce_threshold_tokens: int = 6000
+    mapreduce_workers: int = 4
+    prefetch_depth: int = 1
+    # Messages per generation; every regenerate (and prefetched draft) asks for this many again.
+    candidates: int = 1
+    candidate_temperature_step: float = 0.3
+    cache_enabled: bool = True
+    cache_max_entries: int = 128
+    metrics_enabled: bool = True
+    metrics_max_bytes: int = 1024 * 1024
 
 
 @dataclass
 class Config:
     scope_mode: str = "first_dir"
+    # Seconds a cached `git ls-remote` snapshot answers existence checks.
+    remote_snapshot_ttl: float = 300.0
+    # Refs per `git push --delete` when deleting remote branches or tags in bulk.
+    push_chunk_size: int = 200
     llm: LLMConfig = field(default_factory=LLMConfig)
 
 
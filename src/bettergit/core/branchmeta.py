@@ -1,55 +1,146 @@
+"""Where each branch was created from (`bg create-branch --from`).
+
+Records live in a small SQLite database in the git dir, one row per branch,
+so a write touches a single record and concurrent `bg` processes are
+serialised by SQLite's own locking (WAL mode, with a busy timeout). The old
+``branch_origins.json`` is imported on first use and renamed.
+"""
+
 from __future__ import annotations
 
 import json
+import threading
+import time
 from pathlib import Path
-from typing import Dict
+from typing import TYPE_CHECKING, Dict, Iterable
 
 from bettergit.core import gitio
 
-_METADATA_SUBDIR = 'bettergit'
-_METADATA_FILENAME = 'branch_origins.json'
+if TYPE_CHECKING:
+    import sqlite3
 
+__all__ = ['forget', 'get_origin', 'load_all', 'record_origin']
 
-def _git_dir() -> Path:
-    raw = gitio._run_git(['rev-parse', '--git-dir'])  # type: ignore[attr-defined]
-    path = Path(raw)
-    if not path.is_absolute():
-        path = Path.cwd() / path
-    return path.resolve()
-
+_METADATA_SUBDIR = 'bettergit'
+_DB_FILENAME = 'branchmeta.sqlite3'
+_LEGACY_FILENAME = 'branch_origins.json'
+_BUSY_TIMEOUT_S = 10.0
 
-def _metadata_path() -> Path:
-    return _git_dir() / _METADATA_SUBDIR / _METADATA_FILENAME
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS origins (
+    branch TEXT PRIMARY KEY,
+    start_point TEXT NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+'''
 
+# One connection per database path for the life of the process.
+_CONNECTIONS: Dict[Path, 'sqlite3.Connection'] = {}
+_LOCK = threading.Lock()
 
-def _load_origins() -> Dict[str, str]:
-    path = _metadata_path()
-    if not path.exists():
-        return {}
-    try:
-        return json.loads(path.read_text(encoding='utf-8'))
-    except json.JSONDecodeError:
-        return {}
 
+def _migrate(conn: 'sqlite3.Connection', legacy: Path) -> None:
+    """Import *legacy* JSON records (existing rows win) and retire the file."""
 
-def _write_origins(data: Dict[str, str]) -> None:
-    path = _metadata_path()
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding='utf-8')
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        # Re-check under the write lock: a parallel run may have migrated already.
+        if legacy.exists():
+            try:
+                data = json.loads(legacy.read_text(encoding='utf-8'))
+            except (OSError, json.JSONDecodeError):
+                data = {}
+            now = time.time()
+            rows = [
+                (branch, start, now)
+                for branch, start in (data.items() if isinstance(data, dict) else [])
+                if isinstance(branch, str) and isinstance(start, str) and start
+            ]
+            conn.executemany('INSERT OR IGNORE INTO origins VALUES (?, ?, ?)', rows)
+            legacy.replace(legacy.with_name(legacy.name + '.migrated'))
+        conn.execute('COMMIT')
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+
+
+def _connect(create: bool) -> 'sqlite3.Connection | None':
+    """Return the connection for the current repository.
+
+    Without *create*, a repository that has no metadata yet returns None
+    instead of getting an empty database (so `bg branch` stays read-only).
+    """
+
+    directory = gitio.git_dir() / _METADATA_SUBDIR
+    db_path = directory / _DB_FILENAME
+    legacy = directory / _LEGACY_FILENAME
+    with _LOCK:
+        conn = _CONNECTIONS.get(db_path)
+        if conn is not None and db_path.exists() and not legacy.exists():
+            return conn
+        if not create and not db_path.exists() and not legacy.exists():
+            return None
+        import sqlite3
+
+        if conn is None or not db_path.exists():
+            directory.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(db_path), timeout=_BUSY_TIMEOUT_S, isolation_level=None, check_same_thread=False
+            )
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            _CONNECTIONS[db_path] = conn
+        if legacy.exists():
+            _migrate(conn, legacy)
+        return conn
 
 
 def record_origin(branch: str, start_point: str | None) -> None:
-    data = _load_origins()
-    if start_point:
-        data[branch] = start_point
-    else:
-        data.pop(branch, None)
-    _write_origins(data)
+    """Remember that *branch* was created from *start_point* (None forgets it)."""
+
+    conn = _connect(create=bool(start_point))
+    if conn is None:
+        return
+    with _LOCK:
+        if start_point:
+            conn.execute(
+                'INSERT OR REPLACE INTO origins (branch, start_point, updated_at) VALUES (?, ?, ?)',
+                (branch, start_point, time.time()),
+            )
+        else:
+            conn.execute('DELETE FROM origins WHERE branch = ?', (branch,))
+
+
+def forget(branches: Iterable[str]) -> None:
+    """Drop the records of several *branches* in one transaction."""
+
+    names = [(branch,) for branch in branches]
+    conn = _connect(create=False) if names else None
+    if conn is None:
+        return
+    with _LOCK:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany('DELETE FROM origins WHERE branch = ?', names)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
 
 
 def get_origin(branch: str) -> str | None:
-    return _load_origins().get(branch)
+    conn = _connect(create=False)
+    if conn is None:
+        return None
+    with _LOCK:
+        row = conn.execute('SELECT start_point FROM origins WHERE branch = ?', (branch,)).fetchone()
+    return row[0] if row else None
 
 
 def load_all() -> Dict[str, str]:
-    return _load_origins()
+    conn = _connect(create=False)
+    if conn is None:
+        return {}
+    with _LOCK:
+        return dict(conn.execute('SELECT branch, start_point FROM origins ORDER BY branch'))
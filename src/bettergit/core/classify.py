@@ -3,13 +3,21 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Iterable
 
-__all__ = ["detect_type_scope"]
+from bettergit.core import diffparse
 
-_KEYWORDS_FIX = ("fix", "bug", "error", "exception")
+__all__ = ["FIX_KEYWORDS", "detect_type_scope"]
 
+FIX_KEYWORDS = ("fix", "bug", "error", "exception")
 
-def detect_type_scope(diff: str, files: Iterable[str], cfg) -> tuple[str, str | None]:
-    """Return a tuple of (type, scope) inferred from *diff* and *files*."""
+
+def detect_type_scope(diff: str | diffparse.Diff, files: Iterable[str], cfg) -> tuple[str, str | None]:
+    """Return a tuple of (type, scope) inferred from *diff* and *files*.
+
+    *diff* may be the raw diff text, which is searched in full for
+    ``FIX_KEYWORDS``, or a :class:`~bettergit.core.diffparse.Diff` whose keyword
+    matches were collected with them. A ``Diff`` only records matches in file
+    paths and added or removed lines, not in context lines.
+    """
 
     staged_files = list(files)
     scope = _infer_scope(staged_files)
@@ -24,13 +32,13 @@ def _infer_scope(files: list[str]) -> str | None:
     return parts[0] if parts else None
 
 
-def _infer_type(diff: str, files: list[str]) -> str:
+def _infer_type(diff: str | diffparse.Diff, files: list[str]) -> str:
     if files and all(path.startswith("tests/") for path in files):
         return "test"
     if files and any(path.lower().startswith("docs/") or path.lower().endswith("readme.md") for path in files):
         return "docs"
 
-    lowered = diff.lower()
-    if any(keyword in lowered for keyword in _KEYWORDS_FIX):
-        return "fix"
-    return "feat"
+    if isinstance(diff, str):
+        lowered = diff.lower()
+        return "fix" if any(keyword in lowered for keyword in FIX_KEYWORDS) else "feat"
+    return "fix" if diff.keyword_paths else "feat"
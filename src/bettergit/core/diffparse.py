@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+if TYPE_CHECKING:
+    from bettergit.core.gitio import NumstatEntry
+
+__all__ = ["Diff", "FileDiff", "Hunk", "TRUNCATION_MARKER", "from_numstat", "parse"]
+
+TRUNCATION_MARKER = "\n...[truncated]"
+
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@ ?(.*)$")
+_ESCAPES = {"n": "\n", "t": "\t", '"': '"', "\\": "\\", "a": "\a", "b": "\b", "f": "\f", "r": "\r", "v": "\v"}
+
+
+class Hunk:
+    """One `@@` block of a file diff.
+
+    ``lines`` holds the hunk body (with its `+`/`-`/space prefix) up to the
+    parser's retention limits; ``complete`` is False when lines were dropped.
+    """
+
+    __slots__ = ("old_start", "old_count", "new_start", "new_count", "header", "added", "removed", "lines", "complete")
+
+    def __init__(self, old_start: int, old_count: int, new_start: int, new_count: int, header: str) -> None:
+        self.old_start = old_start
+        self.old_count = old_count
+        self.new_start = new_start
+        self.new_count = new_count
+        self.header = header
+        self.added = 0
+        self.removed = 0
+        self.lines: list[str] = []
+        self.complete = True
+
+    def range_line(self) -> str:
+        header = f" {self.header}" if self.header else ""
+        return f"@@ -{self.old_start},{self.old_count} +{self.new_start},{self.new_count} @@{header}"
+
+    def __repr__(self) -> str:
+        return f"Hunk({self.range_line()!r}, +{self.added}/-{self.removed})"
+
+
+class FileDiff:
+    """Per-file summary: path, status letter (A/M/D/R/C), counts and hunks."""
+
+    __slots__ = ("path", "old_path", "status", "binary", "added", "removed", "hunks", "mentions")
+
+    def __init__(self, path: str, old_path: str | None = None, status: str = "M") -> None:
+        self.path = path
+        self.old_path = old_path
+        self.status = status
+        self.binary = False
+        self.added = 0
+        self.removed = 0
+        self.hunks: list[Hunk] = []
+        # True when the path or an added or removed line matched one of the parse keywords.
+        self.mentions = False
+
+    def __repr__(self) -> str:
+        return f"FileDiff({self.path!r}, {self.status}, +{self.added}/-{self.removed}, hunks={len(self.hunks)})"
+
+
+class Diff:
+    """A parsed diff: the files it touches and total line counts."""
+
+    __slots__ = ("files", "complete")
+
+    def __init__(self, files: list[FileDiff] | None = None, complete: bool = True) -> None:
+        self.files: list[FileDiff] = files or []
+        # False when hunk text was not retained (numstat input or limits hit).
+        self.complete = complete
+
+    @property
+    def added(self) -> int:
+        return sum(item.added for item in self.files)
+
+    @property
+    def removed(self) -> int:
+        return sum(item.removed for item in self.files)
+
+    @property
+    def paths(self) -> list[str]:
+        return [item.path for item in self.files]
+
+    @property
+    def binary_paths(self) -> list[str]:
+        return [item.path for item in self.files if item.binary]
+
+    @property
+    def keyword_paths(self) -> list[str]:
+        return [item.path for item in self.files if item.mentions]
+
+    @property
+    def empty(self) -> bool:
+        return not self.files
+
+    def iter_lines(self) -> Iterator[str]:
+        """Yield a unified diff rebuilt from the retained hunks."""
+
+        for item in self.files:
+            old = "/dev/null" if item.status == "A" else f"a/{item.old_path or item.path}"
+            new = "/dev/null" if item.status == "D" else f"b/{item.path}"
+            yield f"diff --git a/{item.old_path or item.path} b/{item.path}"
+            if item.binary:
+                yield f"Binary files {old} and {new} differ"
+                continue
+            if not item.hunks:
+                continue
+            yield f"--- {old}"
+            yield f"+++ {new}"
+            for hunk in item.hunks:
+                yield hunk.range_line()
+                yield from hunk.lines
+
+    def render(self, limit: int = 4000) -> str:
+        """Return the rebuilt diff cut to *limit* characters plus a truncation marker."""
+
+        parts: list[str] = []
+        remaining = limit
+        truncated = not self.complete
+        for line in self.iter_lines():
+            chunk = line if not parts else "\n" + line
+            if len(chunk) > remaining:
+                parts.append(chunk[:remaining])
+                truncated = True
+                break
+            parts.append(chunk)
+            remaining -= len(chunk)
+        text = "".join(parts)
+        return text + TRUNCATION_MARKER if truncated else text
+
+
+def parse(
+    lines: Iterable[str],
+    *,
+    keywords: Iterable[str] = (),
+    max_hunk_lines: int = 400,
+    max_retained_chars: int = 256 * 1024,
+) -> Diff:
+    """Parse unified-diff *lines* (e.g. a stream from git) in a single pass.
+
+    Line counts, statuses and hunk ranges are always exact. Hunk bodies are kept
+    only up to *max_hunk_lines* per hunk and *max_retained_chars* overall, so
+    memory stays bounded however large the input is. Files whose path, added
+    or removed lines contain any of *keywords* (case-insensitive) get
+    ``mentions=True``; context lines are not searched.
+    """
+
+    needles = tuple(keyword.lower() for keyword in keywords)
+    diff = Diff()
+    current: FileDiff | None = None
+    hunk: Hunk | None = None
+    old_left = new_left = 0
+    budget = max_retained_chars
+
+    for line in lines:
+        if hunk is not None and (old_left > 0 or new_left > 0 or line.startswith("\\")):
+            tag = line[:1]
+            if tag == "+":
+                hunk.added += 1
+                new_left -= 1
+            elif tag == "-":
+                hunk.removed += 1
+                old_left -= 1
+            elif tag == "\\":
+                pass
+            else:
+                old_left -= 1
+                new_left -= 1
+            if tag in ("+", "-") and needles and not current.mentions:  # type: ignore[union-attr]
+                lowered = line.lower()
+                if any(needle in lowered for needle in needles):
+                    current.mentions = True  # type: ignore[union-attr]
+            if len(hunk.lines) < max_hunk_lines and len(line) < budget:
+                hunk.lines.append(line)
+                budget -= len(line) + 1
+            else:
+                hunk.complete = False
+                diff.complete = False
+            continue
+
+        if line.startswith("diff --git "):
+            old_path, new_path = _split_git_header(line[len("diff --git "):])
+            current = FileDiff(new_path, old_path if old_path != new_path else None)
+            diff.files.append(current)
+            hunk = None
+            continue
+        if current is None:
+            continue
+
+        match = _HUNK_RE.match(line)
+        if match:
+            old_start, old_count, new_start, new_count, header = match.groups()
+            hunk = Hunk(
+                int(old_start),
+                int(old_count) if old_count is not None else 1,
+                int(new_start),
+                int(new_count) if new_count is not None else 1,
+                header,
+            )
+            old_left, new_left = hunk.old_count, hunk.new_count
+            current.hunks.append(hunk)
+            continue
+        if hunk is not None:
+            # Leftover lines after a fully consumed hunk (should not happen in git output).
+            continue
+
+        _apply_extended_header(current, line)
+
+    for item in diff.files:
+        item.added = sum(h.added for h in item.hunks)
+        item.removed = sum(h.removed for h in item.hunks)
+        if needles and not item.mentions:
+            item.mentions = _path_mentions(item, needles)
+    return diff
+
+
+def from_numstat(
+    entries: Iterable["NumstatEntry"], keyword_paths: Iterable[str] = (), *, keywords: Iterable[str] = ()
+) -> Diff:
+    """Build a hunk-less :class:`Diff` from `git diff --numstat` entries.
+
+    Files listed in *keyword_paths* (e.g. from `git diff -G`) or whose path
+    contains one of *keywords* get ``mentions=True``.
+    """
+
+    mentioned = set(keyword_paths)
+    needles = tuple(keyword.lower() for keyword in keywords)
+    diff = Diff(complete=False)
+    for entry in entries:
+        item = FileDiff(entry.path, entry.old_path, entry.status)
+        item.binary = entry.binary
+        item.added = entry.added or 0
+        item.removed = entry.removed or 0
+        item.mentions = entry.path in mentioned or _path_mentions(item, needles)
+        diff.files.append(item)
+    return diff
+
+
+def _path_mentions(item: FileDiff, needles: tuple[str, ...]) -> bool:
+    paths = f"{item.old_path or ''}\0{item.path}".lower()
+    return any(needle in paths for needle in needles)
+
+
+def _apply_extended_header(item: FileDiff, line: str) -> None:
+    if line.startswith("new file mode"):
+        item.status = "A"
+    elif line.startswith("deleted file mode"):
+        item.status = "D"
+    elif line.startswith("rename from "):
+        item.status, item.old_path = "R", _unquote(line[len("rename from "):])
+    elif line.startswith("rename to "):
+        item.path = _unquote(line[len("rename to "):])
+    elif line.startswith("copy from "):
+        item.status, item.old_path = "C", _unquote(line[len("copy from "):])
+    elif line.startswith("copy to "):
+        item.path = _unquote(line[len("copy to "):])
+    elif line.startswith("Binary files ") or line == "GIT binary patch":
+        item.binary = True
+    elif line.startswith(("--- ", "+++ ")):
+        # git appends a tab to names containing spaces.
+        name = line[4:].rstrip("\t")
+        if name == "/dev/null":
+            return
+        if line[0] == "+":
+            item.path = _strip_prefix(_unquote(name), "b/")
+        elif item.status != "R":
+            old_path = _strip_prefix(_unquote(name), "a/")
+            item.old_path = old_path if old_path != item.path else None
+
+
+def _split_git_header(rest: str) -> tuple[str, str]:
+    """Split the `a/<old> b/<new>` part of a `diff --git` line."""
+
+    if rest.startswith('"'):
+        old, _, tail = _take_quoted(rest)
+        new = _unquote(tail.strip())
+        return _strip_prefix(_decode(old), "a/"), _strip_prefix(new, "b/")
+    if rest.endswith('"'):
+        start = rest.rfind(' "')
+        return _strip_prefix(rest[:start], "a/"), _strip_prefix(_unquote(rest[start + 1:]), "b/")
+    # Unquoted: both halves are equal unless the file was renamed, in which
+    # case the extended headers that follow fix the paths up.
+    half = len(rest) // 2
+    if rest[half:half + 3] == " b/" and rest[2:half] == rest[half + 3:]:
+        path = rest[2:half]
+        return path, path
+    old, _, new = rest.partition(" b/")
+    return _strip_prefix(old, "a/"), new
+
+
+def _strip_prefix(path: str, prefix: str) -> str:
+    return path[len(prefix):] if path.startswith(prefix) else path
+
+
+def _take_quoted(text: str) -> tuple[str, int, str]:
+    out: list[str] = []
+    index = 1
+    while index < len(text):
+        char = text[index]
+        if char == '"':
+            return "".join(out), index, text[index + 1:]
+        if char == "\\" and index + 1 < len(text):
+            index += 1
+            char = text[index]
+            if char in "01234567":
+                # Octal escapes encode raw UTF-8 bytes.
+                octal = text[index:index + 3]
+                out.append(chr(int(octal, 8)))
+                index += 3
+                continue
+            out.append(_ESCAPES.get(char, char))
+        else:
+            out.append(char)
+        index += 1
+    return "".join(out), index, ""
+
+
+def _unquote(path: str) -> str:
+    if not path.startswith('"'):
+        return path
+    return _decode(_take_quoted(path)[0])
+
+
+def _decode(raw: str) -> str:
+    try:
+        return raw.encode("latin-1").decode("utf-8")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return raw
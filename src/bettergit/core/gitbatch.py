@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import atexit
+import os
+import subprocess
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Sequence
+
+__all__ = [
+    "BatchUnavailable",
+    "CommitSummary",
+    "GitBatch",
+    "close_all",
+    "session",
+]
+
+
+class BatchUnavailable(RuntimeError):
+    """Raised when the long-lived git helper cannot answer a query."""
+
+
+@dataclass(frozen=True)
+class CommitSummary:
+    """The subset of a commit object that `git log -1` would print."""
+
+    sha: str
+    author: str
+    date: str
+    title: str
+
+
+class GitBatch:
+    """Long-lived `git cat-file --batch-command` helper bound to one working directory.
+
+    Object and ref lookups are answered over a single pipe instead of a fresh
+    `git` process per query. Refs and configuration are read natively by
+    :mod:`bettergit.core.refs`; this helper only deals with objects.
+    """
+
+    def __init__(self, prefix: Sequence[str], cwd: str) -> None:
+        self._prefix = list(prefix)
+        self._cwd = cwd
+        self._lock = threading.Lock()
+        self._process: subprocess.Popen[bytes] | None = None
+        self._disabled = False
+
+    # -- process management -------------------------------------------------
+
+    def _spawn(self) -> subprocess.Popen[bytes]:
+        if self._disabled:
+            raise BatchUnavailable("batch helper disabled")
+        if self._process is not None and self._process.poll() is None:
+            return self._process
+        try:
+            self._process = subprocess.Popen(
+                [*self._prefix, "cat-file", "--batch-command"],
+                cwd=self._cwd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as exc:
+            self._disabled = True
+            raise BatchUnavailable(str(exc)) from exc
+        return self._process
+
+    def _request(self, command: str) -> tuple[bytes, subprocess.Popen[bytes]]:
+        process = self._spawn()
+        assert process.stdin is not None and process.stdout is not None
+        try:
+            process.stdin.write(command.encode("utf-8") + b"\n")
+            process.stdin.flush()
+            header = process.stdout.readline()
+        except (BrokenPipeError, OSError) as exc:
+            self._reset()
+            raise BatchUnavailable(str(exc)) from exc
+        if not header:
+            # cat-file exits on fatal lookups (e.g. malformed revisions) or when
+            # --batch-command is not supported by the installed git.
+            returncode = process.wait()
+            self._process = None
+            if returncode == 129:
+                self._disabled = True
+            raise BatchUnavailable(f"git cat-file exited with {returncode}")
+        return header, process
+
+    def _reset(self) -> None:
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            if process.stdin is not None:
+                process.stdin.close()
+            process.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+
+    def close(self) -> None:
+        with self._lock:
+            self._reset()
+
+    # -- queries -------------------------------------------------------------
+
+    def resolve(self, rev: str) -> str | None:
+        """Return the object id for *rev*, or None when it does not exist."""
+
+        if "\n" in rev:
+            return None
+        with self._lock:
+            header, _ = self._request(f"info {rev}")
+        fields = header.decode("utf-8", errors="replace").split()
+        if len(fields) != 3:
+            return None
+        return fields[0]
+
+    def read_object(self, rev: str) -> tuple[str, str, bytes] | None:
+        """Return ``(oid, type, content)`` for *rev*, or None when missing."""
+
+        if "\n" in rev:
+            return None
+        with self._lock:
+            header, process = self._request(f"contents {rev}")
+            fields = header.decode("utf-8", errors="replace").split()
+            if len(fields) != 3:
+                return None
+            oid, kind, size = fields
+            assert process.stdout is not None
+            content = process.stdout.read(int(size))
+            process.stdout.read(1)  # trailing newline
+        return oid, kind, content
+
+    def last_commit(self, rev: str) -> CommitSummary | None:
+        """Return the sha, author, date and subject of the commit at *rev*."""
+
+        obj = self.read_object(f"{rev}^{{commit}}")
+        if obj is None:
+            return None
+        oid, kind, content = obj
+        if kind != "commit":
+            return None
+        return _parse_commit(oid, content)
+
+
+def _parse_commit(oid: str, content: bytes) -> CommitSummary:
+    text = content.decode("utf-8", errors="replace")
+    headers, _, message = text.partition("\n\n")
+    author = date = ""
+    for line in headers.splitlines():
+        if line.startswith("author "):
+            author, date = _parse_signature(line[len("author "):])
+            break
+    paragraph = message.strip().split("\n\n", 1)[0]
+    title = " ".join(part.strip() for part in paragraph.splitlines())
+    return CommitSummary(sha=oid, author=author, date=date, title=title)
+
+
+def _parse_signature(raw: str) -> tuple[str, str]:
+    name, _, rest = raw.partition(" <")
+    _, _, stamp = rest.partition("> ")
+    seconds, _, offset = stamp.partition(" ")
+    try:
+        return name, _format_git_date(int(seconds), offset)
+    except ValueError:
+        return name, stamp
+
+
+def _format_git_date(seconds: int, offset: str) -> str:
+    """Format a timestamp the way git's default `--date` format does."""
+
+    sign = -1 if offset.startswith("-") else 1
+    hours, minutes = int(offset[1:3]), int(offset[3:5])
+    tz = timezone(sign * timedelta(hours=hours, minutes=minutes))
+    moment = datetime.fromtimestamp(seconds, tz)
+    return f"{moment:%a %b} {moment.day} {moment:%H:%M:%S %Y} {offset}"
+
+
+# Helpers per working directory, least recently used first; the oldest is closed past the limit.
+_SESSIONS: dict[str, GitBatch] = {}
+_SESSIONS_LOCK = threading.Lock()
+_MAX_SESSIONS = 8
+
+
+def session(prefix: Sequence[str]) -> GitBatch:
+    """Return the helper for the current working directory, creating it lazily."""
+
+    cwd = os.getcwd()
+    evicted: list[GitBatch] = []
+    with _SESSIONS_LOCK:
+        batch = _SESSIONS.pop(cwd, None)
+        if batch is None:
+            batch = GitBatch(prefix, cwd)
+        _SESSIONS[cwd] = batch
+        while len(_SESSIONS) > _MAX_SESSIONS:
+            evicted.append(_SESSIONS.pop(next(iter(_SESSIONS))))
+    for old in evicted:
+        old.close()
+    return batch
+
+
+def close_all() -> None:
+    """Terminate every helper process."""
+
+    with _SESSIONS_LOCK:
+        sessions = list(_SESSIONS.values())
+        _SESSIONS.clear()
+    for batch in sessions:
+        batch.close()
+
+
+atexit.register(close_all)
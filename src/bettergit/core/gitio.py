@@ -1,30 +1,59 @@
 ﻿from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable, Sequence
+from pathlib import Path
+from typing import Iterable, Iterator, Mapping, Sequence
+import os
+import re
 import subprocess
+import tempfile
+
+from bettergit.core import gitbatch, refs
 
 __all__ = [
     "GitError",
     "BranchInfo",
+    "PUSH_CHUNK_SIZE",
+    "RefUpdate",
+    "NumstatEntry",
     "add",
     "add_all",
     "branch_info",
+    "branch_infos",
+    "branch_tips",
+    "branch_tips_containing",
     "checkout",
     "commit",
+    "common_ancestors",
     "create_branch",
     "current_branch",
     "delete_branch",
+    "delete_branches",
     "delete_remote_branch",
+    "delete_remote_branches",
+    "delete_remote_refs",
     "get_changed_files",
     "get_staged_diff",
+    "get_staged_numstat",
+    "get_staged_paths_matching",
+    "git_dir",
+    "iter_commit_parents",
+    "iter_staged_diff",
     "has_upstream",
     "list_branches",
+    "local_oid",
+    "ls_remote",
+    "merged_refs",
     "push",
     "remote_branch_exists",
+    "root_commits",
     "tag",
     "create_tag",
     "delete_tag",
+    "delete_remote_tag",
+    "find_tag",
+    "push_tag",
+    "write_tree",
 ]
 
 _GIT_PREFIX: list[str] = [
@@ -36,18 +65,34 @@ _GIT_PREFIX: list[str] = [
 ]
 
 
+
 class GitError(RuntimeError):
     """Raised when a git command exits with a non-zero status."""
 
 
-def _run_git(args: Sequence[str]) -> str:
-    process = subprocess.run(
+def _batch() -> gitbatch.GitBatch:
+    return gitbatch.session(_GIT_PREFIX)
+
+
+def _c_locale() -> dict[str, str]:
+    """Environment for commands whose human-readable output is parsed (git translates it)."""
+
+    return {**os.environ, "LC_ALL": "C"}
+
+
+def _run_git_unchecked(args: Sequence[str], env: Mapping[str, str] | None = None) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
         [*_GIT_PREFIX, *args],
+        env=env,
         capture_output=True,
         text=True,
         encoding="utf-8",
         errors="replace",
     )
+
+
+def _run_git(args: Sequence[str]) -> str:
+    process = _run_git_unchecked(args)
     if process.returncode != 0:
         stdout = process.stdout.strip()
         stderr = process.stderr.strip()
@@ -57,12 +102,148 @@ def _run_git(args: Sequence[str]) -> str:
     return process.stdout.strip()
 
 
+def _stream_git(
+    args: Sequence[str], stdin: str | None = None, env: Mapping[str, str] | None = None
+) -> Iterator[str]:
+    """Yield the output of a read-only git command line by line (without newlines).
+
+    *stdin* is written in full before reading, so it suits commands that read
+    all of their input first (e.g. `rev-list --stdin`).
+    """
+
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(
+            [*_GIT_PREFIX, *args],
+            stdin=subprocess.PIPE if stdin is not None else None,
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            env=env,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+        assert process.stdout is not None
+        if stdin is not None:
+            assert process.stdin is not None
+            try:
+                process.stdin.write(stdin)
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+        try:
+            for line in process.stdout:
+                yield line.rstrip("\n")
+        finally:
+            if process.poll() is None and not process.stdout.closed:
+                process.stdout.close()
+                process.kill()
+            process.wait()
+        if process.returncode != 0:
+            stderr.seek(0)
+            message = stderr.read().decode("utf-8", errors="replace").strip()
+            command_str = " ".join([*_GIT_PREFIX, *args])
+            raise GitError(message or f"git failed: {command_str}")
+
+
+def git_dir() -> Path:
+    """Return the absolute path of the repository's git directory."""
+
+    try:
+        return refs.discover().git_dir
+    except refs.UnsupportedRepository:
+        return Path(_run_git(["rev-parse", "--absolute-git-dir"]))
+
+
+def write_tree() -> str:
+    """Return the tree id of the index, i.e. a content address of the staged state."""
+
+    return _run_git(["write-tree"])
+
+
 def get_staged_diff() -> str:
     """Return the unified diff for staged changes."""
 
     return _run_git(["diff", "--cached", "--no-color"])
 
 
+def iter_staged_diff() -> Iterator[str]:
+    """Yield the staged unified diff line by line straight from the git pipe."""
+
+    return _stream_git(["diff", "--cached", "--no-color"])
+
+
+@dataclass(frozen=True)
+class NumstatEntry:
+    """One staged file as reported by `git diff --numstat`, with its `--raw` status letter."""
+
+    path: str
+    added: int | None
+    removed: int | None
+    old_path: str | None = None
+    status: str = "M"
+
+    @property
+    def binary(self) -> bool:
+        return self.added is None
+
+
+def get_staged_numstat() -> list[NumstatEntry]:
+    """Return per-file added/removed counts for staged changes.
+
+    Binary files report None for both counts; renames carry *old_path*. The
+    status letter (A/M/D/R/C/T) comes from `--raw`, which is printed first in
+    the same output.
+    """
+
+    output = _run_git(["diff", "--cached", "--raw", "--numstat", "-z", "--no-color"])
+    fields = output.split("\0")
+    entries: list[NumstatEntry] = []
+    statuses: dict[str, str] = {}
+    index = 0
+    while index < len(fields):
+        record = fields[index]
+        index += 1
+        if not record:
+            continue
+        if record.startswith(":"):
+            # ":<mode> <mode> <oid> <oid> <status>\0<path>\0", plus the new path for renames and copies.
+            status = record.rsplit(" ", 1)[-1][:1]
+            index += 2 if status in ("R", "C") else 1
+            statuses[fields[index - 1]] = status
+            continue
+        added, _, rest = record.partition("\t")
+        removed, _, path = rest.partition("\t")
+        old_path = None
+        if not path:
+            # Renames and copies: "<added>\t<removed>\t\0<old>\0<new>\0".
+            old_path, path = fields[index], fields[index + 1]
+            index += 2
+        entries.append(
+            NumstatEntry(
+                path=path,
+                added=int(added) if added.isdigit() else None,
+                removed=int(removed) if removed.isdigit() else None,
+                old_path=old_path,
+                status=statuses.get(path, "R" if old_path else "M"),
+            )
+        )
+    return entries
+
+
+def get_staged_paths_matching(keywords: Iterable[str]) -> list[str]:
+    """Return staged files whose added or removed lines mention any of *keywords*.
+
+    The search runs inside git (`-G`, case-insensitive), so only file names
+    cross the pipe.
+    """
+
+    pattern = "|".join(re.escape(keyword) for keyword in keywords)
+    if not pattern:
+        return []
+    output = _run_git(["diff", "--cached", "--name-only", "-z", "--no-color", "-i", f"-G{pattern}"])
+    return [path for path in output.split("\0") if path]
+
+
 def get_changed_files() -> list[str]:
     """Return the list of staged files."""
 
@@ -91,7 +272,10 @@ def add(paths: Sequence[str]) -> None:
 def current_branch() -> str:
     """Return the name of the current branch."""
 
-    return _run_git(["rev-parse", "--abbrev-ref", "HEAD"])
+    try:
+        return refs.current_branch()
+    except refs.UnsupportedRepository:
+        return _run_git(["rev-parse", "--abbrev-ref", "HEAD"])
 
 
 def create_branch(
@@ -122,12 +306,110 @@ def delete_branch(branch_name: str, force: bool = False) -> None:
     _run_git(["branch", flag, branch_name])
 
 
+def local_oid(refname: str) -> str | None:
+    """Return the object id of the local ref *refname*, or None when it does not exist."""
+
+    try:
+        oid = refs.discover().resolve(refname)
+    except refs.UnsupportedRepository:
+        oid = None
+    if oid is None:
+        oid = _resolve(refname)
+    return oid
+
+
 def delete_remote_branch(remote: str, branch: str) -> None:
     """Delete *branch* on *remote*."""
 
     _run_git(["push", remote, "--delete", branch])
 
 
+_DELETED_BRANCH_RE = re.compile(r"^Deleted branch (.+) \(was [0-9a-f]+\)\.$")
+
+
+def delete_branches(names: Sequence[str], force: bool = False) -> tuple[list[str], dict[str, str]]:
+    """Delete several local branches with a single `git branch -d` call.
+
+    Git deletes what it can and reports the rest, so this returns the deleted
+    names and ``{name: error}`` for the branches that were kept.
+    """
+
+    if not names:
+        return [], {}
+    process = _run_git_unchecked(["branch", "-D" if force else "-d", *names], env=_c_locale())
+    deleted = [match.group(1) for match in map(_DELETED_BRANCH_RE.match, process.stdout.splitlines()) if match]
+    errors = [line for line in process.stderr.splitlines() if line.lower().startswith(("error:", "fatal:"))]
+    failed: dict[str, str] = {}
+    for name in names:
+        if name in deleted:
+            continue
+        message = next((line for line in errors if f"'{name}'" in line), None)
+        failed[name] = (message or process.stderr.strip() or "not deleted").partition(": ")[2] or "not deleted"
+    return deleted, failed
+
+
+@dataclass(frozen=True)
+class RefUpdate:
+    """Outcome of one ref in a push, as reported by `git push --porcelain`."""
+
+    ref: str
+    ok: bool
+    summary: str
+
+
+# Refs per `git push` when deleting in bulk; keeps the command line well below OS limits.
+PUSH_CHUNK_SIZE = 200
+
+_PORCELAIN_RE = re.compile(r"^([ +\-*=!])\t[^\t]*:([^\t]+)\t\[([^\]]*)\](?: \((.*)\))?")
+
+
+def _delete_chunk(remote: str, refnames: list[str], atomic: bool) -> list[RefUpdate]:
+    # Full ref names make git send every deletion, even of refs the remote no longer has.
+    args = ["push", "--porcelain", *(["--atomic"] if atomic else []), remote, "--delete", *refnames]
+    process = _run_git_unchecked(args)
+    reported: dict[str, RefUpdate] = {}
+    for line in process.stdout.splitlines():
+        match = _PORCELAIN_RE.match(line)
+        if match:
+            flag, ref, summary, reason = match.groups()
+            reported[ref] = RefUpdate(ref, flag != "!", f"{summary} ({reason})" if reason else summary)
+    errors = [line for line in process.stderr.splitlines() if line.startswith(("error:", "fatal:"))]
+    failure = (errors[0].partition(": ")[2] if errors else "") or "push failed"
+    return [reported.get(ref, RefUpdate(ref, False, failure)) for ref in refnames]
+
+
+def delete_remote_refs(
+    remote: str, refnames: Sequence[str], atomic: bool = False, chunk_size: int = PUSH_CHUNK_SIZE
+) -> list[RefUpdate]:
+    """Delete full *refnames* on *remote*, one `git push --delete` per chunk of *chunk_size*.
+
+    Returns the outcome of every ref. With *atomic*, each chunk is applied all
+    or nothing and the remaining chunks are skipped once one fails.
+    """
+
+    pending = list(dict.fromkeys(refnames))
+    results: list[RefUpdate] = []
+    for start in range(0, len(pending), max(1, chunk_size)):
+        chunk = pending[start:start + max(1, chunk_size)]
+        if atomic and any(not result.ok for result in results):
+            results.extend(RefUpdate(ref, False, "skipped (atomic push failed)") for ref in chunk)
+            continue
+        results.extend(_delete_chunk(remote, chunk, atomic))
+    return results
+
+
+def delete_remote_branches(remote: str, branches: Sequence[str]) -> list[RefUpdate]:
+    """Delete *branches* on *remote* in bulk (see :func:`delete_remote_refs`)."""
+
+    return delete_remote_refs(remote, [f"refs/heads/{branch}" for branch in branches])
+
+
+def merged_refs(base: str, prefixes: Sequence[str]) -> set[str]:
+    """Return the full names of refs under *prefixes* whose tips are reachable from *base*."""
+
+    return {line for line in _stream_git(["for-each-ref", f"--merged={base}", "--format=%(refname)", *prefixes]) if line}
+
+
 @dataclass(frozen=True)
 class BranchInfo:
     """Collected metadata about a git branch."""
@@ -140,11 +422,78 @@ class BranchInfo:
     last_commit_author: str | None
     last_commit_date: str | None
     last_commit_title: str | None
+    upstream_gone: bool = False
+
+
+def branch_tips() -> dict[str, str]:
+    """Return ``{branch: commit id}`` for every local branch."""
+
+    try:
+        return refs.branch_tips()
+    except refs.UnsupportedRepository:
+        pass
+    tips: dict[str, str] = {}
+    for line in _stream_git(["for-each-ref", "--format=%(objectname) %(refname:short)", "refs/heads"]):
+        oid, _, name = line.partition(" ")
+        if name:
+            tips[name] = oid
+    return tips
+
+
+def iter_commit_parents(tips: Iterable[str], exclude: Iterable[str] = ()) -> Iterator[tuple[str, tuple[str, ...]]]:
+    """Yield ``(commit, parents)`` for everything reachable from *tips* but not *exclude*, children first.
+
+    One `git rev-list --topo-order --parents --stdin` call serves the whole graph.
+    """
+
+    lines = [*tips, *(f"^{commit}" for commit in exclude)]
+    for line in _stream_git(["rev-list", "--topo-order", "--parents", "--stdin"], stdin="\n".join(lines) + "\n"):
+        commit, *parents = line.split()
+        if commit:
+            yield commit, tuple(parents)
+
+
+MERGE_BASE_CHUNK_SIZE = 500
+
+
+def common_ancestors(tips: Sequence[str], chunk_size: int = MERGE_BASE_CHUNK_SIZE) -> list[str]:
+    """Return commits whose history is shared by every one of *tips* (empty if there are none).
+
+    Uses `git merge-base --octopus --all`, a chunk of tips at a time to keep
+    the command line short; folding the chunks can only move the result further
+    back, never onto a commit some tip does not contain.
+    """
+
+    bases: list[str] = []
+    for start in range(0, len(tips), max(1, chunk_size)):
+        process = _run_git_unchecked(["merge-base", "--octopus", "--all", *bases, *tips[start:start + chunk_size]])
+        bases = process.stdout.split() if process.returncode == 0 else []
+        if not bases:
+            return []
+    return bases
+
+
+def root_commits(tips: Iterable[str]) -> list[str]:
+    """Return the parentless commits reachable from *tips*; only their ids cross the pipe."""
+
+    lines = "\n".join(tips) + "\n"
+    return [line for line in _stream_git(["rev-list", "--max-parents=0", "--stdin"], stdin=lines) if line]
+
+
+def branch_tips_containing(commit: str) -> set[str]:
+    """Return the tip commits of the local branches whose history contains *commit*."""
+
+    lines = _stream_git(["for-each-ref", f"--contains={commit}", "--format=%(objectname)", "refs/heads"])
+    return {line for line in lines if line}
 
 
 def list_branches(all_: bool = False) -> list[str]:
     """Return the list of branch names."""
 
+    try:
+        return refs.list_branches(all_=all_)
+    except refs.UnsupportedRepository:
+        pass
     args: list[str] = ["branch"]
     if all_:
         args.append("--all")
@@ -167,13 +516,19 @@ def checkout(branch: str) -> None:
 
 
 def branch_info(branch: str | None = None) -> BranchInfo:
-    """Return information about *branch* (defaults to the current branch)."""
+    """Return information about *branch* (defaults to the current branch).
+
+    Raises :class:`GitError` when *branch* does not exist.
+    """
 
     branch_name = branch or current_branch()
-    try:
-        tracking = _run_git(["rev-parse", "--abbrev-ref", f"{branch_name}@{{upstream}}"])
-    except GitError:
-        tracking = None
+    if _upstream_configured(branch_name):
+        # for-each-ref counts ahead/behind and notices a gone upstream in one pass.
+        for info in branch_infos([f"refs/heads/{branch_name}"]):
+            if info.name == branch_name:
+                return info
+    # Without an upstream the commit comes from the warm cat-file helper, no fork needed.
+    tracking = _upstream(branch_name)
 
     ahead = behind = 0
     if tracking:
@@ -183,13 +538,12 @@ def branch_info(branch: str | None = None) -> BranchInfo:
         behind = int(left)
 
     last_commit_sha = last_commit_author = last_commit_date = last_commit_title = None
-    if list_branches():
-        pretty = "%H%x1f%an%x1f%ad%x1f%s"
-        data = _run_git(["log", "-1", f"--pretty=format:{pretty}", branch_name])
-        if data:
-            parts = data.split("\x1f")
-            if len(parts) == 4:
-                last_commit_sha, last_commit_author, last_commit_date, last_commit_title = parts
+    last = _last_commit(branch_name)
+    if last is not None:
+        last_commit_sha, last_commit_author, last_commit_date, last_commit_title = last
+    elif list_branches():
+        # Only an unborn HEAD in a repository without commits has no last commit.
+        raise GitError(f"unknown branch: {branch_name}")
 
     return BranchInfo(
         name=branch_name,
@@ -203,15 +557,125 @@ def branch_info(branch: str | None = None) -> BranchInfo:
     )
 
 
+_BRANCH_INFO_FORMAT = "%00".join(
+    [
+        "%(refname)",
+        "%(upstream:short)",
+        "%(upstream:track,nobracket)",
+        "%(objectname)",
+        "%(authorname)",
+        "%(authordate)",
+        "%(contents:subject)",
+    ]
+)
+
+
+def branch_infos(patterns: Sequence[str] = ()) -> list[BranchInfo]:
+    """Return :class:`BranchInfo` for every local branch matching *patterns*.
+
+    Patterns follow `git for-each-ref` rules; names without a `refs/` prefix are
+    looked up under `refs/heads/`. All branches are read in a single pass.
+    """
+
+    refspecs = [pattern if pattern.startswith("refs/") else f"refs/heads/{pattern}" for pattern in patterns]
+    infos: list[BranchInfo] = []
+    # The C locale keeps %(upstream:track) in English for _parse_track.
+    lines = _stream_git(["for-each-ref", f"--format={_BRANCH_INFO_FORMAT}", *(refspecs or ["refs/heads"])], env=_c_locale())
+    for line in lines:
+        fields = line.split("\0")
+        if len(fields) != 7:
+            continue
+        refname, tracking, track, sha, author, date, title = fields
+        ahead, behind, gone = _parse_track(track)
+        infos.append(
+            BranchInfo(
+                name=refname[len("refs/heads/"):] if refname.startswith("refs/heads/") else refname,
+                tracking=None if gone else tracking or None,
+                ahead=ahead,
+                behind=behind,
+                last_commit_sha=sha or None,
+                last_commit_author=author or None,
+                last_commit_date=date or None,
+                last_commit_title=title or None,
+                upstream_gone=gone,
+            )
+        )
+    return infos
+
+
+def _parse_track(track: str) -> tuple[int, int, bool]:
+    """Parse `%(upstream:track,nobracket)` output such as "ahead 2, behind 1"."""
+
+    if track == "gone":
+        return 0, 0, True
+    ahead = behind = 0
+    for part in track.split(","):
+        label, _, count = part.strip().partition(" ")
+        if label == "ahead" and count.isdigit():
+            ahead = int(count)
+        elif label == "behind" and count.isdigit():
+            behind = int(count)
+    return ahead, behind, False
+
+
 def has_upstream(branch: str | None = None) -> bool:
     """Return True if *branch* has an upstream configured."""
 
     branch_name = branch or current_branch()
+    return _upstream(branch_name) is not None
+
+
+def _upstream_configured(branch: str) -> bool:
+    """Return True unless the config certainly names no upstream for *branch*."""
+
+    try:
+        return refs.discover().config_value(f"branch.{branch}.merge") is not None
+    except refs.UnsupportedRepository:
+        return True
+
+
+def _upstream(branch: str) -> str | None:
     try:
-        _run_git(["rev-parse", "--abbrev-ref", f"{branch_name}@{{upstream}}"])
+        return refs.upstream(branch)
+    except refs.UnsupportedRepository:
+        pass
+    try:
+        return _run_git(["rev-parse", "--abbrev-ref", f"{branch}@{{upstream}}"])
     except GitError:
-        return False
-    return True
+        return None
+
+
+def _resolve(rev: str) -> str | None:
+    """Return the object id *rev* names, or None; asks the cat-file helper before forking."""
+
+    try:
+        return _batch().resolve(rev)
+    except gitbatch.BatchUnavailable:
+        pass
+    try:
+        return _run_git(["rev-parse", "--verify", "--quiet", rev]) or None
+    except GitError:
+        return None
+
+
+def _last_commit(rev: str) -> tuple[str, str, str, str] | None:
+    try:
+        summary = _batch().last_commit(rev)
+    except gitbatch.BatchUnavailable:
+        pass
+    else:
+        if summary is None:
+            return None
+        return summary.sha, summary.author, summary.date, summary.title
+    pretty = "%H%x1f%an%x1f%ad%x1f%s"
+    try:
+        data = _run_git(["log", "-1", f"--pretty=format:{pretty}", rev])
+    except GitError:
+        return None
+    parts = data.split("\x1f")
+    if len(parts) != 4:
+        return None
+    return parts[0], parts[1], parts[2], parts[3]
 
 
 def push(remote: str = "origin", branch: str | None = None, set_upstream: bool = True) -> bool:
@@ -222,20 +686,31 @@ def push(remote: str = "origin", branch: str | None = None, set_upstream: bool =
 
     ref = branch or current_branch()
     needs_upstream = set_upstream and not has_upstream(ref)
-    args: list[str] = ["push"]
+    args: list[str] = []
     if needs_upstream:
         args.append("-u")
     args.extend([remote, ref])
-    _run_git(args)
+    _run_git(["push", *args])
     return needs_upstream
 
 
 
+def ls_remote(remote: str = "origin") -> dict[str, str]:
+    """Return ``{refname: object id}`` for every branch and tag on *remote*."""
+
+    advertised: dict[str, str] = {}
+    for line in _stream_git(["ls-remote", "--heads", "--tags", remote]):
+        oid, _, refname = line.partition("\t")
+        if refname and not refname.endswith("^{}"):
+            advertised[refname] = oid
+    return advertised
+
+
 def remote_branch_exists(remote: str = "origin", branch: str | None = None) -> bool:
-    """Return True if *branch* exists on *remote*."""
+    """Return True if *branch* exists on *remote* (asks the remote; see `remotes` for a cached check)."""
 
     ref = branch or current_branch()
-    output = _run_git(["ls-remote", "--heads", remote, ref])
+    output = _run_git(["ls-remote", "--heads", remote, f"refs/heads/{ref}"])
     return bool(output.strip())
 
 
@@ -246,11 +721,14 @@ def tag() -> str:
     return output
 
 
-def find_tag(name: str, remote: str = "origin") -> str:
-    """Check if tag exists on remote."""
+def find_tag(name: str, remote: str = "origin") -> str | None:
+    """Return the object id of tag *name* on *remote*, or None when it does not exist there."""
 
-    output = _run_git(["ls-remote", "--tags", remote, name])
-    return output
+    for line in _stream_git(["ls-remote", "--tags", remote, f"refs/tags/{name}"]):
+        oid, _, refname = line.partition("\t")
+        if refname == f"refs/tags/{name}":
+            return oid
+    return None
 
 
 def create_tag(name: str, message: str | None = None) -> None:
@@ -265,7 +743,7 @@ def create_tag(name: str, message: str | None = None) -> None:
 def push_tag(name: str, remote: str = "origin") -> None:
     """Push your tag to remote."""
 
-    _run_git(["push", remote, name])
+    _run_git(["push", remote, f"refs/tags/{name}"])
 
 
 def delete_tag(name: str) -> None:
@@ -277,4 +755,4 @@ def delete_tag(name: str) -> None:
 def delete_remote_tag(name: str, remote: str = "origin") -> None:
     """Delete tag from remote."""
 
-    _run_git(["push", "--delete", remote, name])
\ No newline at end of file
+    _run_git(["push", "--delete", remote, f"refs/tags/{name}"])
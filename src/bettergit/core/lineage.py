@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from bettergit.core import gitio, refs
+from bettergit.core.statefile import load_json, save_json
+
+__all__ = ["Lineage", "infer_parents"]
+
+_CACHE_FILE = Path("bettergit") / "lineage.json"
+_CACHE_VERSION = 1
+# Meetings kept per tip, so a parent can be replaced (to break a cycle)
+# without loading the graph again.
+_LEVELS = 3
+# Never given a parent, like origin's default branch.
+_TRUNK_NAMES = ("main", "master", "trunk")
+
+
+@dataclass(frozen=True)
+class Lineage:
+    """Closest parent of a branch as inferred from the commit graph."""
+
+    branch: str
+    parent: str
+    fork_point: str
+    # Commits on the branch's first-parent line since the fork point.
+    distance: int
+
+
+@dataclass
+class _Level:
+    distance: int
+    fork_point: str
+    winners: List[str]
+
+
+@dataclass
+class _Pairs:
+    """Nearest candidate tips for one branch tip, closest first.
+
+    Every pair (branch tip, candidate tip) depends only on the two commits, so
+    the result stays valid for as long as the branch tip is unchanged; tips
+    that were not seen before still have to be compared against it.
+    Candidates missing from *levels* are further away than *complete_to*.
+    """
+
+    levels: List[_Level] = field(default_factory=list)
+    complete_to: float = math.inf
+
+
+def _components(tips: List[str]) -> List[Tuple[List[str], List[str]]]:
+    """Split *tips* into groups that share no history, each with its common merge bases.
+
+    Nearly always this is one group. Unrelated branches (an orphan `gh-pages`)
+    are told apart by their root commits, so they cannot leave the others
+    without a shared base. A lone tip is its own base. A group whose tips have
+    no common ancestor (orphan histories merged later) gets no bases and is
+    loaded in full.
+    """
+
+    if len(tips) == 1:
+        return [(tips, list(tips))]
+    shared = gitio.common_ancestors(tips)
+    if shared:
+        return [(tips, shared)]
+    wanted = set(tips)
+    groups: List[Set[str]] = []
+    for root in gitio.root_commits(tips):
+        joined = gitio.branch_tips_containing(root) & wanted
+        for other in [group for group in groups if group & joined]:
+            groups.remove(other)
+            joined |= other
+        groups.append(joined)
+    if set().union(*groups) != wanted:
+        # A tip that is not a local branch head: treat everything as one group.
+        return [(tips, [])]
+    result = []
+    for joined in groups:
+        ordered = sorted(joined)
+        bases = gitio.common_ancestors(ordered) if len(ordered) > 1 else ordered
+        result.append((ordered, bases))
+    return result
+
+
+class _Graph:
+    """The part of the commit graph that tells a set of tips apart, loaded in one git call.
+
+    History shared by every tip of a group (the ancestors of their common
+    merge bases) answers every reachability question the same way, so it is
+    left out: a walk that steps outside the loaded commits has met all
+    remaining tips of its group, and no tip of a group with unrelated history.
+    """
+
+    def __init__(self, tips: Iterable[str]) -> None:
+        self.tips = sorted(set(tips))
+        self.bit = {tip: 1 << index for index, tip in enumerate(self.tips)}
+        self.first_parent: Dict[str, Optional[str]] = {}
+        # reach[c] has the bit of every tip that c is reachable from.
+        self.reach: Dict[str, int] = {}
+        # Mask of the tip's group, the answer for commits that were not loaded.
+        self.group: Dict[str, int] = {}
+        shared: List[str] = []
+        for members, bases in _components(self.tips) if self.tips else []:
+            mask = 0
+            for tip in members:
+                mask |= self.bit[tip]
+            for tip in members:
+                self.group[tip] = mask
+            shared.extend(bases)
+        order: List[Tuple[str, Tuple[str, ...]]] = list(gitio.iter_commit_parents(self.tips, shared))
+        reach = self.reach
+        for commit, parents in order:
+            self.first_parent[commit] = parents[0] if parents else None
+        for commit, parents in order:
+            # --topo-order lists children before parents, so reach[commit] is final here.
+            mask = reach.get(commit, 0) | self.bit.get(commit, 0)
+            reach[commit] = mask
+            for parent in parents:
+                reach[parent] = reach.get(parent, 0) | mask
+
+    def _reach(self, commit: str, outside: int) -> int:
+        return self.reach.get(commit, 0) if commit in self.first_parent else outside
+
+    def compare(self, tip: str, candidates: Iterable[str], limit: float = math.inf) -> _Pairs:
+        """Walk *tip*'s first-parent line and record where it meets each candidate.
+
+        Candidates that already contain *tip* are skipped. The walk stops after
+        :data:`_LEVELS` meetings or *limit* steps (how far an earlier result
+        is complete), so rechecking against a few new tips stays cheap.
+        """
+
+        wanted = 0
+        for candidate in candidates:
+            wanted |= self.bit.get(candidate, 0)
+        # Where *tip*'s walk leaves the loaded commits, exactly its group has been met.
+        outside = self.group[tip]
+        wanted &= ~self._reach(tip, outside)
+        result = _Pairs()
+        commit: Optional[str] = tip
+        distance = 0
+        while commit is not None and wanted:
+            if distance > limit:
+                result.complete_to = limit
+                break
+            hits = self._reach(commit, outside) & wanted
+            if hits:
+                winners = [candidate for candidate in self.tips if self.bit[candidate] & hits]
+                result.levels.append(_Level(distance, commit, winners))
+                wanted &= ~hits
+                if len(result.levels) == _LEVELS:
+                    result.complete_to = distance
+                    break
+            # Outside the loaded part the whole group has been met, so the loop ends there.
+            commit = self.first_parent.get(commit)
+            distance += 1
+        return result
+
+
+def _merge(old: _Pairs, new: _Pairs) -> _Pairs:
+    by_distance: Dict[int, _Level] = {}
+    for level in [*old.levels, *new.levels]:
+        known = by_distance.get(level.distance)
+        if known is None:
+            by_distance[level.distance] = _Level(level.distance, level.fork_point, list(level.winners))
+        else:
+            known.winners = sorted(set(known.winners) | set(level.winners))
+    complete_to = min(old.complete_to, new.complete_to)
+    levels = [by_distance[distance] for distance in sorted(by_distance) if distance <= complete_to]
+    if len(levels) > _LEVELS:
+        levels = levels[:_LEVELS]
+        complete_to = levels[-1].distance
+    return _Pairs(levels, complete_to)
+
+
+def _prune(pairs: _Pairs, live: Set[str]) -> Optional[_Pairs]:
+    """Forget tips that no longer exist; None when the result cannot be trusted anymore."""
+
+    levels = []
+    for level in pairs.levels:
+        winners = [tip for tip in level.winners if tip in live]
+        if winners:
+            levels.append(_Level(level.distance, level.fork_point, winners))
+    if not levels and pairs.complete_to != math.inf:
+        # Every known candidate moved and the ones beyond were never compared.
+        return None
+    return _Pairs(levels, pairs.complete_to)
+
+
+class _Cache:
+    """Pair results per branch tip in ``.git/bettergit/lineage.json``."""
+
+    def __init__(self, git_dir: Optional[Path]) -> None:
+        self.path = git_dir / _CACHE_FILE if git_dir is not None else None
+        self.seen: Set[str] = set()
+        self.pairs: Dict[str, _Pairs] = {}
+        self._load()
+
+    def _load(self) -> None:
+        data = load_json(self.path)
+        if data.get("version") != _CACHE_VERSION:
+            return
+        try:
+            seen = set(data["seen"])
+            pairs = {
+                tip: _Pairs(
+                    [_Level(int(level[0]), str(level[1]), list(level[2])) for level in entry[0]],
+                    math.inf if entry[1] is None else float(entry[1]),
+                )
+                for tip, entry in dict(data["pairs"]).items()
+            }
+        except (ValueError, KeyError, TypeError, IndexError):
+            return
+        self.seen, self.pairs = seen, pairs
+
+    def save(self, live: Set[str]) -> None:
+        if self.path is None:
+            return
+        data: Dict[str, Any] = {
+            "version": _CACHE_VERSION,
+            "seen": sorted(live),
+            "pairs": {
+                tip: [
+                    [[level.distance, level.fork_point, level.winners] for level in pairs.levels],
+                    None if pairs.complete_to == math.inf else pairs.complete_to,
+                ]
+                for tip, pairs in self.pairs.items()
+                if tip in live
+            },
+        }
+        save_json(self.path, data)
+
+    def update(self, live: Set[str]) -> None:
+        """Bring the pairs up to date for *live* tips, loading the graph only if needed."""
+
+        fresh = live - self.seen
+        graph: Optional[_Graph] = None
+        for tip in sorted(live):
+            known = self.pairs.get(tip)
+            pairs = _prune(known, live) if known is not None else None
+            if pairs is not None and not fresh:
+                self.pairs[tip] = pairs
+                continue
+            if graph is None:
+                graph = _Graph(live)
+            if pairs is not None:
+                # Pairs against tips seen last time are unchanged; compare only the new ones.
+                self.pairs[tip] = _merge(pairs, graph.compare(tip, fresh - {tip}, pairs.complete_to))
+            else:
+                self.pairs[tip] = graph.compare(tip, live - {tip})
+        if graph is not None or self.seen != live:
+            self.save(live)
+            self.seen = set(live)
+
+
+def _trunks(names: Iterable[str]) -> Set[str]:
+    trunks = {name for name in names if name in _TRUNK_NAMES}
+    try:
+        target = refs.discover().read_raw("refs/remotes/origin/HEAD")
+    except refs.UnsupportedRepository:
+        target = None
+    prefix = "ref: refs/remotes/origin/"
+    if target and target.startswith(prefix):
+        trunks.add(target[len(prefix):])
+    return trunks
+
+
+def _find_cycle(parents: Mapping[str, Optional[Lineage]]) -> List[str]:
+    state: Dict[str, int] = {}  # 1 = on the current path, 2 = done
+    for start in sorted(parents):
+        path: List[str] = []
+        name: Optional[str] = start
+        while name is not None and name not in state:
+            state[name] = 1
+            path.append(name)
+            lineage = parents.get(name)
+            name = lineage.parent if lineage is not None else None
+        if name is not None and state[name] == 1:
+            return path[path.index(name):]
+        for visited in path:
+            state[visited] = 2
+    return []
+
+
+def infer_parents(tips: Optional[Mapping[str, str]] = None) -> Dict[str, Lineage]:
+    """Infer the closest parent of every local branch from the commit graph.
+
+    A branch's parent is the branch whose history its first-parent line meets
+    first; branches that already contain it are skipped, and a branch without
+    commits of its own gets a branch at the same tip. Trunks (`main`,
+    `master`, `trunk` and origin's default branch) get no parent, and when
+    siblings would name each other the one with more commits since the fork
+    point keeps its next-closest parent instead.
+
+    Results are memoised per (branch tip, candidate tip) pair in
+    ``.git/bettergit/lineage.json``: when no tip moved, no git command runs at
+    all, and otherwise one `git rev-list` loads the history not shared by
+    every branch and only pairs involving moved tips are compared.
+    """
+
+    tips = dict(gitio.branch_tips() if tips is None else tips)
+    try:
+        git_dir: Optional[Path] = gitio.git_dir()
+    except gitio.GitError:
+        git_dir = None
+    cache = _Cache(git_dir)
+    cache.update(set(tips.values()))
+
+    names_by_tip: Dict[str, List[str]] = {}
+    for name, tip in sorted(tips.items()):
+        names_by_tip.setdefault(tip, []).append(name)
+    trunks = _trunks(tips)
+    excluded: Dict[str, Set[str]] = {name: {name} for name in tips}
+
+    def choose(name: str) -> Optional[Lineage]:
+        if name in trunks:
+            return None
+        tip = tips[name]
+        # Branches sharing a tip hang off one of them: a trunk, else the first by name.
+        peers = sorted(names_by_tip[tip], key=lambda peer: (peer not in trunks, peer))
+        if peers[0] != name and peers[0] not in excluded[name]:
+            return Lineage(name, peers[0], tip, 0)
+        for level in cache.pairs.get(tip, _Pairs()).levels:
+            # Prefer a branch sitting right at the fork point, then a trunk.
+            options = [
+                (candidate != level.fork_point, other not in trunks, other)
+                for candidate in level.winners
+                for other in names_by_tip.get(candidate, [])
+                if other not in excluded[name]
+            ]
+            if options:
+                return Lineage(name, min(options)[2], level.fork_point, level.distance)
+        return None
+
+    parents = {name: choose(name) for name in tips}
+    while True:
+        cycle = _find_cycle(parents)
+        if not cycle:
+            break
+        root = min(cycle, key=lambda name: (-parents[name].distance, name))  # type: ignore[union-attr]
+        excluded[root].update(cycle)
+        parents[root] = choose(root)
+    return {name: lineage for name, lineage in parents.items() if lineage is not None}
@@ -0,0 +1,434 @@
+from __future__ import annotations
+
+import mmap
+import os
+from pathlib import Path
+from typing import Iterator
+
+from bettergit.core.statefile import FileStamp
+
+__all__ = [
+    "UnsupportedRepository",
+    "RefStore",
+    "branch_tips",
+    "current_branch",
+    "discover",
+    "list_branches",
+    "upstream",
+]
+
+_SYMREF_PREFIX = "ref: "
+_HEADS = "refs/heads/"
+_REMOTES = "refs/remotes/"
+
+
+class UnsupportedRepository(RuntimeError):
+    """Raised when the repository layout needs git itself to be interpreted."""
+
+
+class _PackedRefs:
+    """Read-only view of a `packed-refs` file backed by a memory map."""
+
+    def __init__(self, path: Path) -> None:
+        self.stamp = FileStamp.of(path)
+        self._data: bytes | mmap.mmap = b""
+        self._start = 0
+        self._sorted = False
+        if self.stamp is None or self.stamp.size == 0:
+            return
+        with path.open("rb") as handle:
+            if os.name == "nt":
+                # A live mapping would stop git from replacing the file on Windows.
+                self._data = handle.read()
+            else:
+                self._data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._data[:1] == b"#":
+            end = self._data.find(b"\n")
+            header = bytes(self._data[: end if end >= 0 else len(self._data)])
+            self._sorted = b" sorted" in header
+            self._start = end + 1 if end >= 0 else len(self._data)
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b""
+
+    def _line_start(self, pos: int) -> int:
+        return self._data.rfind(b"\n", self._start, pos) + 1 if pos > self._start else self._start
+
+    def _next_line(self, pos: int) -> tuple[bytes, int]:
+        end = self._data.find(b"\n", pos)
+        if end < 0:
+            end = len(self._data)
+        return bytes(self._data[pos:end]), end + 1
+
+    def _entries_from(self, pos: int) -> Iterator[tuple[str, str]]:
+        size = len(self._data)
+        while pos < size:
+            line, pos = self._next_line(pos)
+            if not line or line[:1] in (b"^", b"#"):
+                continue
+            oid, _, name = line.partition(b" ")
+            yield name.decode("utf-8", errors="replace"), oid.decode("ascii", errors="replace")
+
+    def _lower_bound(self, key: bytes) -> int:
+        """Return the offset of the first record whose refname is >= *key*."""
+
+        if not self._sorted:
+            return self._start
+        lo, hi = self._start, len(self._data)
+        while hi - lo > 256:
+            pos = max(lo, self._line_start((lo + hi) // 2))
+            line, after = self._next_line(pos)
+            # Peeled lines ("^<oid>") belong to the record above; move to the next record.
+            while line[:1] == b"^" and after < hi:
+                pos = after
+                line, after = self._next_line(pos)
+            if pos >= hi or line[:1] == b"^":
+                break
+            if line.partition(b" ")[2] < key:
+                lo = after
+            else:
+                hi = pos
+        while lo < hi:
+            line, after = self._next_line(lo)
+            if line[:1] != b"^" and line.partition(b" ")[2] >= key:
+                break
+            lo = after
+        return lo
+
+    def lookup(self, refname: str) -> str | None:
+        for name, oid in self.iter_prefix(refname):
+            if name == refname:
+                return oid
+            if self._sorted:
+                break
+        return None
+
+    def iter_prefix(self, prefix: str) -> Iterator[tuple[str, str]]:
+        for name, oid in self._entries_from(self._lower_bound(prefix.encode("utf-8"))):
+            if name.startswith(prefix):
+                yield name, oid
+            elif self._sorted and name > prefix:
+                return
+
+
+class RefStore:
+    """Resolve HEAD, branches and upstreams straight from the `.git` directory.
+
+    Supports the classic `files` ref backend (loose refs plus `packed-refs`) in
+    regular checkouts and linked worktrees. Anything else raises
+    :class:`UnsupportedRepository` so that callers can fall back to git.
+    """
+
+    def __init__(self, git_dir: Path, common_dir: Path) -> None:
+        self.git_dir = git_dir
+        self.common_dir = common_dir
+        self._packed: _PackedRefs | None = None
+        self._config: dict[str, list[str]] | None = None
+        self._config_stamp: FileStamp | None = None
+        self._snapshots: dict[str, tuple[tuple[object, ...], list[tuple[str, str]]]] = {}
+        if (common_dir / "reftable").exists():
+            raise UnsupportedRepository("reftable ref storage")
+        storage = self.config_value("extensions.refstorage")
+        if storage and storage.lower() != "files":
+            raise UnsupportedRepository(f"{storage} ref storage")
+
+    def close(self) -> None:
+        """Release the packed-refs map; the store reopens it if used again."""
+
+        if self._packed is not None:
+            self._packed.close()
+            self._packed = None
+
+    # -- refs ----------------------------------------------------------------
+
+    def _packed_refs(self) -> _PackedRefs:
+        path = self.common_dir / "packed-refs"
+        if self._packed is None or self._packed.stamp != FileStamp.of(path):
+            previous, self._packed = self._packed, _PackedRefs(path)
+            if previous is not None:
+                previous.close()  # a long-lived process would otherwise keep every old mapping open
+        return self._packed
+
+    def _ref_path(self, refname: str) -> Path:
+        # HEAD and other pseudo refs are per worktree, everything under refs/ is shared.
+        base = self.common_dir if refname.startswith("refs/") else self.git_dir
+        return base / refname
+
+    def read_raw(self, refname: str) -> str | None:
+        """Return the raw value of *refname* (an object id or `ref: <target>`)."""
+
+        try:
+            return self._ref_path(refname).read_text(encoding="utf-8").strip()
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+            pass
+        except OSError as exc:
+            raise UnsupportedRepository(str(exc)) from exc
+        return self._packed_refs().lookup(refname)
+
+    def resolve(self, refname: str) -> str | None:
+        """Return the object id *refname* points to, following symbolic refs."""
+
+        for _ in range(5):
+            value = self.read_raw(refname)
+            if value is None or not value.startswith(_SYMREF_PREFIX):
+                return value
+            refname = value[len(_SYMREF_PREFIX):]
+        raise UnsupportedRepository("symbolic ref chain too deep")
+
+    def iter_refs(self, prefix: str) -> list[tuple[str, str]]:
+        """Return ``(refname, raw value)`` pairs under *prefix*, sorted by name.
+
+        The result is kept as a snapshot that stays valid while `packed-refs`
+        and the mtimes of the loose ref directories are unchanged (git updates
+        loose refs by renaming a lock file into place, which touches the
+        directory), so a long-lived process does not re-read every ref file.
+        """
+
+        packed = self._packed_refs()
+        root = self.common_dir / prefix
+        layout: list[tuple[str, list[str]]] = []
+        stamp: list[object] = [packed.stamp]
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            layout.append((dirpath, filenames))
+            stamp.append(FileStamp.of(Path(dirpath)))
+        key = tuple(stamp)
+        cached = self._snapshots.get(prefix)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        found: dict[str, str] = dict(packed.iter_prefix(prefix))
+        for dirpath, filenames in layout:
+            for filename in filenames:
+                if filename.endswith(".lock"):
+                    continue
+                path = Path(dirpath) / filename
+                refname = path.relative_to(self.common_dir).as_posix()
+                try:
+                    found[refname] = path.read_text(encoding="utf-8").strip()
+                except OSError:
+                    continue
+        snapshot = sorted(found.items())
+        self._snapshots[prefix] = (key, snapshot)
+        return snapshot
+
+    def head(self) -> str | None:
+        """Return the branch HEAD points to, or None when HEAD is detached."""
+
+        value = self.read_raw("HEAD")
+        if value is None:
+            raise UnsupportedRepository("missing HEAD")
+        if not value.startswith(_SYMREF_PREFIX):
+            return None
+        target = value[len(_SYMREF_PREFIX):]
+        if not target.startswith(_HEADS):
+            raise UnsupportedRepository(f"HEAD points outside refs/heads: {target}")
+        return target[len(_HEADS):]
+
+    # -- configuration -------------------------------------------------------
+
+    def config(self) -> dict[str, list[str]]:
+        path = self.common_dir / "config"
+        stamp = FileStamp.of(path)
+        if self._config is None or stamp != self._config_stamp:
+            self._config = _parse_config(path) if stamp is not None else {}
+            self._config_stamp = stamp
+        return self._config
+
+    def config_value(self, key: str) -> str | None:
+        values = self.config().get(key)
+        return values[-1] if values else None
+
+    def upstream(self, branch: str) -> str | None:
+        """Return the short upstream name of *branch*, matching `rev-parse --abbrev-ref`."""
+
+        remote = self.config_value(f"branch.{branch}.remote")
+        merge = self.config_value(f"branch.{branch}.merge")
+        if not remote or not merge or not merge.startswith(_HEADS):
+            return None
+        short = merge[len(_HEADS):]
+        if remote == ".":
+            tracking_ref, name = merge, short
+        else:
+            fetch = self.config().get(f"remote.{remote}.fetch", [])
+            if fetch and f"+refs/heads/*:refs/remotes/{remote}/*" not in fetch:
+                raise UnsupportedRepository("non-default fetch refspec")
+            tracking_ref, name = f"{_REMOTES}{remote}/{short}", f"{remote}/{short}"
+        return name if self.resolve(tracking_ref) else None
+
+
+def _parse_config(path: Path) -> dict[str, list[str]]:
+    """Parse a git config file into ``{"section.subsection.key": [values]}``.
+
+    Section and key names are lowercased, subsections keep their case, like
+    `git config --list`. Anything this parser is not sure about (includes,
+    malformed lines, unknown escapes) raises :class:`UnsupportedRepository`
+    so that callers ask git instead.
+    """
+
+    values: dict[str, list[str]] = {}
+    section = ""
+    try:
+        text = path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError) as exc:
+        raise UnsupportedRepository(str(exc)) from exc
+    lines = iter(text.splitlines())
+    for raw in lines:
+        line = raw.lstrip()
+        if line.startswith("["):
+            end = _header_end(line)
+            header = line[1:end]
+            name, _, sub = header.partition(" ")
+            sub = sub.strip()
+            if sub:
+                if len(sub) < 2 or not (sub.startswith('"') and sub.endswith('"')):
+                    raise UnsupportedRepository("malformed config section")
+                sub = sub[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+            section = f"{name.lower()}.{sub}" if sub else name.lower()
+            if name.lower() in ("include", "includeif"):
+                raise UnsupportedRepository("config includes")
+            # A key may follow the header on the same line: `[core] bare = false`.
+            line = line[end + 1:].lstrip()
+        if not line.strip() or line[0] in "#;":
+            continue
+        key, eq, rest = line.partition("=")
+        key = key.strip()
+        if not section or not _is_config_key(key):
+            raise UnsupportedRepository("unrecognised config line")
+        if not eq:
+            values.setdefault(f"{section}.{key.lower()}", []).append("true")
+            continue
+        value, continued = _config_value(rest)
+        while continued:
+            # A trailing backslash joins the next line into the value.
+            rest = rest[:-1] + next(lines, "")
+            value, continued = _config_value(rest)
+        values.setdefault(f"{section}.{key.lower()}", []).append(value)
+    return values
+
+
+def _header_end(line: str) -> int:
+    quoted = False
+    escaped = False
+    for index, char in enumerate(line):
+        if escaped:
+            escaped = False
+        elif char == "\\" and quoted:
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif char == "]" and not quoted:
+            return index
+    raise UnsupportedRepository("malformed config section")
+
+
+def _is_config_key(key: str) -> bool:
+    return bool(key) and key[0].isascii() and key[0].isalpha() and all(
+        char.isascii() and (char.isalnum() or char == "-") for char in key
+    )
+
+
+def _config_value(raw: str) -> tuple[str, bool]:
+    """Decode a config value; the flag tells whether it continues on the next line."""
+
+    out: list[str] = []
+    quoted = False
+    chars = iter(raw)
+    for char in chars:
+        if char == '"':
+            quoted = not quoted
+        elif char == "\\":
+            escaped = next(chars, None)
+            if escaped is None:
+                return "".join(out).strip(), True
+            if escaped not in 'ntb"\\':
+                raise UnsupportedRepository("unknown escape in config value")
+            out.append({"n": "\n", "t": "\t", "b": "\b"}.get(escaped, escaped))
+        elif char in "#;" and not quoted:
+            break
+        else:
+            out.append(char)
+    if quoted:
+        raise UnsupportedRepository("unterminated quote in config value")
+    return "".join(out).strip(), False
+
+
+# Parsed repositories, least recently used first; bounded for the long-lived daemon.
+_STORES: dict[str, RefStore] = {}
+_MAX_STORES = 16
+
+
+def discover(start: Path | None = None) -> RefStore:
+    """Locate the repository containing *start* (defaults to the cwd)."""
+
+    if "GIT_DIR" in os.environ or "GIT_COMMON_DIR" in os.environ:
+        raise UnsupportedRepository("GIT_DIR override")
+    here = (start or Path.cwd()).resolve()
+    for candidate in (here, *here.parents):
+        dotgit = candidate / ".git"
+        if dotgit.is_dir():
+            git_dir = dotgit
+        elif dotgit.is_file():
+            content = dotgit.read_text(encoding="utf-8").strip()
+            if not content.startswith("gitdir: "):
+                raise UnsupportedRepository("unrecognised .git file")
+            git_dir = (candidate / content[len("gitdir: "):]).resolve()
+        else:
+            continue
+        key = str(git_dir)
+        store = _STORES.pop(key, None)
+        if store is None:
+            common_dir = git_dir
+            commondir_file = git_dir / "commondir"
+            if commondir_file.is_file():
+                common_dir = (git_dir / commondir_file.read_text(encoding="utf-8").strip()).resolve()
+            store = RefStore(git_dir, common_dir)
+        _STORES[key] = store
+        while len(_STORES) > _MAX_STORES:
+            _STORES.pop(next(iter(_STORES))).close()
+        return store
+    raise UnsupportedRepository("not inside a work tree")
+
+
+def current_branch() -> str:
+    """Return the current branch name, or "HEAD" when detached."""
+
+    return discover().head() or "HEAD"
+
+
+def list_branches(all_: bool = False) -> list[str]:
+    """Return branch names in the order `git branch` prints them."""
+
+    store = discover()
+    if store.head() is None:
+        # git prints a synthetic "(HEAD detached at ...)" entry we do not replicate.
+        raise UnsupportedRepository("detached HEAD")
+    names = [name[len(_HEADS):] for name, _ in store.iter_refs(_HEADS)]
+    if all_:
+        for name, value in store.iter_refs(_REMOTES):
+            short = name[len("refs/"):]
+            if value.startswith(_SYMREF_PREFIX):
+                target = value[len(_SYMREF_PREFIX):]
+                short = f"{short} -> {target[len(_REMOTES):] if target.startswith(_REMOTES) else target}"
+            names.append(short)
+    return names
+
+
+def branch_tips() -> dict[str, str]:
+    """Return ``{branch: object id}`` for every local branch."""
+
+    store = discover()
+    tips: dict[str, str] = {}
+    for name, value in store.iter_refs(_HEADS):
+        oid = store.resolve(name) if value.startswith(_SYMREF_PREFIX) else value
+        if oid:
+            tips[name[len(_HEADS):]] = oid
+    return tips
+
+
+def upstream(branch: str) -> str | None:
+    """Return the upstream of *branch* (e.g. "origin/main") or None."""
+
+    return discover().upstream(branch)
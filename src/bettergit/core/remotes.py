@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import fnmatch
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from bettergit.core import gitio, refs
+from bettergit.core.statefile import FileStamp, load_json, save_json
+
+__all__ = [
+    "DEFAULT_MAX_AGE_S",
+    "RemoteRefs",
+    "branch_exists",
+    "find_tag",
+    "invalidate",
+    "record_deletions",
+    "record_push",
+    "record_updates",
+    "snapshot",
+]
+
+_STATE_FILE = Path("bettergit") / "remote-refs.json"
+_STATE_VERSION = 1
+DEFAULT_MAX_AGE_S = 300.0
+
+
+@dataclass
+class RemoteRefs:
+    """What a remote advertised in one `git ls-remote`, plus our own updates since."""
+
+    remote: str
+    url: Optional[str]
+    fetched_at: float
+    refs: Dict[str, str] = field(default_factory=dict)
+
+    def branch(self, name: str) -> Optional[str]:
+        return self.refs.get(f"refs/heads/{name}")
+
+    def tag(self, name: str) -> Optional[str]:
+        return self.refs.get(f"refs/tags/{name}")
+
+    def branches(self) -> List[str]:
+        return sorted(ref[len("refs/heads/"):] for ref in self.refs if ref.startswith("refs/heads/"))
+
+    def tags(self) -> List[str]:
+        return sorted(ref[len("refs/tags/"):] for ref in self.refs if ref.startswith("refs/tags/"))
+
+    def match(self, prefix: str, patterns: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """Resolve names and shell-style globs under *prefix* (e.g. ``refs/tags/``).
+
+        Returns the matching full ref names (sorted) and the patterns that
+        matched nothing. ``*`` also matches ``/``, so ``release/*`` covers
+        nested names.
+        """
+
+        names = [ref[len(prefix):] for ref in self.refs if ref.startswith(prefix)]
+        matched: Set[str] = set()
+        unmatched: List[str] = []
+        for pattern in patterns:
+            if any(char in pattern for char in "*?["):
+                hits = [name for name in names if fnmatch.fnmatchcase(name, pattern)]
+            else:
+                hits = [pattern] if prefix + pattern in self.refs else []
+            if not hits:
+                unmatched.append(pattern)
+            matched.update(prefix + name for name in hits)
+        return sorted(matched), unmatched
+
+
+# Snapshots already read by this process, per state file, with the file's
+# (mtime, size) so a long-lived process notices writes from other runs.
+_MEMORY: Dict[Path, Tuple[Optional[FileStamp], Dict[str, RemoteRefs]]] = {}
+
+
+def _state_path() -> Optional[Path]:
+    try:
+        return gitio.git_dir() / _STATE_FILE
+    except gitio.GitError:
+        return None
+
+
+def _remote_url(remote: str) -> Optional[str]:
+    try:
+        return refs.discover().config_value(f"remote.{remote}.url")
+    except refs.UnsupportedRepository:
+        return None
+
+
+def _load(path: Optional[Path]) -> Dict[str, RemoteRefs]:
+    if path is None:
+        return {}
+    stamp = FileStamp.of(path)
+    cached = _MEMORY.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    snapshots: Dict[str, RemoteRefs] = {}
+    data = load_json(path)
+    try:
+        if data.get("version") == _STATE_VERSION:
+            for remote, entry in dict(data["remotes"]).items():
+                snapshots[remote] = RemoteRefs(remote, entry.get("url"), float(entry["fetched_at"]), dict(entry["refs"]))
+    except (ValueError, KeyError, TypeError, AttributeError):
+        snapshots = {}
+    _MEMORY[path] = (stamp, snapshots)
+    return snapshots
+
+
+def _save(path: Optional[Path], snapshots: Mapping[str, RemoteRefs]) -> None:
+    if path is None:
+        return
+    data: Dict[str, Any] = {
+        "version": _STATE_VERSION,
+        "remotes": {
+            remote: {"url": item.url, "fetched_at": item.fetched_at, "refs": item.refs}
+            for remote, item in snapshots.items()
+        },
+    }
+    save_json(path, data)
+    _MEMORY[path] = (FileStamp.of(path), dict(snapshots))
+
+
+def snapshot(remote: str = "origin", max_age: float = DEFAULT_MAX_AGE_S, refresh: bool = False) -> RemoteRefs:
+    """Return the refs on *remote*, running `git ls-remote` only when needed.
+
+    The snapshot is kept in ``.git/bettergit/remote-refs.json`` and reused for
+    *max_age* seconds (unless *refresh* is set or the remote's URL changed),
+    so repeated existence checks are dictionary lookups.
+    """
+
+    path = _state_path()
+    snapshots = _load(path)
+    url = _remote_url(remote)
+    current = snapshots.get(remote)
+    if (
+        current is not None
+        and not refresh
+        and current.url == url
+        and 0 <= time.time() - current.fetched_at < max_age
+    ):
+        return current
+    current = RemoteRefs(remote, url, time.time(), gitio.ls_remote(remote))
+    snapshots[remote] = current
+    _save(path, snapshots)
+    return current
+
+
+def branch_exists(
+    branch: str, remote: str = "origin", max_age: float = DEFAULT_MAX_AGE_S, refresh: bool = False
+) -> bool:
+    """Return True if *branch* exists on *remote*, according to the snapshot."""
+
+    return snapshot(remote, max_age, refresh).branch(branch) is not None
+
+
+def find_tag(
+    name: str, remote: str = "origin", max_age: float = DEFAULT_MAX_AGE_S, refresh: bool = False
+) -> Optional[str]:
+    """Return the object id of tag *name* on *remote* according to the snapshot, or None."""
+
+    return snapshot(remote, max_age, refresh).tag(name)
+
+
+def record_updates(remote: str, updates: Mapping[str, Optional[str]]) -> None:
+    """Apply our own pushes to a cached snapshot: ``{refname: new id}``, None for deletions.
+
+    Does nothing when *remote* has no snapshot yet; the next lookup fetches one.
+    """
+
+    path = _state_path()
+    snapshots = _load(path)
+    current = snapshots.get(remote)
+    if current is None or not updates:
+        return
+    for refname, oid in updates.items():
+        if oid is None:
+            current.refs.pop(refname, None)
+        else:
+            current.refs[refname] = oid
+    _save(path, snapshots)
+
+
+def invalidate(remote: str) -> None:
+    """Forget the snapshot of *remote*, e.g. after a push whose outcome is unknown."""
+
+    path = _state_path()
+    snapshots = _load(path)
+    if snapshots.pop(remote, None) is not None:
+        _save(path, snapshots)
+
+
+def record_push(remote: str, refnames: Iterable[str]) -> None:
+    """Record that the local *refnames* were just pushed to *remote* as they are now."""
+
+    record_updates(remote, {refname: gitio.local_oid(refname) for refname in refnames})
+
+
+def record_deletions(remote: str, results: Sequence[gitio.RefUpdate]) -> None:
+    """Apply the outcome of :func:`bettergit.core.gitio.delete_remote_refs` to the snapshot.
+
+    Refs the remote rejected are unchanged, but when a push itself failed the
+    remote's state is unknown and the snapshot is dropped.
+    """
+
+    if any(not result.ok and not result.summary.startswith(("remote rejected", "rejected", "skipped")) for result in results):
+        invalidate(remote)
+    else:
+        record_updates(remote, {result.ref: None for result in results if result.ok})
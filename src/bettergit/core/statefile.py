@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+__all__ = ["FileStamp", "load_json", "save_json"]
+
+
+@dataclass(frozen=True)
+class FileStamp:
+    """Modification time and size of a file, to notice when it was rewritten."""
+
+    mtime_ns: int
+    size: int
+
+    @classmethod
+    def of(cls, path: Path) -> Optional["FileStamp"]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return cls(stat.st_mtime_ns, stat.st_size)
+
+
+def load_json(path: Optional[Path]) -> Dict[str, Any]:
+    """Return the JSON object stored at *path*, or ``{}`` if it is missing or unreadable."""
+
+    if path is None:
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_json(path: Optional[Path], data: Any) -> bool:
+    """Atomically replace *path* with *data* as JSON; return False if it could not be written.
+
+    State files are best effort: a read-only or full disk only costs the cache.
+    """
+
+    if path is None:
+        return False
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handle, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as tmp:
+                json.dump(data, tmp, separators=(",", ":"))
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+    except OSError:
+        return False
+    return True
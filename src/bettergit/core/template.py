@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple
+from typing import Iterable, Optional, Tuple
+
+from bettergit.core import diffparse
 
 __all__ = [
     "generate_title",
@@ -16,12 +18,16 @@ def generate_title(diff: str, lang: str = "en") -> Optional[str]:
     return None
 
 
-def summarize_diff(diff: str) -> Tuple[int, int]:
-    """Return counts of added and removed lines from a unified diff."""
+def summarize_diff(diff: str | Iterable[str] | diffparse.Diff) -> Tuple[int, int]:
+    """Return counts of added and removed lines from a unified diff.
+
+    Accepts the diff text, any iterable of its lines (e.g. a stream) or an
+    already parsed :class:`~bettergit.core.diffparse.Diff`.
+    """
 
-    added = sum(1 for line in diff.splitlines() if line.startswith("+") and not line.startswith("+++"))
-    removed = sum(1 for line in diff.splitlines() if line.startswith("-") and not line.startswith("---"))
-    return added, removed
+    if not isinstance(diff, diffparse.Diff):
+        diff = diffparse.parse(diff.splitlines() if isinstance(diff, str) else diff, max_retained_chars=0)
+    return diff.added, diff.removed
 
 
 def build_summary(commit_type: str, scope: str | None, added: int, removed: int, cfg) -> str:
@@ -1 +1 @@
-from .pipeline import generate_commit
+from .pipeline import generate_candidates, generate_commit, warm_up
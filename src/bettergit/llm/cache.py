@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from bettergit.core.statefile import load_json, save_json
+
+__all__ = ["CommitCache", "cache_key"]
+
+_CACHE_SUBDIR = Path("bettergit") / "llm-cache"
+
+
+def cache_key(tree_id: str, **params: Any) -> str:
+    """Return a stable key for *tree_id* combined with generation *params*."""
+
+    material = json.dumps({"tree": tree_id, **params}, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class CommitCache:
+    """Generated commit messages stored as one JSON file per key under the git dir.
+
+    Entries are evicted least-recently-used first once more than *max_entries*
+    exist; a hit refreshes the entry's modification time.
+    """
+
+    def __init__(self, git_dir: Path, max_entries: int = 128) -> None:
+        self.root = git_dir / _CACHE_SUBDIR
+        self.max_entries = max_entries
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        data = load_json(path)
+        if not data:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        if save_json(self._path(key), value):
+            self._evict()
+
+    def _evict(self) -> None:
+        try:
+            entries = [(entry.stat().st_mtime_ns, entry) for entry in self.root.glob("*.json")]
+        except OSError:
+            return
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, path in entries[: len(entries) - self.max_entries]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
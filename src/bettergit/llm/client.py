@@ -1,55 +1,218 @@
 from __future__ import annotations
 
+import http.client
 import json
+import random
 import time
-import urllib.error
-import urllib.request
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional, Tuple
 
-__all__ = ["OllamaClient"]
+from bettergit.llm.context import predict_tokens
+from bettergit.llm.http import ConnectionPool, HTTPStatusError, get_pool
+from bettergit.llm.metrics import RequestStats, stats_from_response
+from bettergit.llm.schema import extract_object
+
+__all__ = ["OllamaClient", "OllamaError"]
+
+
+class OllamaError(RuntimeError):
+    """Raised when Ollama reports an error inside a streamed response."""
 
 
 class OllamaClient:
-    """Minimal HTTP client for talking to an Ollama instance."""
+    """Minimal HTTP client for talking to an Ollama instance.
 
-    def __init__(self, model: str, host: str, temperature: float, max_tokens: int, timeout_s: int = 180) -> None:
+    Requests go through a shared keep-alive :class:`~bettergit.llm.http.ConnectionPool`
+    per host, so repeated calls in one session reuse the same TCP connection.
+    Opening a connection is bounded by *connect_timeout_s* and each read by
+    *timeout_s*; transient failures are retried *retries* times with jittered
+    exponential backoff, while refused connections and timeouts fail at once.
+    When *num_ctx* is set it is sent with every request (including
+    :meth:`preload`) and ``num_predict`` is cut so prompt and answer fit in it.
+    A private *pool* lets :meth:`close` cancel this client's requests only.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        host: str,
+        temperature: float,
+        max_tokens: int,
+        timeout_s: int = 180,
+        pool_size: int = 4,
+        recorder: Optional[Callable[[RequestStats], None]] = None,
+        connect_timeout_s: float = 2.0,
+        retries: int = 2,
+        backoff_s: float = 0.5,
+        keep_alive: Optional[str] = None,
+        num_ctx: Optional[int] = None,
+        pool: Optional[ConnectionPool] = None,
+    ) -> None:
         self.model = model
         self.host = host.rstrip("/")
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.timeout_s = timeout_s
+        self.connect_timeout_s = connect_timeout_s
+        self.retries = max(0, retries)
+        self.backoff_s = backoff_s
+        # How long Ollama keeps the model loaded after a request (e.g. "30m"); None = server default.
+        self.keep_alive = keep_alive or None
+        # Context window for every request; None leaves it to the server (see llm.context).
+        self.num_ctx = num_ctx
+        self.pool: ConnectionPool = pool if pool is not None else get_pool(self.host, pool_size)
+        # Seconds from sending the request to the first streamed token (streaming only).
+        self.last_ttft: Optional[float] = None
+        # Receives a RequestStats for every generate() call, successful or not.
+        self.recorder = recorder
+
+    def generate(
+        self,
+        system: str,
+        user: str,
+        on_text: Optional[Callable[[str], None]] = None,
+        temperature: Optional[float] = None,
+        seed: Optional[int] = None,
+        schema: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Send a chat request and return the decoded JSON answer.
 
-    def generate(self, system: str, user: str) -> Dict[str, Any]:
-        body = {
+        With *on_text* the answer is streamed and each content fragment is passed
+        to the callback as it arrives; the final text is validated the same way.
+        *temperature* and *seed* override the client defaults for this request.
+        *schema* is sent as Ollama's structured-output ``format``; the answer is
+        read with :func:`~bettergit.llm.schema.extract_object`, so the request is
+        only repeated when no JSON object can be recovered at all.
+        """
+
+        options: Dict[str, Any] = {
+            "temperature": self.temperature if temperature is None else temperature,
+            "num_predict": predict_tokens(system, user, self.num_ctx, self.max_tokens),
+        }
+        if self.num_ctx:
+            options["num_ctx"] = self.num_ctx
+        if seed is not None:
+            options["seed"] = seed
+        body: Dict[str, Any] = {
             "model": self.model,
-            "stream": False,
-            "options": {
-                "temperature": self.temperature,
-                "num_predict": self.max_tokens,
-            },
+            "stream": on_text is not None,
+            "options": options,
             "messages": [
                 {"role": "system", "content": system},
                 {"role": "user", "content": user},
             ],
         }
+        if self.keep_alive is not None:
+            body["keep_alive"] = self.keep_alive
+        if schema is not None:
+            body["format"] = schema
+        payload = json.dumps(body).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        stats = RequestStats(
+            self.model,
+            stream=on_text is not None,
+            prompt_chars=len(system) + len(user),
+            num_ctx=self.num_ctx,
+            num_predict=options["num_predict"],
+        )
+        started = time.monotonic()
+
+        try:
+            for attempt in range(self.retries + 1):
+                stats.retries = attempt
+                try:
+                    sent = time.monotonic()
+                    with self.pool.request(
+                        "POST",
+                        "/api/chat",
+                        payload,
+                        headers,
+                        timeout=self.timeout_s,
+                        connect_timeout=self.connect_timeout_s,
+                    ) as response:
+                        if on_text is None:
+                            final = json.loads(response.read().decode("utf-8"))
+                            content = final["message"]["content"].strip()
+                        else:
+                            content, final = self._read_stream(response, sent, on_text)
+                            content = content.strip()
+                            stats.ttft_s = self.last_ttft
+                    stats_from_response(stats, final)
+                    return extract_object(content)
+                except (OSError, http.client.HTTPException, OllamaError, ValueError) as exc:
+                    if attempt == self.retries or not _retryable(exc) or self.pool.closed:
+                        stats.ok, stats.error = False, f"{type(exc).__name__}: {exc}"[:200]
+                        raise
+                    # Exponential backoff with full jitter.
+                    time.sleep(random.uniform(0, self.backoff_s * 2**attempt))
+            return {}
+        finally:
+            stats.wall_s = time.monotonic() - started
+            if self.recorder is not None:
+                self.recorder(stats)
+
+    def preload(self) -> None:
+        """Ask Ollama to load the model now (an empty prompt generates nothing)."""
+
+        body: Dict[str, Any] = {"model": self.model, "prompt": "", "stream": False}
+        if self.num_ctx:
+            body["options"] = {"num_ctx": self.num_ctx}
+        if self.keep_alive is not None:
+            body["keep_alive"] = self.keep_alive
         payload = json.dumps(body).encode("utf-8")
-        url = f"{self.host}/api/chat"
-
-        for attempt in range(3):
-            try:
-                request = urllib.request.Request(url, data=payload, headers={"Content-Type": "application/json"})
-                with urllib.request.urlopen(request, timeout=self.timeout_s) as response:
-                    data = json.loads(response.read().decode("utf-8"))
-                content = data["message"]["content"].strip()
-                return json.loads(_strip_markdown(content))
-            except (urllib.error.URLError, TimeoutError, json.JSONDecodeError):
-                if attempt == 2:
-                    raise
-                time.sleep(1 + attempt)
-        return {}
-
-
-def _strip_markdown(text: str) -> str:
-    if "```" in text:
-        text = text.replace("```json", "").replace("```", "")
-    return text.strip()
+        headers = {"Content-Type": "application/json"}
+        with self.pool.request(
+            "POST", "/api/generate", payload, headers, timeout=self.timeout_s, connect_timeout=self.connect_timeout_s
+        ) as response:
+            response.read()
+
+    def close(self) -> None:
+        """Abort requests in flight and refuse new ones (see :meth:`ConnectionPool.close`)."""
+
+        self.pool.close()
+
+    def _read_stream(
+        self,
+        response: http.client.HTTPResponse,
+        started: float,
+        on_text: Callable[[str], None],
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Collect the content of an NDJSON chat stream, forwarding each fragment.
+
+        Returns the text and the final (``done``) chunk, which carries the timings.
+        """
+
+        self.last_ttft = None
+        parts: list[str] = []
+        final: Dict[str, Any] = {}
+        while True:
+            raw = response.readline()
+            if not raw:
+                break
+            if not raw.strip():
+                continue
+            chunk = json.loads(raw.decode("utf-8"))
+            if "error" in chunk:
+                raise OllamaError(str(chunk["error"]))
+            text = chunk.get("message", {}).get("content", "")
+            if text:
+                if self.last_ttft is None:
+                    self.last_ttft = time.monotonic() - started
+                parts.append(text)
+                on_text(text)
+            if chunk.get("done"):
+                final = chunk
+                # Consume the chunked-encoding trailer so the connection can be reused.
+                response.read()
+                break
+        return "".join(parts), final
+
+
+def _retryable(exc: BaseException) -> bool:
+    """Refused connections, timeouts and client errors will not fix themselves."""
+
+    if isinstance(exc, (ConnectionRefusedError, TimeoutError)):
+        return False
+    if isinstance(exc, HTTPStatusError):
+        return exc.status >= 500
+    return True
+
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from pathlib import PurePosixPath
+from typing import Iterable, List
+
+from bettergit.core.diffparse import Diff, FileDiff, Hunk
+
+__all__ = ["Compaction", "Omission", "compact", "estimate_tokens", "file_weight", "rank_files"]
+
+# Rough characters-per-token ratio for code with BPE tokenizers.
+_CHARS_PER_TOKEN = 4
+
+_GENERATED_NAMES = {
+    "package-lock.json",
+    "npm-shrinkwrap.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "poetry.lock",
+    "pipfile.lock",
+    "uv.lock",
+    "cargo.lock",
+    "composer.lock",
+    "gemfile.lock",
+    "go.sum",
+}
+_GENERATED_SUFFIXES = (".min.js", ".min.css", ".map", ".lock", "_pb2.py", ".pb.go", ".snap", ".svg")
+_GENERATED_DIRS = {"dist", "build", "vendor", "node_modules", "__pycache__", "generated", "migrations"}
+_SOURCE_SUFFIXES = {
+    ".py", ".pyi", ".ts", ".tsx", ".js", ".jsx", ".go", ".rs", ".java", ".kt", ".c", ".h",
+    ".cc", ".cpp", ".hpp", ".cs", ".rb", ".php", ".swift", ".scala", ".sh", ".sql",
+}
+_CONFIG_SUFFIXES = {".toml", ".cfg", ".ini", ".yml", ".yaml", ".json"}
+
+_DEFINITION_RE = re.compile(
+    r"^[+-]\s*(?:export\s+|public\s+|private\s+|protected\s+|static\s+|async\s+|pub\s+)*"
+    r"(?:def|class|function|fn|func|interface|struct|enum|trait|impl|type|const|let|var)\b"
+)
+_IMPORT_RE = re.compile(r"^[+-]\s*(?:import|from|use|require|#include)\b")
+_HUNK_CUT = "[...hunk truncated]"
+# Files weighted below this are lockfiles, build output and the like.
+_GENERATED_WEIGHT = 0.2
+# Tokens kept back for each closing note line ("[omitted ...]", "[... and N more files ...]").
+_NOTE_RESERVE = 20
+# Share of the budget file headers may take when there are hunks to show as well.
+_HEADER_SHARE = 0.5
+# Omission reason for files left out entirely, header included.
+_COLLAPSED = "collapsed"
+
+
+@dataclass
+class Omission:
+    """Part of a file left out of the compacted diff (*hunks* counts partly shown ones too)."""
+
+    path: str
+    hunks: int
+    added: int
+    removed: int
+    reason: str
+
+
+@dataclass
+class Compaction:
+    """A diff rendered to fit a token budget, plus what was left out."""
+
+    text: str
+    tokens: int
+    kept_hunks: int
+    total_hunks: int
+    omitted: List[Omission] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        return not self.omitted
+
+    def note(self) -> str:
+        """Describe what was dropped, empty when nothing was.
+
+        Files whose header is shown and files left out entirely get a line each.
+        """
+
+        lines = []
+        partly = [item for item in self.omitted if item.reason != _COLLAPSED]
+        if partly:
+            added = sum(item.added for item in partly)
+            removed = sum(item.removed for item in partly)
+            files = len({item.path for item in partly})
+            lines.append(f"[omitted +{added}/-{removed} lines from {files} file(s); per-file stats kept above]")
+        hidden = [item for item in self.omitted if item.reason == _COLLAPSED]
+        if hidden:
+            added = sum(item.added for item in hidden)
+            removed = sum(item.removed for item in hidden)
+            lines.append(f"[... and {len(hidden)} more file(s), +{added}/-{removed} lines]")
+        return "\n".join(lines)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
+
+
+def file_weight(item: FileDiff) -> float:
+    """Relative importance of a file: source > config > docs > generated/binary."""
+
+    if item.binary:
+        return 0.0
+    path = PurePosixPath(item.path.lower())
+    if path.name in _GENERATED_NAMES or path.name.endswith(_GENERATED_SUFFIXES):
+        return 0.05
+    if _GENERATED_DIRS.intersection(path.parts[:-1]):
+        return 0.1
+    if path.suffix in _SOURCE_SUFFIXES:
+        weight = 1.0
+        if path.parts[0] in {"tests", "test"} or path.name.startswith("test_"):
+            weight = 0.7
+        return weight
+    if path.suffix in _CONFIG_SUFFIXES:
+        return 0.5
+    return 0.4
+
+
+def rank_files(files: Iterable[FileDiff]) -> List[FileDiff]:
+    """Return *files* most important first (stable for equal weights)."""
+
+    return sorted(files, key=lambda item: -file_weight(item))
+
+
+def _hunk_score(hunk: Hunk) -> float:
+    changed = [line for line in hunk.lines if line[:1] in ("+", "-")]
+    if not changed:
+        return 0.1 if hunk.added or hunk.removed else 0.0
+    # Changes that only touch whitespace carry almost no information.
+    plus = sorted("".join(line[1:].split()) for line in changed if line[0] == "+")
+    minus = sorted("".join(line[1:].split()) for line in changed if line[0] == "-")
+    if plus == minus:
+        return 0.05
+    score = 1.0
+    score += 2.0 * sum(1 for line in changed if _DEFINITION_RE.match(line))
+    score += 0.5 * sum(1 for line in changed if _IMPORT_RE.match(line))
+    if hunk.header:
+        score += 0.5
+    # Favour dense hunks over long runs of context.
+    score *= 0.5 + len(changed) / max(1, len(hunk.lines))
+    return score
+
+
+def _file_header(item: FileDiff) -> str:
+    label = item.path if not item.old_path else f"{item.old_path} -> {item.path}"
+    kind = "binary" if item.binary else f"+{item.added}/-{item.removed}"
+    return f"=== {label} ({item.status}, {kind})"
+
+
+def _hunk_text(hunk: Hunk, limit_tokens: int) -> tuple[str, int, bool]:
+    """Render *hunk* within *limit_tokens*; returns the text, body lines kept and whether it was cut."""
+
+    lines = [hunk.range_line()]
+    # Reserve room for the truncation marker.
+    used = estimate_tokens(lines[0]) + 1 + estimate_tokens(_HUNK_CUT) + 1
+    cut = not hunk.complete
+    for line in hunk.lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > limit_tokens:
+            cut = True
+            break
+        lines.append(line)
+        used += cost
+    if cut:
+        lines.append(_HUNK_CUT)
+    return "\n".join(lines), len(lines) - 1 - cut, cut
+
+
+def _dropped_counts(hunk: Hunk, shown: int) -> tuple[int, int]:
+    """Return (added, removed) lines of *hunk* beyond the first *shown* body lines."""
+
+    visible = hunk.lines[:shown]
+    added = hunk.added - sum(1 for line in visible if line[:1] == "+")
+    removed = hunk.removed - sum(1 for line in visible if line[:1] == "-")
+    return added, removed
+
+
+def compact(diff: Diff, budget_tokens: int = 1200, min_hunk_tokens: int = 24) -> Compaction:
+    """Render *diff* for a prompt within roughly *budget_tokens*.
+
+    Files get a one-line header with their status and line counts, most
+    important files first; once headers have used their share of the budget
+    (all of it when there are no hunks, half otherwise) the rest are summed
+    up in one "... and N more files" line. The remaining budget goes to
+    hunks of the files with a header, ranked by file importance and content
+    (definition and signature changes first, whitespace-only changes last):
+    each file's best hunk is placed before any file gets a second one, and
+    generated files only get a sample hunk from what is left, so a single
+    lockfile cannot crowd out the source changes. Hunks that do not fit
+    are listed by their `@@` line only and reported in
+    :attr:`Compaction.omitted`.
+    """
+
+    files = list(diff.files)
+    header_budget = budget_tokens - 2 * _NOTE_RESERVE
+    if any(item.hunks for item in files):
+        header_budget = int(header_budget * _HEADER_SHARE)
+    headers: dict[int, str] = {}
+    header_tokens = 0
+    for item in rank_files(files):
+        text = _file_header(item)
+        cost = estimate_tokens(text) + 1
+        if header_tokens + cost > header_budget:
+            break
+        headers[id(item)] = text
+        header_tokens += cost
+    remaining = budget_tokens - header_tokens - _NOTE_RESERVE
+    if len(headers) < len(files):
+        remaining -= _NOTE_RESERVE
+
+    # Candidate queues per file, best hunk first.
+    queues: list[tuple[FileDiff, list[Hunk]]] = []
+    for item in rank_files(files):
+        weight = file_weight(item)
+        if id(item) not in headers:
+            continue
+        if not item.hunks or weight <= 0:
+            continue
+        ranked = sorted(item.hunks, key=lambda hunk: -_hunk_score(hunk) * weight)
+        queues.append((item, ranked))
+
+    chosen: dict[int, str] = {}
+    # Hunks shown only in part, with the number of body lines kept.
+    partial: dict[int, int] = {}
+
+    def place(hunk: Hunk) -> None:
+        nonlocal remaining
+        if remaining < min_hunk_tokens:
+            return
+        text, body_lines, cut = _hunk_text(hunk, remaining)
+        cost = estimate_tokens(text) + 1
+        if cost <= remaining and body_lines:
+            chosen[id(hunk)] = text
+            remaining -= cost
+            if cut:
+                partial[id(hunk)] = body_lines
+
+    # Round-robin over real files, then one sample hunk per generated file.
+    primary = [(item, ranked) for item, ranked in queues if file_weight(item) >= _GENERATED_WEIGHT]
+    rounds = max((len(ranked) for _, ranked in primary), default=0)
+    for index in range(rounds):
+        for _, ranked in primary:
+            if index < len(ranked):
+                place(ranked[index])
+    for item, ranked in queues:
+        if file_weight(item) < _GENERATED_WEIGHT:
+            place(ranked[0])
+
+    parts: list[str] = []
+    omitted: list[Omission] = []
+    total_hunks = kept = 0
+    for item in files:
+        if id(item) not in headers:
+            total_hunks += len(item.hunks)
+            omitted.append(Omission(item.path, len(item.hunks), item.added, item.removed, _COLLAPSED))
+            continue
+        parts.append(headers[id(item)])
+        skipped = [hunk for hunk in item.hunks if id(hunk) not in chosen or id(hunk) in partial]
+        for hunk in item.hunks:
+            total_hunks += 1
+            if id(hunk) in chosen:
+                parts.append(chosen[id(hunk)])
+                kept += 1
+            elif remaining > 0:
+                line = f"{hunk.range_line()} [omitted +{hunk.added}/-{hunk.removed}]"
+                parts.append(line)
+                remaining -= estimate_tokens(line) + 1
+        if skipped:
+            counts = [_dropped_counts(hunk, partial.get(id(hunk), 0)) for hunk in skipped]
+            reason = "generated" if file_weight(item) < _GENERATED_WEIGHT else "budget"
+            omitted.append(
+                Omission(
+                    item.path,
+                    len(skipped),
+                    sum(added for added, _ in counts),
+                    sum(removed for _, removed in counts),
+                    reason,
+                )
+            )
+
+    result = Compaction("", 0, kept, total_hunks, omitted)
+    note = result.note()
+    if note:
+        parts.append(note)
+    result.text = "\n".join(parts)
+    result.tokens = estimate_tokens(result.text)
+    return result
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import math
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+from bettergit.core.statefile import load_json, save_json
+
+from bettergit.llm.compact import estimate_tokens
+
+__all__ = ["ContextSizer", "keep_alive_seconds", "predict_tokens", "tokens_needed"]
+
+_STATE_FILE = Path("bettergit") / "llm-context.json"
+
+# chars/4 undercounts code and non-English text; size the window with headroom.
+_SAFETY = 1.25
+# Chat template tokens Ollama wraps around the system and user messages.
+_TEMPLATE_OVERHEAD = 48
+# Never squeeze the answer below this many tokens to make the prompt fit.
+_MIN_PREDICT = 64
+# Ollama's default keep_alive when the request does not set one.
+_DEFAULT_KEEP_ALIVE_S = 300.0
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def tokens_needed(system: str, user: str, num_predict: int, pending_tokens: int = 0) -> int:
+    """Estimate the context window a request needs: prompt plus answer.
+
+    *pending_tokens* covers prompt text that is not rendered yet (e.g. a diff
+    that will be compacted to a known budget).
+    """
+
+    prompt = estimate_tokens(system) + estimate_tokens(user) + pending_tokens
+    return math.ceil(prompt * _SAFETY) + _TEMPLATE_OVERHEAD + num_predict
+
+
+def predict_tokens(system: str, user: str, num_ctx: Optional[int], max_tokens: int) -> int:
+    """Return ``num_predict`` for a request: *max_tokens*, cut to what fits in *num_ctx*."""
+
+    if not num_ctx:
+        return max_tokens
+    room = num_ctx - tokens_needed(system, user, 0)
+    return max(_MIN_PREDICT, min(max_tokens, room))
+
+
+def keep_alive_seconds(value: Optional[str]) -> float:
+    """Parse Ollama's ``keep_alive`` ("30m", "1h30m", "300", "-1") into seconds."""
+
+    if value is None or not str(value).strip():
+        return _DEFAULT_KEEP_ALIVE_S
+    text = str(value).strip()
+    try:
+        seconds = float(text)
+    except ValueError:
+        parts = _DURATION_RE.findall(text)
+        if not parts or "".join(number + unit for number, unit in parts) != text.lstrip("-"):
+            return _DEFAULT_KEEP_ALIVE_S
+        seconds = sum(float(number) * _UNITS[unit] for number, unit in parts)
+        if text.startswith("-"):
+            seconds = -seconds
+    return math.inf if seconds < 0 else seconds
+
+
+class ContextSizer:
+    """Choose ``num_ctx`` from a fixed set of *buckets* without forcing model reloads.
+
+    Ollama reloads a model whenever ``num_ctx`` differs from the loaded
+    instance, so requests only move between a few bucket sizes, and a bucket
+    still loaded (used within *keep_alive_s*) is reused as long as the prompt
+    fits, even when a smaller one would do. The bucket last used per host and
+    model is kept in ``.git/bettergit/llm-context.json`` so consecutive `bg`
+    runs agree; with ``git_dir=None`` it is kept in memory only.
+    """
+
+    def __init__(
+        self,
+        git_dir: Optional[Path],
+        buckets: Sequence[int],
+        keep_alive_s: float = _DEFAULT_KEEP_ALIVE_S,
+    ) -> None:
+        self.path = git_dir / _STATE_FILE if git_dir is not None else None
+        self.buckets = sorted({int(size) for size in buckets if int(size) > 0})
+        self.keep_alive_s = keep_alive_s
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        return load_json(self.path)
+
+    def _save(self) -> None:
+        save_json(self.path, self._state)
+
+    def _entry(self, key: str) -> Dict[str, Any]:
+        entry = self._state.get(key)
+        return entry if isinstance(entry, dict) else {}
+
+    def loaded(self, key: str) -> Optional[int]:
+        """Return the bucket *key* (``host|model``) is probably loaded with, if any."""
+
+        entry = self._entry(key)
+        size = entry.get("num_ctx")
+        if not isinstance(size, int) or time.time() - float(entry.get("used_at", 0)) >= self.keep_alive_s:
+            return None
+        return size
+
+    def last(self, key: str) -> Optional[int]:
+        """Return the bucket last used for *key*, loaded or not."""
+
+        size = self._entry(key).get("num_ctx")
+        return size if isinstance(size, int) else None
+
+    def choose(self, key: str, needed: int) -> Optional[int]:
+        """Return ``num_ctx`` for a request needing *needed* tokens and record it.
+
+        Returns None when no buckets are configured (the server default applies).
+        """
+
+        if not self.buckets:
+            return None
+        with self._lock:
+            current = self.loaded(key)
+            if current is not None and current >= needed:
+                size = current
+            else:
+                # Larger than every bucket: use the largest; the prompt is budgeted anyway.
+                size = next((bucket for bucket in self.buckets if bucket >= needed), self.buckets[-1])
+            self._state[key] = {"num_ctx": size, "used_at": time.time()}
+            self._save()
+            return size
+
+    def expected(self, key: str) -> Optional[int]:
+        """Like :meth:`choose` before the prompt is known (e.g. to preload the model).
+
+        Assumes the next prompt is about as large as the last one, so a warm-up
+        load is not immediately replaced by a reload at another size.
+        """
+
+        return self.choose(key, self.last(key) or 0)
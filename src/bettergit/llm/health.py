@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import http.client
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from bettergit.core.statefile import load_json, save_json
+
+__all__ = ["CircuitBreaker", "probe"]
+
+_STATE_FILE = Path("bettergit") / "llm-health.json"
+
+
+def probe(host: str, timeout: float = 0.5) -> bool:
+    """Return True when *host* answers `GET /api/version` within *timeout* seconds."""
+
+    parts = urlsplit(host)
+    factory = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    connection = factory(parts.hostname or "localhost", parts.port, timeout=timeout)
+    try:
+        connection.request("GET", "/api/version")
+        response = connection.getresponse()
+        response.read()
+        return 200 <= response.status < 300
+    except (OSError, http.client.HTTPException):
+        return False
+    finally:
+        connection.close()
+
+
+class CircuitBreaker:
+    """Skip the LLM for *cooldown_s* seconds after *threshold* consecutive failures.
+
+    State lives in ``.git/bettergit/llm-health.json`` so that separate `bg`
+    invocations (e.g. a scripted loop of `bg commit`) share it; with
+    ``git_dir=None`` it is kept in memory only. A successful probe or request is
+    remembered for *probe_ttl_s* seconds so the probe is not repeated on
+    every call, but only a successful request resets the failure count. One instance is meant to serve a whole invocation (warm-up and
+    generation): concurrent checks wait for a single probe, and a host this
+    instance found unreachable is not probed, or counted as failed, again.
+    """
+
+    def __init__(
+        self,
+        git_dir: Optional[Path],
+        threshold: int = 3,
+        cooldown_s: float = 120.0,
+        probe_ttl_s: float = 30.0,
+    ) -> None:
+        self.path = git_dir / _STATE_FILE if git_dir is not None else None
+        self.threshold = max(1, threshold)
+        self.cooldown_s = cooldown_s
+        self.probe_ttl_s = probe_ttl_s
+        self._lock = threading.Lock()
+        self._probe_lock = threading.Lock()
+        self._unreachable: Optional[str] = None
+        self._state: Dict[str, Any] = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        return load_json(self.path)
+
+    def _save(self) -> None:
+        save_json(self.path, self._state)
+
+    @property
+    def open_for(self) -> float:
+        """Seconds left before the LLM is tried again (0 when closed)."""
+
+        return max(0.0, float(self._state.get("open_until", 0)) - time.time())
+
+    def recently_ok(self) -> bool:
+        return time.time() - float(self._state.get("ok_at", 0)) < self.probe_ttl_s
+
+    def reachable(self) -> None:
+        """Remember that the host answered a probe, without forgiving earlier failures.
+
+        A server that answers `/api/version` but stalls on `/api/chat` must still
+        open the breaker, so only :meth:`success` of a real request resets the count.
+        """
+
+        with self._lock:
+            self._state["ok_at"] = time.time()
+            self._unreachable = None
+            self._save()
+
+    def success(self) -> None:
+        with self._lock:
+            self._state = {"failures": 0, "open_until": 0, "ok_at": time.time()}
+            self._unreachable = None
+            self._save()
+
+    def failure(self) -> None:
+        with self._lock:
+            failures = int(self._state.get("failures", 0)) + 1
+            self._state["failures"] = failures
+            self._state["ok_at"] = 0
+            if failures >= self.threshold:
+                self._state["open_until"] = time.time() + self.cooldown_s
+            self._save()
+
+    def check(self, host: str, timeout: float) -> Optional[str]:
+        """Return why the LLM should be skipped right now, or None to go ahead.
+
+        An open breaker answers immediately; otherwise a recent success is
+        trusted and only a stale state costs a probe. A failed probe counts as
+        a failure (so repeated outages open the breaker).
+        """
+
+        with self._probe_lock:
+            remaining = self.open_for
+            if remaining > 0:
+                return f"circuit open after repeated failures, retrying in {remaining:.0f}s"
+            if self.recently_ok():
+                return None
+            if self._unreachable is not None:
+                return self._unreachable
+            if probe(host, timeout):
+                self.reachable()
+                return None
+            self.failure()
+            self._unreachable = f"{host} is not reachable (no answer within {timeout:g}s)"
+            return self._unreachable
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import http.client
+import socket
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+__all__ = ["ConnectionPool", "HTTPStatusError", "get_pool"]
+
+# Errors that mean a kept-alive socket was closed by the server between requests.
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+)
+
+
+class HTTPStatusError(OSError):
+    """Raised for non-2xx responses."""
+
+    def __init__(self, status: int, reason: str, body: str = "") -> None:
+        super().__init__(f"HTTP {status} {reason}{': ' + body if body else ''}")
+        self.status = status
+
+
+class ConnectionPool:
+    """Keep-alive `http.client` connections to a single host.
+
+    At most *size* connections are open at once; idle ones are reused by the
+    next request. A request that fails because the server dropped an idle
+    connection is retried once on a fresh one. :meth:`close` also aborts the
+    requests still in flight.
+    """
+
+    def __init__(self, base_url: str, size: int = 4) -> None:
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port
+        self.size = max(1, size)
+        self._idle: list[http.client.HTTPConnection] = []
+        self._active: set[http.client.HTTPConnection] = set()
+        self.closed = False
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self.connections_opened = 0
+
+    def _new_connection(
+        self, timeout: Optional[float], connect_timeout: Optional[float] = None
+    ) -> http.client.HTTPConnection:
+        """Open a connection, allowing *connect_timeout* for the handshake and *timeout* for reads."""
+
+        factory = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        self.connections_opened += 1
+        if connect_timeout is None:
+            return factory(self.host, self.port, timeout=timeout)
+        connection = factory(self.host, self.port, timeout=connect_timeout)
+        connection.connect()
+        connection.timeout = timeout
+        connection.sock.settimeout(timeout)
+        return connection
+
+    def _checkout(
+        self, timeout: Optional[float], connect_timeout: Optional[float] = None
+    ) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            if self._idle:
+                connection = self._idle.pop()
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                return connection, True
+        return self._new_connection(timeout, connect_timeout), False
+
+    def _checkin(self, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if not self.closed and len(self._idle) < self.size:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    @contextmanager
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+    ) -> Iterator[http.client.HTTPResponse]:
+        """Send a request and yield the response; the connection is reused if the body was consumed.
+
+        *timeout* applies to each socket read; *connect_timeout*, when given,
+        bounds opening a new connection separately.
+        """
+
+        with self._slots:
+            if self.closed:
+                raise ConnectionAbortedError("connection pool closed")
+            connection, reused = self._checkout(timeout, connect_timeout)
+            self._track(connection)
+            try:
+                try:
+                    connection.request(method, path, body=body, headers=headers or {})
+                    response = connection.getresponse()
+                except _STALE_ERRORS:
+                    connection.close()
+                    if not reused:
+                        raise
+                    self._untrack(connection)
+                    connection = self._new_connection(timeout, connect_timeout)
+                    self._track(connection)
+                    connection.request(method, path, body=body, headers=headers or {})
+                    response = connection.getresponse()
+                if not 200 <= response.status < 300:
+                    detail = response.read(512).decode("utf-8", errors="replace").strip()
+                    raise HTTPStatusError(response.status, response.reason, detail)
+                yield response
+            except BaseException:
+                connection.close()
+                raise
+            finally:
+                self._untrack(connection)
+            if response.isclosed() and not response.will_close:
+                self._checkin(connection)
+            else:
+                connection.close()
+
+    def _track(self, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            self._active.add(connection)
+            closed = self.closed
+        if closed:
+            _abort(connection)
+
+    def _untrack(self, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            self._active.discard(connection)
+
+    def close(self) -> None:
+        """Close idle connections and abort in-flight requests; later requests fail at once.
+
+        Ollama stops generating when the client disconnects, so this is how a
+        request nobody waits for any more is cancelled.
+        """
+
+        with self._lock:
+            self.closed = True
+            idle, self._idle = self._idle, []
+            active = list(self._active)
+        for connection in idle:
+            connection.close()
+        for connection in active:
+            _abort(connection)
+
+
+def _abort(connection: http.client.HTTPConnection) -> None:
+    # shutdown() wakes a thread blocked reading the socket; close() alone would not.
+    if connection.sock is not None:
+        try:
+            connection.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+_POOLS: Dict[Tuple[str, int], ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(base_url: str, size: int = 4) -> ConnectionPool:
+    """Return the shared pool for *base_url*, creating it on first use."""
+
+    key = (base_url.rstrip("/"), size)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = _POOLS[key] = ConnectionPool(base_url, size)
+        return pool
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePosixPath
+from typing import Any, Dict, List, Optional
+
+from bettergit.core.diffparse import Diff, FileDiff
+from bettergit.llm import compact
+from bettergit.llm.client import OllamaClient
+from bettergit.llm.prompts import MAP_SYSTEM, MAP_TEMPLATE
+
+__all__ = ["diff_tokens", "split", "summarize"]
+
+
+def _file_tokens(item: FileDiff) -> int:
+    tokens = compact.estimate_tokens(item.path) + 8
+    for hunk in item.hunks:
+        tokens += sum(compact.estimate_tokens(line) + 1 for line in hunk.lines) + 8
+    return tokens
+
+
+def diff_tokens(diff: Diff) -> int:
+    """Estimated prompt size of *diff* rendered in full."""
+
+    return sum(_file_tokens(item) for item in diff.files)
+
+
+def _group_key(path: str) -> str:
+    parts = PurePosixPath(path).parts
+    return parts[0] if len(parts) > 1 else "."
+
+
+def split(diff: Diff, budget_tokens: int) -> List[Diff]:
+    """Split *diff* into chunks of roughly *budget_tokens* each.
+
+    Files stay together per top-level directory when the directory fits in one
+    chunk; larger directories are split by file, and a single file larger than
+    the budget becomes its own chunk (compacted when it is summarized).
+    """
+
+    groups: Dict[str, List[FileDiff]] = {}
+    for item in diff.files:
+        groups.setdefault(_group_key(item.path), []).append(item)
+
+    units: List[List[FileDiff]] = []
+    for members in groups.values():
+        if sum(_file_tokens(item) for item in members) <= budget_tokens:
+            units.append(members)
+        else:
+            units.extend([item] for item in members)
+
+    chunks: List[Diff] = []
+    current: List[FileDiff] = []
+    used = 0
+    for unit in units:
+        size = sum(_file_tokens(item) for item in unit)
+        if current and used + size > budget_tokens:
+            chunks.append(Diff(current, complete=diff.complete))
+            current, used = [], 0
+        current.extend(unit)
+        used += size
+    if current:
+        chunks.append(Diff(current, complete=diff.complete))
+    return chunks
+
+
+def _describe(chunk: Diff) -> str:
+    names = ", ".join(chunk.paths[:5])
+    if len(chunk.files) > 5:
+        names += f" and {len(chunk.files) - 5} more"
+    return f"{names} (+{chunk.added}/-{chunk.removed})"
+
+
+def summarize(
+    client: OllamaClient,
+    chunks: List[Diff],
+    budget_tokens: int,
+    workers: int = 4,
+    schema: Optional[Dict[str, Any]] = None,
+) -> List[str]:
+    """Summarize each chunk with its own request, *workers* at a time.
+
+    Returns one line per chunk, in chunk order. A chunk whose request fails is
+    described by its file names and line counts instead, so a single bad
+    answer does not sink the whole reduce step.
+    """
+
+    def run(chunk: Diff) -> str:
+        prompt = MAP_TEMPLATE.format(diff=compact.compact(chunk, budget_tokens=budget_tokens).text)
+        try:
+            response = client.generate(MAP_SYSTEM, prompt, schema=schema)
+        except Exception:
+            return f"- (no summary) {_describe(chunk)}"
+        kind = str(response.get("type") or "").strip()
+        summary = str(response.get("summary") or "").strip()
+        if not summary:
+            return f"- (no summary) {_describe(chunk)}"
+        prefix = f"[{kind}] " if kind else ""
+        return f"- {prefix}{summary}; files: {_describe(chunk)}"
+
+    if len(chunks) == 1:
+        return [run(chunks[0])]
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks))), thread_name_prefix="bettergit-map") as pool:
+        return list(pool.map(run, chunks))
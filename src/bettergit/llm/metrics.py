@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+__all__ = ["MetricsLog", "RequestStats", "percentile", "stats_from_response"]
+
+_METRICS_FILE = Path("bettergit") / "llm-metrics.jsonl"
+_NS = 1e9
+
+
+@dataclass
+class RequestStats:
+    """Timing of one LLM request: our wall clock plus Ollama's own counters.
+
+    Durations are seconds; Ollama's fields are None when the server did not
+    report them (e.g. the request failed).
+    """
+
+    model: str
+    ok: bool = True
+    stream: bool = False
+    ts: float = 0.0
+    wall_s: float = 0.0
+    ttft_s: Optional[float] = None
+    retries: int = 0
+    prompt_chars: int = 0
+    num_ctx: Optional[int] = None
+    num_predict: Optional[int] = None
+    total_s: Optional[float] = None
+    load_s: Optional[float] = None
+    prompt_eval_count: Optional[int] = None
+    prompt_eval_s: Optional[float] = None
+    eval_count: Optional[int] = None
+    eval_s: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def prompt_tps(self) -> Optional[float]:
+        if self.prompt_eval_count and self.prompt_eval_s:
+            return self.prompt_eval_count / self.prompt_eval_s
+        return None
+
+    @property
+    def eval_tps(self) -> Optional[float]:
+        if self.eval_count and self.eval_s:
+            return self.eval_count / self.eval_s
+        return None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RequestStats":
+        known = {item.name for item in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+
+def stats_from_response(stats: RequestStats, data: Dict[str, Any]) -> RequestStats:
+    """Copy Ollama's nanosecond timing fields from a final response chunk into *stats*."""
+
+    def seconds(name: str) -> Optional[float]:
+        value = data.get(name)
+        return value / _NS if isinstance(value, (int, float)) else None
+
+    def count(name: str) -> Optional[int]:
+        value = data.get(name)
+        return int(value) if isinstance(value, (int, float)) else None
+
+    stats.total_s = seconds("total_duration")
+    stats.load_s = seconds("load_duration")
+    stats.prompt_eval_count = count("prompt_eval_count")
+    stats.prompt_eval_s = seconds("prompt_eval_duration")
+    stats.eval_count = count("eval_count")
+    stats.eval_s = seconds("eval_duration")
+    return stats
+
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of *values* (None when empty)."""
+
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class MetricsLog:
+    """Append-only JSON-lines log under the git dir, rotated by size.
+
+    When the active file grows past *max_bytes* it becomes ``.1`` (shifting
+    older files up) and at most *backups* old files are kept.
+    """
+
+    def __init__(self, git_dir: Path, max_bytes: int = 1024 * 1024, backups: int = 2) -> None:
+        self.path = git_dir / _METRICS_FILE
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+
+    def _rotated(self, index: int) -> Path:
+        return self.path.with_name(f"{self.path.name}.{index}")
+
+    def _rotate(self) -> None:
+        for index in range(self.backups, 0, -1):
+            source = self.path if index == 1 else self._rotated(index - 1)
+            if source.exists():
+                os.replace(source, self._rotated(index))
+
+    def append(self, stats: RequestStats) -> None:
+        if not stats.ts:
+            stats.ts = time.time()
+        line = json.dumps(asdict(stats), separators=(",", ":")) + "\n"
+        with self._lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                if self.path.exists() and self.path.stat().st_size + len(line) > self.max_bytes:
+                    self._rotate()
+                with self.path.open("a", encoding="utf-8") as handle:
+                    handle.write(line)
+            except OSError:
+                return  # metrics must never break a commit
+
+    def __iter__(self) -> Iterator[RequestStats]:
+        """Yield recorded requests, oldest first."""
+
+        paths: List[Path] = [self._rotated(index) for index in range(self.backups, 0, -1)] + [self.path]
+        for path in paths:
+            try:
+                handle = path.open(encoding="utf-8")
+            except OSError:
+                continue
+            with handle:
+                for line in handle:
+                    try:
+                        yield RequestStats.from_dict(json.loads(line))
+                    except (ValueError, TypeError):
+                        continue
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import re
+
+__all__ = ["FieldStream"]
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class FieldStream:
+    """Incrementally extract one top-level string field from streamed JSON text.
+
+    Feed the raw fragments as they arrive; :meth:`feed` returns the newly decoded
+    characters of the field's value (possibly empty). Nothing is validated here;
+    the complete document is still parsed with :func:`json.loads` afterwards.
+    """
+
+    def __init__(self, field: str) -> None:
+        self._start = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._buffer = ""
+        self._pos = -1  # index of the next undecoded value character, -1 before the key
+        self.done = False
+
+    def feed(self, fragment: str) -> str:
+        if self.done:
+            return ""
+        self._buffer += fragment
+        if self._pos < 0:
+            match = self._start.search(self._buffer)
+            if match is None:
+                return ""
+            self._pos = match.end()
+
+        out: list[str] = []
+        buffer, pos = self._buffer, self._pos
+        while pos < len(buffer):
+            char = buffer[pos]
+            if char == '"':
+                self.done = True
+                pos += 1
+                break
+            if char != "\\":
+                out.append(char)
+                pos += 1
+                continue
+            if pos + 1 >= len(buffer):
+                break  # wait for the escaped character
+            code = buffer[pos + 1]
+            if code == "u":
+                if pos + 6 > len(buffer):
+                    break  # wait for all four hex digits
+                try:
+                    out.append(chr(int(buffer[pos + 2 : pos + 6], 16)))
+                except ValueError:
+                    pass
+                pos += 6
+                continue
+            out.append(_ESCAPES.get(code, code))
+            pos += 2
+        self._pos = pos
+        return "".join(out)
@@ -1,10 +1,32 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Literal, Optional, TypedDict
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Literal, Optional, TypedDict
 
 from bettergit.config import Config
+from bettergit.core import diffparse, gitio
+from bettergit.core.diffparse import Diff, FileDiff
+from bettergit.core.gitio import GitError
+from bettergit.llm import compact, context, mapreduce, rank, schema
+from bettergit.llm.cache import CommitCache, cache_key
 from bettergit.llm.client import OllamaClient
-from bettergit.llm.prompts import SYSTEM, USER_TEMPLATE
+from bettergit.llm.health import CircuitBreaker
+from bettergit.llm.http import ConnectionPool
+from bettergit.llm.metrics import MetricsLog
+from bettergit.llm.partial import FieldStream
+from bettergit.llm.prompts import (
+    MAP_SYSTEM,
+    MAP_TEMPLATE,
+    PROMPT_VERSION,
+    REDUCE_TEMPLATE,
+    REPAIR_TEMPLATE,
+    SYSTEM,
+    USER_TEMPLATE,
+)
 
 CommitType = Literal["feat", "fix", "docs", "style", "refactor", "perf", "test", "chore", "build", "ci"]
 
@@ -17,82 +39,323 @@ class LLMCommit(TypedDict, total=False):
     breaking: bool
 
 
-_TEXT_EXTENSIONS = {
-    ".py",
-    ".ts",
-    ".tsx",
-    ".js",
-    ".jsx",
-    ".json",
-    ".toml",
-    ".md",
-    ".yml",
-    ".yaml",
-    ".ini",
-    ".txt",
-    ".css",
-    ".html",
-}
-
-
-def _truncate(text: str, limit: int = 4000) -> str:
-    return text if len(text) <= limit else text[:limit] + "\n...[truncated]"
-
-
-def _filtered_files(files: List[str]) -> List[str]:
-    cleaned: List[str] = []
-    for path in files:
-        lowercase = path.lower()
-        if "__pycache__" in lowercase or ".egg-info" in lowercase or lowercase.endswith(".pyc"):
-            continue
-        if "." in lowercase and lowercase[lowercase.rfind("."):] not in _TEXT_EXTENSIONS:
-            continue
-        cleaned.append(path)
-    return cleaned[:30]
-
-
-def _client(cfg: Config) -> OllamaClient:
+# Sent as Ollama's structured-output `format` and used to validate answers.
+COMMIT_SCHEMA = schema.schema_for(LLMCommit, required=("type", "summary"), max_lengths={"summary": 72})
+_MAP_SCHEMA = schema.subschema(COMMIT_SCHEMA, ("type", "summary"))
+
+
+_MAX_LISTED_FILES = 30
+
+
+def _filtered_files(diff: Diff) -> List[str]:
+    """List changed paths for the prompt, most important first, with stats."""
+
+    lines: List[str] = []
+    ranked = [
+        item
+        for item in compact.rank_files(diff.files)
+        if "__pycache__" not in item.path and ".egg-info" not in item.path
+    ]
+    for item in ranked[:_MAX_LISTED_FILES]:
+        stats = "binary" if item.binary else f"+{item.added}/-{item.removed}"
+        lines.append(f"- {item.path} ({stats})")
+    if len(ranked) > _MAX_LISTED_FILES:
+        lines.append(f"- ... and {len(ranked) - _MAX_LISTED_FILES} more")
+    return lines
+
+
+def _metrics(cfg: Config) -> Optional[MetricsLog]:
+    if not cfg.llm.metrics_enabled:
+        return None
+    try:
+        return MetricsLog(gitio.git_dir(), max_bytes=cfg.llm.metrics_max_bytes)
+    except GitError:
+        return None
+
+
+def _client(cfg: Config, private: bool = False) -> OllamaClient:
     llm = cfg.llm
+    metrics = _metrics(cfg)
+    pool = ConnectionPool(llm.ollama_host, llm.http_pool_size) if private else None
     return OllamaClient(
         model=llm.model,
         host=llm.ollama_host,
         temperature=llm.temperature,
         max_tokens=llm.max_tokens,
         timeout_s=llm.http_timeout,
+        pool_size=llm.http_pool_size,
+        recorder=metrics.append if metrics is not None else None,
+        connect_timeout_s=llm.connect_timeout,
+        retries=llm.http_retries,
+        backoff_s=llm.retry_backoff,
+        keep_alive=llm.keep_alive,
+        pool=pool,
     )
 
 
-def generate_commit(
-    diff: str,
+def speculative_client(cfg: Config) -> OllamaClient:
+    """Return a client with its own connection pool, so closing it cancels only its requests."""
+
+    return _client(cfg, private=True)
+
+
+class SharedPrompt:
+    """The user prompt for one staged diff, built on first use and reused afterwards.
+
+    Passing the same instance to every :func:`generate_candidates` call of a
+    session means a regenerate only repeats the final requests, not the
+    compaction or the map step of a large diff.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._text: Optional[str] = None
+
+    def get(self, build: Callable[[], str]) -> str:
+        with self._lock:
+            if self._text is None:
+                self._text = build()
+            return self._text
+
+
+def circuit_breaker(cfg: Config) -> CircuitBreaker:
+    """Return the breaker for this repository; share it across one invocation."""
+
+    llm = cfg.llm
+    try:
+        git_dir: Optional[Path] = gitio.git_dir()
+    except GitError:
+        git_dir = None
+    return CircuitBreaker(
+        git_dir,
+        threshold=llm.breaker_threshold,
+        cooldown_s=llm.breaker_cooldown,
+        probe_ttl_s=llm.probe_ttl,
+    )
+
+
+def _context_sizer(cfg: Config) -> context.ContextSizer:
+    try:
+        git_dir: Optional[Path] = gitio.git_dir()
+    except GitError:
+        git_dir = None
+    return context.ContextSizer(git_dir, cfg.llm.context_buckets, context.keep_alive_seconds(cfg.llm.keep_alive))
+
+
+def _context_key(cfg: Config) -> str:
+    return f"{cfg.llm.ollama_host.rstrip('/')}|{cfg.llm.model}"
+
+
+def _fit_context(client: OllamaClient, cfg: Config, needed: int) -> None:
+    """Set the client's ``num_ctx`` to a bucket holding *needed* tokens.
+
+    The chosen bucket applies to every later request of this client (map,
+    reduce, candidates, repairs), so one run never switches sizes midway
+    unless a later prompt outgrows the bucket.
+    """
+
+    if not cfg.llm.context_buckets:
+        return
+    if client.num_ctx is not None and client.num_ctx >= needed:
+        return
+    client.num_ctx = _context_sizer(cfg).choose(_context_key(cfg), needed)
+
+
+def warm_up(cfg: Config, breaker: Optional[CircuitBreaker] = None) -> threading.Thread:
+    """Start loading the model in the background and return the (daemon) thread.
+
+    Meant to be called as soon as a command starts, so the model load overlaps
+    with reading the diff and classifying it. Failures are ignored here; the
+    real request reports them. Pass the *breaker* the request will use, so
+    both rely on a single reachability probe.
+
+    Everything tied to the repository (breaker, metrics log, context state) is
+    resolved before the thread starts: in `bg daemon` the thread may outlive
+    the command, and the process's cwd then belongs to the next one.
+    """
+
+    if breaker is None:
+        breaker = circuit_breaker(cfg)
+    client = _client(cfg)
+    if cfg.llm.context_buckets:
+        # Load at the size the real request will most likely ask for.
+        client.num_ctx = _context_sizer(cfg).expected(_context_key(cfg))
+    probe_breaker = breaker
+
+    def run() -> None:
+        try:
+            if probe_breaker.check(cfg.llm.ollama_host, cfg.llm.probe_timeout) is None:
+                client.preload()
+        except Exception:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True, name="bettergit-warm-up")
+    thread.start()
+    return thread
+
+
+def _unavailable(cfg: Config, breaker: CircuitBreaker) -> bool:
+    """Print why the LLM is skipped and return True, or return False to go ahead."""
+
+    reason = breaker.check(cfg.llm.ollama_host, cfg.llm.probe_timeout)
+    if reason is None:
+        return False
+    # stderr, so that stdout carries nothing but the commit message.
+    print("LLM SKIPPED:", reason, "- using heuristics", file=sys.stderr)
+    return True
+
+
+def _cache_lookup(cfg: Config) -> tuple[CommitCache, str] | None:
+    """Return the cache and the key for the currently staged tree, if caching applies."""
+
+    llm = cfg.llm
+    if not llm.cache_enabled:
+        return None
+    try:
+        tree_id = gitio.write_tree()
+        cache = CommitCache(gitio.git_dir(), max_entries=llm.cache_max_entries)
+    except GitError:
+        return None
+    key = cache_key(
+        tree_id,
+        provider=llm.provider,
+        model=llm.model,
+        temperature=llm.temperature,
+        max_tokens=llm.max_tokens,
+        prompt_version=PROMPT_VERSION,
+        prompt_budget_tokens=llm.prompt_budget_tokens,
+        mapreduce_threshold_tokens=llm.mapreduce_threshold_tokens,
+    )
+    return cache, key
+
+
+def _build_prompt(
+    diff: str | Diff | Callable[[], Diff],
     files: List[str],
     heur_type: str | None,
     heur_scope: str | None,
     added: int,
     removed: int,
     cfg: Config,
-) -> LLMCommit:
-    user_prompt = USER_TEMPLATE.format(
-        ctype=heur_type or "",
-        scope=heur_scope or "",
-        added=added,
-        removed=removed,
-        files="\n".join(f"- {path}" for path in _filtered_files(files)),
-        diff=_truncate(diff),
+    client: OllamaClient,
+) -> str:
+    """Return the user prompt, running the map step first for very large diffs.
+
+    Also sizes the client's context window (``num_ctx``) for the prompt.
+    """
+
+    if callable(diff):
+        diff = diff()
+    if not isinstance(diff, Diff):
+        diff = diffparse.parse(diff.splitlines())
+    if not diff.files and files:
+        diff = Diff([FileDiff(path) for path in files], complete=False)
+
+    llm = cfg.llm
+    chunks: List[Diff] = []
+    if llm.mapreduce_threshold_tokens > 0 and mapreduce.diff_tokens(diff) > llm.mapreduce_threshold_tokens:
+        chunks = mapreduce.split(diff, llm.prompt_budget_tokens)
+    if len(chunks) > 1:
+        # Too large for one prompt: summarize the parts concurrently, then merge.
+        _fit_context(
+            client, cfg, context.tokens_needed(MAP_SYSTEM, MAP_TEMPLATE, llm.max_tokens, llm.prompt_budget_tokens)
+        )
+        summaries = mapreduce.summarize(
+            client,
+            chunks,
+            llm.prompt_budget_tokens,
+            workers=llm.mapreduce_workers,
+            schema=_MAP_SCHEMA if llm.structured_output else None,
+        )
+        prompt = REDUCE_TEMPLATE.format(
+            ctype=heur_type or "",
+            scope=heur_scope or "",
+            added=added,
+            removed=removed,
+            files="\n".join(_filtered_files(diff)),
+            summaries="\n".join(summaries),
+        )
+    else:
+        compacted = compact.compact(diff, budget_tokens=llm.prompt_budget_tokens)
+        prompt = USER_TEMPLATE.format(
+            ctype=heur_type or "",
+            scope=heur_scope or "",
+            added=added,
+            removed=removed,
+            files="\n".join(_filtered_files(diff)),
+            diff=compacted.text,
+        )
+    _fit_context(client, cfg, context.tokens_needed(SYSTEM, prompt, llm.max_tokens))
+    return prompt
+
+
+def _ask(
+    client: OllamaClient,
+    user_prompt: str,
+    cfg: Config,
+    on_text: Optional[Callable[[str], None]] = None,
+    **overrides: Any,
+) -> Dict[str, Any]:
+    """Send *user_prompt* and validate the answer against :data:`COMMIT_SCHEMA`.
+
+    Fields that fail validation are re-requested in one small follow-up call
+    (only those fields, constrained by a reduced schema) instead of repeating
+    the whole generation; whatever is still invalid afterwards is left to
+    :func:`_normalize`.
+    """
+
+    structured = cfg.llm.structured_output
+    response = client.generate(
+        SYSTEM, user_prompt, on_text=on_text, schema=COMMIT_SCHEMA if structured else None, **overrides
     )
+    problems = schema.validate(response, COMMIT_SCHEMA)
+    if not problems or cfg.llm.repair_attempts <= 0:
+        return response
+    for _ in range(cfg.llm.repair_attempts):
+        repair_prompt = REPAIR_TEMPLATE.format(
+            previous=json.dumps(response),
+            problems="\n".join(f"- {name}: {problem}" for name, problem in problems.items()),
+            fields=", ".join(problems),
+        )
+        try:
+            fixed = client.generate(
+                SYSTEM, repair_prompt, schema=schema.subschema(COMMIT_SCHEMA, problems) if structured else None
+            )
+        except Exception:
+            break
+        response = {**response, **{name: fixed[name] for name in problems if name in fixed}}
+        problems = schema.validate(response, COMMIT_SCHEMA)
+        if not problems:
+            break
+    return response
+
+
+def _summary_callback(on_summary: Optional[Callable[[str], None]]) -> Optional[Callable[[str], None]]:
+    if on_summary is None:
+        return None
+    summary_stream = FieldStream("summary")
+
+    def on_text(fragment: str) -> None:
+        text = summary_stream.feed(fragment)
+        if text:
+            on_summary(text)
+
+    return on_text
+
+
+def _heuristic_commit(heur_type: str | None, heur_scope: str | None, added: int, removed: int) -> LLMCommit:
+    return {
+        "type": (heur_type or "chore"),  # type: ignore[typeddict-item]
+        "scope": (heur_scope or ""),
+        "summary": f"auto summary [+{added}/-{removed}]",
+        "body": None,
+        "breaking": False,
+    }
 
-    try:
-        response: Dict[str, Any] = _client(cfg).generate(SYSTEM, user_prompt)
-    except Exception as exc:  # pragma: no cover - fall back to heuristics
-        print("LLM ERROR:", exc)
-        print("RAW PROMPT:\n", user_prompt)
-        return {
-            "type": (heur_type or "chore"),
-            "scope": (heur_scope or ""),
-            "summary": f"auto summary [+{added}/-{removed}]",
-            "body": None,
-            "breaking": False,
-        }
 
+def _normalize(
+    response: Dict[str, Any], heur_type: str | None, heur_scope: str | None, added: int, removed: int
+) -> LLMCommit:
     commit_type = str(response.get("type") or heur_type or "chore").strip()
     scope = str(response.get("scope") or heur_scope or "").strip()
     summary = str(response.get("summary") or f"auto summary [+{added}/-{removed}]").strip()[:72]
@@ -100,11 +363,161 @@ def generate_commit(
     if not isinstance(body, str) or not body.strip():
         body = None
     breaking = bool(response.get("breaking", False))
-
     return {
-        "type": commit_type,
+        "type": commit_type,  # type: ignore[typeddict-item]
         "scope": scope,
         "summary": summary,
         "body": body,
         "breaking": breaking,
     }
+
+
+def generate_commit(
+    diff: str | Diff | Callable[[], Diff],
+    files: List[str],
+    heur_type: str | None,
+    heur_scope: str | None,
+    added: int,
+    removed: int,
+    cfg: Config,
+    use_cache: bool = True,
+    on_summary: Optional[Callable[[str], None]] = None,
+    store: bool = True,
+    breaker: Optional[CircuitBreaker] = None,
+) -> LLMCommit:
+    """Ask the LLM for a Conventional Commit describing the staged changes.
+
+    Results are cached per staged tree, model and prompt version, so *diff* may
+    be a callable that is only invoked on a cache miss. ``use_cache=False``
+    skips the lookup (e.g. for an explicit regenerate) but still stores the
+    fresh result unless ``store=False`` (used for speculative candidates the
+    user may never see). *on_summary* receives the summary text piece by piece while
+    the model is still generating. *breaker* is the one passed to :func:`warm_up`.
+
+    Diffs estimated above ``Config.llm.mapreduce_threshold_tokens`` are split into
+    chunks that are summarized concurrently; a final request turns those
+    summaries into the commit message.
+    """
+
+    cached = _cache_lookup(cfg) if use_cache or store else None
+    if cached is not None and use_cache:
+        hit = cached[0].get(cached[1])
+        if hit is not None and hit.get("summary"):
+            return hit  # type: ignore[return-value]
+
+    if breaker is None:
+        breaker = circuit_breaker(cfg)
+    if _unavailable(cfg, breaker):
+        return _heuristic_commit(heur_type, heur_scope, added, removed)
+
+    client = _client(cfg)
+    try:
+        user_prompt = _build_prompt(diff, files, heur_type, heur_scope, added, removed, cfg, client)
+    except Exception as exc:  # pragma: no cover - fall back to heuristics
+        # Reading the diff or compacting it failed locally; the LLM is not to blame.
+        print("PROMPT ERROR:", exc, file=sys.stderr)
+        return _heuristic_commit(heur_type, heur_scope, added, removed)
+    try:
+        response = _ask(client, user_prompt, cfg, on_text=_summary_callback(on_summary))
+    except Exception as exc:  # pragma: no cover - fall back to heuristics
+        breaker.failure()
+        print("LLM ERROR:", exc)
+        print("RAW PROMPT:\n", user_prompt)
+        return _heuristic_commit(heur_type, heur_scope, added, removed)
+    breaker.success()
+
+    result = _normalize(response, heur_type, heur_scope, added, removed)
+    if cached is not None and store:
+        cached[0].put(cached[1], dict(result))
+    return result
+
+
+def generate_candidates(
+    diff: str | Diff | Callable[[], Diff],
+    files: List[str],
+    heur_type: str | None,
+    heur_scope: str | None,
+    added: int,
+    removed: int,
+    cfg: Config,
+    count: Optional[int] = None,
+    use_cache: bool = True,
+    on_summary: Optional[Callable[[str], None]] = None,
+    store: bool = True,
+    prompt: Optional[SharedPrompt] = None,
+    client: Optional[OllamaClient] = None,
+    breaker: Optional[CircuitBreaker] = None,
+) -> List[LLMCommit]:
+    """Generate up to *count* alternative commits concurrently, best first.
+
+    All requests share one prompt and differ only in seed and temperature
+    (``Config.llm.candidate_temperature_step`` apart); the answers are ranked
+    with :func:`bettergit.llm.rank.rank_candidates`, which also drops near
+    duplicates. The best one is cached like :func:`generate_commit`'s result,
+    so a later `bg commit` on the same tree reuses it. *on_summary* follows
+    the first request only. *prompt* keeps the built prompt for later calls;
+    *client* replaces the default one, e.g. a :func:`speculative_client` the
+    caller may close to abandon the batch.
+    """
+
+    llm = cfg.llm
+    count = max(1, count if count is not None else llm.candidates)
+    cached = _cache_lookup(cfg) if use_cache or store else None
+    batch_key = cache_key(cached[1], candidates=count) if cached is not None else None
+    if cached is not None and use_cache:
+        hit = cached[0].get(batch_key)  # type: ignore[arg-type]
+        if hit is not None and hit.get("candidates"):
+            return hit["candidates"]
+
+    if breaker is None:
+        breaker = circuit_breaker(cfg)
+    if _unavailable(cfg, breaker):
+        return [_heuristic_commit(heur_type, heur_scope, added, removed)]
+
+    if client is None:
+        client = _client(cfg)
+    llm_client = client
+
+    def build() -> str:
+        return _build_prompt(diff, files, heur_type, heur_scope, added, removed, cfg, llm_client)
+
+    try:
+        user_prompt = prompt.get(build) if prompt is not None else build()
+        # A prompt built by an earlier call still has to size this client's context window.
+        _fit_context(client, cfg, context.tokens_needed(SYSTEM, user_prompt, llm.max_tokens))
+    except Exception as exc:  # pragma: no cover - fall back to heuristics
+        # Building the prompt is local work (map-step failures are absorbed by
+        # mapreduce.summarize), so it never counts against the breaker.
+        if not client.pool.closed:
+            print("PROMPT ERROR:", exc, file=sys.stderr)
+        return [_heuristic_commit(heur_type, heur_scope, added, removed)]
+
+    def run(index: int) -> Optional[LLMCommit]:
+        try:
+            response = _ask(
+                client,
+                user_prompt,
+                cfg,
+                on_text=_summary_callback(on_summary) if index == 0 else None,
+                temperature=min(1.0, llm.temperature + index * llm.candidate_temperature_step),
+                seed=index if index else None,
+            )
+        except Exception:
+            return None
+        return _normalize(response, heur_type, heur_scope, added, removed)
+
+    with ThreadPoolExecutor(max_workers=count, thread_name_prefix="bettergit-candidate") as pool:
+        answers = [answer for answer in pool.map(run, range(count)) if answer is not None]
+    if not answers:
+        # A closed client means the caller gave up on this batch; the server is not to blame.
+        if not client.pool.closed:
+            breaker.failure()
+            print("LLM ERROR: no candidate could be generated")
+        return [_heuristic_commit(heur_type, heur_scope, added, removed)]
+    breaker.success()
+
+    ranked = rank.rank_candidates(answers, heur_type, heur_scope, files)
+    if cached is not None and store:
+        cached[0].put(cached[1], dict(ranked[0]))
+        cached[0].put(batch_key, {"candidates": [dict(item) for item in ranked]})  # type: ignore[arg-type]
+    return ranked
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Callable, Deque, Generic, List, Optional, TypeVar
+
+__all__ = ["Prefetcher"]
+
+T = TypeVar("T")
+
+
+class _Slot(Generic[T]):
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Optional[T] = None
+        self.error: Optional[BaseException] = None
+
+
+class Prefetcher(Generic[T]):
+    """Keep up to *depth* results of *produce* computing in the background.
+
+    :meth:`take` hands out the oldest result (waiting for it if necessary) and
+    immediately schedules a replacement. Workers are daemon threads, so an
+    in-flight request never delays process exit; :meth:`cancel` discards
+    everything that has not been taken yet and calls *on_cancel*, which should
+    abort the work still running (e.g. close the connection it is waiting on),
+    then waits for the workers so none outlives the command that started it.
+    """
+
+    def __init__(
+        self, produce: Callable[[], T], depth: int = 1, on_cancel: Optional[Callable[[], None]] = None
+    ) -> None:
+        self._produce = produce
+        self._on_cancel = on_cancel
+        self._depth = max(0, depth)
+        self._slots: Deque[_Slot[T]] = deque()
+        self._workers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+
+    def _run(self, slot: _Slot[T]) -> None:
+        try:
+            if not self._cancelled.is_set():
+                slot.value = self._produce()
+        except BaseException as exc:  # surfaced to the caller of take()
+            slot.error = exc
+        finally:
+            slot.done.set()
+
+    def _fill(self) -> None:
+        with self._lock:
+            while not self._cancelled.is_set() and len(self._slots) < self._depth:
+                slot: _Slot[T] = _Slot()
+                self._slots.append(slot)
+                worker = threading.Thread(target=self._run, args=(slot,), daemon=True, name="bettergit-prefetch")
+                self._workers = [thread for thread in self._workers if thread.is_alive()]
+                self._workers.append(worker)
+                worker.start()
+
+    def start(self) -> None:
+        self._fill()
+
+    def ready(self) -> bool:
+        """Return True when the next :meth:`take` will not block."""
+
+        with self._lock:
+            return bool(self._slots) and self._slots[0].done.is_set()
+
+    def take(self) -> T:
+        with self._lock:
+            slot = self._slots.popleft() if self._slots else None
+        if slot is None:
+            # Nothing speculative in flight (depth 0 or cancelled): compute inline.
+            value = self._produce()
+            self._fill()
+            return value
+        self._fill()
+        slot.done.wait()
+        if slot.error is not None:
+            raise slot.error
+        return slot.value  # type: ignore[return-value]
+
+    def cancel(self, timeout: Optional[float] = None) -> None:
+        """Discard pending results, abort the workers and wait up to *timeout* seconds for them."""
+
+        self._cancelled.set()
+        with self._lock:
+            self._slots.clear()
+            workers, self._workers = self._workers, []
+        if self._on_cancel is not None:
+            self._on_cancel()
+        for worker in workers:
+            worker.join(timeout)
@@ -1,3 +1,6 @@
+# Bump whenever SYSTEM or USER_TEMPLATE change so cached messages are regenerated.
+PROMPT_VERSION = 4
+
 SYSTEM = (
     "You are a senior developer. Generate concise Conventional Commit messages. "
     "Header must be <= 72 chars (no trailing dot). Body is optional. "
@@ -14,7 +17,7 @@ Stats: +{added}/-{removed}
 Changed files:
 {files}
 
-Truncated diff:
+Diff (compacted: per-file headers give status and +added/-removed; hunks marked [omitted] were left out):
 {diff}
 
 Return JSON in this exact format (NO extra text):
@@ -26,4 +29,57 @@ Return JSON in this exact format (NO extra text):
   "breaking": false
 }}
 Only JSON. No commentary.
-"""
\ No newline at end of file
+"""
+MAP_SYSTEM = (
+    "You are a senior developer reviewing one part of a larger change. "
+    "Describe what this part does in one short sentence. "
+    "Respond ONLY with valid JSON (no markdown, no commentary)."
+)
+
+MAP_TEMPLATE = """\
+Diff excerpt (per-file headers give status and +added/-removed):
+{diff}
+
+Return JSON in this exact format (NO extra text):
+{{
+  "type": "feat|fix|docs|refactor|test|chore|build|ci|perf|style",
+  "summary": "one sentence <=72 chars"
+}}
+Only JSON. No commentary.
+"""
+
+REDUCE_TEMPLATE = """\
+Heuristics:
+- type="{ctype}"
+- scope="{scope}"
+
+Stats: +{added}/-{removed}
+
+Changed files:
+{files}
+
+The change was too large to show in full. Summaries of its parts:
+{summaries}
+
+Write ONE commit message covering the whole change.
+Return JSON in this exact format (NO extra text):
+{{
+  "type": "feat|fix|docs|refactor|test|chore|build|ci|perf|style",
+  "scope": "string or empty",
+  "summary": "one line <=72 chars, no period at end",
+  "body": "",
+  "breaking": false
+}}
+Only JSON. No commentary.
+"""
+
+REPAIR_TEMPLATE = """\
+Your previous answer was:
+{previous}
+
+These fields are invalid:
+{problems}
+
+Return JSON containing ONLY the corrected fields: {fields}.
+Only JSON. No commentary.
+"""
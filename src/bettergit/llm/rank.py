@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import re
+from pathlib import PurePosixPath
+from typing import Any, Iterable, List, Mapping, Sequence, TypeVar
+
+__all__ = ["header_length", "rank_candidates", "score_candidate"]
+
+C = TypeVar("C", bound=Mapping[str, Any])
+
+_MAX_HEADER = 72
+# Heuristic types that come from strong signals (paths or fix keywords).
+_STRONG_TYPES = {"docs", "test", "fix"}
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def header_length(candidate: Mapping[str, Any]) -> int:
+    scope = candidate.get("scope")
+    bang = "!" if candidate.get("breaking") else ""
+    return len(f"{candidate.get('type', '')}{f'({scope})' if scope else ''}{bang}: {candidate.get('summary', '')}")
+
+
+def _path_words(files: Iterable[str]) -> set[str]:
+    words: set[str] = set()
+    for path in files:
+        pure = PurePosixPath(path.lower())
+        words.update(pure.parts[:-1])
+        words.add(pure.stem)
+    return words
+
+
+def score_candidate(
+    candidate: Mapping[str, Any],
+    heur_type: str | None,
+    heur_scope: str | None,
+    files: Sequence[str],
+) -> float:
+    """Cheap local quality score; higher is better."""
+
+    summary = str(candidate.get("summary") or "")
+    if not summary or summary.startswith("auto summary"):
+        return -10.0
+    score = 0.0
+    length = header_length(candidate)
+    score += 2.0 if length <= _MAX_HEADER else -(length - _MAX_HEADER) / 10
+    if summary.endswith("."):
+        score -= 0.5
+
+    commit_type = candidate.get("type")
+    if heur_type and commit_type == heur_type:
+        score += 1.0
+    elif heur_type in _STRONG_TYPES:
+        score -= 1.0
+
+    scope = str(candidate.get("scope") or "").lower()
+    if scope:
+        if scope == (heur_scope or "").lower() or scope in _path_words(files):
+            score += 1.0
+        else:
+            score -= 1.0
+    return score
+
+
+def _words(candidate: Mapping[str, Any]) -> frozenset[str]:
+    return frozenset(_WORD_RE.findall(str(candidate.get("summary") or "").lower()))
+
+
+def rank_candidates(
+    candidates: Iterable[C],
+    heur_type: str | None,
+    heur_scope: str | None,
+    files: Sequence[str],
+    similarity: float = 0.8,
+) -> List[C]:
+    """Order *candidates* best first and drop near-duplicate wordings.
+
+    Two summaries count as duplicates when their word sets overlap by at least
+    *similarity* (Jaccard); the better-scored one is kept.
+    """
+
+    scored = sorted(
+        enumerate(candidates),
+        key=lambda pair: (-score_candidate(pair[1], heur_type, heur_scope, files), pair[0]),
+    )
+    kept: List[C] = []
+    seen: List[frozenset[str]] = []
+    for _, candidate in scored:
+        words = _words(candidate)
+        if any(words and len(words & other) / len(words | other) >= similarity for other in seen):
+            continue
+        kept.append(candidate)
+        seen.append(words)
+    return kept
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import json
+import re
+import types
+from typing import Any, Dict, Iterable, Literal, Optional, Union, get_args, get_origin, get_type_hints
+
+__all__ = ["extract_object", "schema_for", "subschema", "validate"]
+
+_FENCE_RE = re.compile(r"```(?:json)?")
+_TRAILING_COMMA_RE = re.compile(r",(\s*[}\]])")
+
+
+def _type_schema(hint: Any) -> Dict[str, Any]:
+    origin = get_origin(hint)
+    if origin is Literal:
+        return {"type": "string", "enum": [str(value) for value in get_args(hint)]}
+    if origin in (Union, types.UnionType):
+        options = [arg for arg in get_args(hint) if arg is not type(None)]
+        inner = _type_schema(options[0]) if len(options) == 1 else {}
+        if type(None) in get_args(hint) and "type" in inner:
+            inner = {**inner, "type": [inner["type"], "null"]}
+        return inner
+    if hint is bool:
+        return {"type": "boolean"}
+    if hint is int:
+        return {"type": "integer"}
+    if hint is str:
+        return {"type": "string"}
+    return {}
+
+
+def schema_for(
+    typed_dict: type,
+    required: Iterable[str] = (),
+    max_lengths: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
+    """Build a JSON schema (for Ollama's ``format`` field) from a TypedDict."""
+
+    properties: Dict[str, Any] = {}
+    for name, hint in get_type_hints(typed_dict).items():
+        prop = _type_schema(hint)
+        if max_lengths and name in max_lengths:
+            prop["maxLength"] = max_lengths[name]
+        properties[name] = prop
+    return {"type": "object", "properties": properties, "required": list(required)}
+
+
+def subschema(schema: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """Restrict *schema* to *fields*, all of them required."""
+
+    names = [name for name in fields if name in schema["properties"]]
+    return {"type": "object", "properties": {name: schema["properties"][name] for name in names}, "required": names}
+
+
+_JSON_TYPES = {"string": str, "boolean": bool, "integer": int, "null": type(None)}
+
+
+def validate(data: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, str]:
+    """Return ``{field: problem}`` for every property of *data* that breaks *schema*."""
+
+    problems: Dict[str, str] = {}
+    for name in schema.get("required", []):
+        if data.get(name) in (None, ""):
+            problems[name] = "missing"
+    for name, prop in schema["properties"].items():
+        if name not in data or name in problems:
+            continue
+        value = data[name]
+        allowed = prop.get("type")
+        if allowed is not None:
+            kinds = allowed if isinstance(allowed, list) else [allowed]
+            if not any(isinstance(value, _JSON_TYPES[kind]) for kind in kinds if kind in _JSON_TYPES):
+                problems[name] = f"must be {' or '.join(kinds)}"
+                continue
+        if "enum" in prop and value not in prop["enum"]:
+            problems[name] = f"must be one of {', '.join(prop['enum'])}"
+        elif "maxLength" in prop and isinstance(value, str) and len(value) > prop["maxLength"]:
+            problems[name] = f"must be at most {prop['maxLength']} characters (got {len(value)})"
+    return problems
+
+
+def _scan(text: str) -> tuple[int, list[str], bool]:
+    """Return (end index of the first complete object or -1, open brackets, inside a string)."""
+
+    stack: list[str] = []
+    in_string = escaped = False
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+            if not stack:
+                return index, [], False
+    return -1, stack, in_string
+
+
+def _loads(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(_TRAILING_COMMA_RE.sub(r"\1", text))
+
+
+def extract_object(text: str) -> Dict[str, Any]:
+    """Pull the first JSON object out of model output, tolerating common damage.
+
+    Markdown fences and chatter around the object are ignored, trailing commas
+    are removed, and an object cut off mid-way (e.g. at ``num_predict``) is
+    closed after its last complete member. Raises :class:`ValueError` when no
+    object can be recovered.
+    """
+
+    text = _FENCE_RE.sub("", text)
+    start = text.find("{")
+    if start < 0:
+        raise ValueError("no JSON object in model output")
+    fragment = text[start:]
+    end, _, _ = _scan(fragment)
+    if end >= 0:
+        data = _loads(fragment[: end + 1])
+    else:
+        data = _repair(fragment)
+    if not isinstance(data, dict):
+        raise ValueError("model output is not a JSON object")
+    return data
+
+
+def _repair(fragment: str) -> Any:
+    candidate = fragment
+    for _ in range(64):
+        _, stack, in_string = _scan(candidate)
+        # A member cut off inside a string is dropped rather than trusted.
+        if not in_string:
+            try:
+                return _loads(candidate + "".join(reversed(stack)))
+            except json.JSONDecodeError:
+                pass
+        cut = candidate.rfind(",")
+        if cut <= 0:
+            break
+        candidate = candidate[:cut]
+    raise ValueError("truncated JSON object could not be repaired")
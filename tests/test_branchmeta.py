@@ -0,0 +1,35 @@
+import json
+import subprocess
+import sys
+
+from bettergit.core import branchmeta
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def test_migrates_json_and_survives_parallel_writers(tmp_path, monkeypatch):
+    _git(tmp_path, "init", "-q")
+    legacy = tmp_path / ".git" / "bettergit" / "branch_origins.json"
+    legacy.parent.mkdir()
+    legacy.write_text(json.dumps({"old": "main", "gone": "dev"}))
+    monkeypatch.chdir(tmp_path)
+
+    assert branchmeta.load_all() == {"gone": "dev", "old": "main"}
+    assert not legacy.exists()
+    branchmeta.record_origin("gone", None)
+    assert branchmeta.get_origin("gone") is None
+
+    script = (
+        "import sys\n"
+        "from bettergit.core import branchmeta\n"
+        "for i in range(20):\n"
+        "    branchmeta.record_origin(f'{sys.argv[1]}-{i}', 'main')\n"
+    )
+    writers = [subprocess.Popen([sys.executable, "-c", script, f"w{n}"], cwd=tmp_path) for n in range(4)]
+    assert all(writer.wait() == 0 for writer in writers)
+
+    origins = branchmeta.load_all()
+    assert len(origins) == 1 + 4 * 20
+    assert origins["w3-19"] == "main" and origins["old"] == "main"
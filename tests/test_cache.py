@@ -0,0 +1,77 @@
+import os
+import subprocess
+
+from bettergit.config import Config, LLMConfig
+from bettergit.llm import pipeline
+from bettergit.llm.cache import CommitCache, cache_key
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+class _StubClient:
+    num_ctx = None
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, system, user, on_text=None, schema=None, **overrides):
+        self.calls += 1
+        return {"type": "feat", "summary": f"answer {self.calls}"}
+
+
+def test_cache_key_is_stable_per_tree_and_params():
+    assert cache_key("t1", model="m", temperature=0.1) == cache_key("t1", temperature=0.1, model="m")
+    assert cache_key("t1", model="m") != cache_key("t2", model="m")
+    assert cache_key("t1", model="m") != cache_key("t1", model="other")
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = CommitCache(tmp_path, max_entries=2)
+    cache.put("a", {"summary": "a"})
+    cache.put("b", {"summary": "b"})
+    os.utime(cache._path("a"), ns=(1_000, 1_000))
+    os.utime(cache._path("b"), ns=(2_000, 2_000))
+
+    # A hit refreshes "a", so "b" is now the oldest entry.
+    assert cache.get("a") == {"summary": "a"}
+    cache.put("c", {"summary": "c"})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"summary": "a"} and cache.get("c") == {"summary": "c"}
+    assert cache.get("missing") is None
+
+
+def test_keyed_by_staged_tree_and_regenerate_bypasses(tmp_path, monkeypatch):
+    _git(tmp_path, "init", "-q", "-b", "main")
+    (tmp_path / "a.txt").write_text("one\n")
+    _git(tmp_path, "add", "a.txt")
+    monkeypatch.chdir(tmp_path)
+    client = _StubClient()
+    monkeypatch.setattr(pipeline, "_client", lambda cfg: client)
+    monkeypatch.setattr(pipeline, "_unavailable", lambda cfg, breaker: False)
+    cfg = Config(llm=LLMConfig(context_buckets=(), metrics_enabled=False))
+
+    def generate(**kwargs):
+        return pipeline.generate_commit("", ["a.txt"], "feat", None, 1, 0, cfg, **kwargs)["summary"]
+
+    first_key = pipeline._cache_lookup(cfg)[1]
+    assert generate() == "answer 1"
+    assert generate() == "answer 1" and client.calls == 1
+
+    # Regenerating asks the model again and replaces the cached answer.
+    assert generate(use_cache=False) == "answer 2"
+    assert generate() == "answer 2" and client.calls == 2
+    # Speculative answers are not stored.
+    assert generate(use_cache=False, store=False) == "answer 3"
+    assert generate() == "answer 2"
+
+    # Another staged tree gets its own key; restaging the first tree hits again.
+    (tmp_path / "a.txt").write_text("two\n")
+    _git(tmp_path, "add", "a.txt")
+    assert pipeline._cache_lookup(cfg)[1] != first_key
+    assert generate() == "answer 4"
+    (tmp_path / "a.txt").write_text("one\n")
+    _git(tmp_path, "add", "a.txt")
+    assert pipeline._cache_lookup(cfg)[1] == first_key
+    assert generate() == "answer 2"
@@ -1,4 +1,6 @@
-﻿from bettergit.core.classify import detect_type_scope
+﻿from bettergit.core import diffparse
+from bettergit.core.classify import FIX_KEYWORDS, detect_type_scope
+from bettergit.core.gitio import NumstatEntry
 
 
 def test_docs_type():
@@ -6,3 +8,30 @@ def test_docs_type():
     files = ["README.md"]
     ctype, scope = detect_type_scope(diff, files, cfg=None)
     assert ctype == "docs"
+
+
+def test_fix_type_from_parsed_diff():
+    lines = iter([
+        "diff --git a/app.py b/app.py",
+        "--- a/app.py",
+        "+++ b/app.py",
+        "@@ -1 +1 @@",
+        "-    return None",
+        "+    raise ValueError('Bug 42')",
+    ])
+    diff = diffparse.parse(lines, keywords=FIX_KEYWORDS)
+    ctype, scope = detect_type_scope(diff, diff.paths, cfg=None)
+    assert ctype == "fix"
+    assert (diff.added, diff.removed) == (1, 1)
+
+
+def test_fix_type_from_raw_text_and_paths():
+    # Raw text is searched in full, context lines and file names included.
+    context_only = "diff --git a/app.py b/app.py\n@@ -1,2 +1,2 @@\n # fix later\n-a = 1\n+a = 2\n"
+    assert detect_type_scope(context_only, ["app.py"], cfg=None)[0] == "fix"
+
+    entries = [NumstatEntry("src/fix_crash.py", 3, 0, status="A"), NumstatEntry("src/app.py", 1, 1)]
+    diff = diffparse.from_numstat(entries, keywords=FIX_KEYWORDS)
+    assert [item.status for item in diff.files] == ["A", "M"]
+    assert diff.keyword_paths == ["src/fix_crash.py"]
+    assert detect_type_scope(diff, diff.paths, cfg=None)[0] == "fix"
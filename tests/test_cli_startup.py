@@ -0,0 +1,62 @@
+import re
+import subprocess
+import sys
+
+import typer
+
+from bettergit.cli.manifest import COMMANDS
+
+# Cumulative import time of bettergit.cli.main, in microseconds.
+IMPORT_BUDGET_US = 50_000
+
+
+def _importtime(code: str) -> dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    )
+    modules: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)", line)
+        if match:
+            modules[match.group(3)] = int(match.group(1))
+    return modules
+
+
+def test_entry_point_imports_stay_light():
+    modules = _importtime("import bettergit.cli.main")
+
+    assert not any(name == "typer" or name.startswith("bettergit.llm") for name in modules)
+    assert modules["bettergit.cli.main"] < IMPORT_BUDGET_US
+
+
+def test_command_lookup_imports_only_that_command():
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, typer.main; from bettergit.cli.app import app; "
+            "typer.main.get_command(app).get_command(None, 'switch'); print(*sys.modules)",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = result.stdout.split()
+
+    assert "bettergit.cli.commands.switch" in modules
+    assert not any(name.startswith(("bettergit.llm", "bettergit.cli.commands.suggest")) for name in modules)
+
+
+def test_manifest_matches_registered_commands():
+    import importlib
+    import pkgutil
+
+    import bettergit.cli.commands as commands
+
+    registered = {}
+    for info in pkgutil.iter_modules(commands.__path__):
+        holder = typer.Typer()
+        importlib.import_module(f"bettergit.cli.commands.{info.name}").register(holder)
+        for command in holder.registered_commands:
+            registered[command.name] = (info.name, command.help)
+    assert registered == COMMANDS
@@ -0,0 +1,64 @@
+from bettergit.core import diffparse
+from bettergit.llm import compact
+
+
+def _patch() -> list[str]:
+    lines = [
+        "diff --git a/package-lock.json b/package-lock.json",
+        "--- a/package-lock.json",
+        "+++ b/package-lock.json",
+        "@@ -1,200 +1,200 @@",
+    ]
+    lines += [f'-    "dep{i}": "1.0.{i}",' for i in range(200)]
+    lines += [f'+    "dep{i}": "1.1.{i}",' for i in range(200)]
+    lines += [
+        "diff --git a/src/app.py b/src/app.py",
+        "--- a/src/app.py",
+        "+++ b/src/app.py",
+        "@@ -1 +1 @@",
+        "-x = 1",
+        "+x  =  1",
+        "@@ -10,2 +10,3 @@ class App:",
+        "-    def run(self):",
+        "+    def run(self, fast=False):",
+        "+        self.fast = fast",
+        "     pass",
+    ]
+    return lines
+
+
+def test_source_changes_beat_lockfile_noise():
+    diff = diffparse.parse(_patch())
+    result = compact.compact(diff, budget_tokens=80)
+
+    assert "+    def run(self, fast=False):" in result.text
+    assert "=== package-lock.json (M, +200/-200)" in result.text
+    assert result.tokens <= 85
+    dropped = {item.path: item for item in result.omitted}
+    assert dropped["package-lock.json"].reason == "generated"
+    # Only the whitespace-only hunk of the source file is left out.
+    assert (dropped["src/app.py"].hunks, dropped["src/app.py"].added) == (1, 1)
+    assert result.note().startswith("[omitted")
+
+
+def test_everything_fits_with_large_budget():
+    diff = diffparse.parse(_patch()[-11:])
+    result = compact.compact(diff, budget_tokens=1000)
+
+    assert result.complete and result.note() == ""
+    assert result.kept_hunks == result.total_hunks == 2
+
+
+def test_headers_count_against_the_budget():
+    files = []
+    for index in range(3000):
+        item = diffparse.FileDiff(f"src/module_{index}.py")
+        item.added, item.removed = 2, 1
+        files.append(item)
+    result = compact.compact(diffparse.Diff(files, complete=False), budget_tokens=500)
+
+    assert result.tokens <= 500
+    assert "=== src/module_0.py (M, +2/-1)" in result.text
+    hidden = [item for item in result.omitted if item.reason == "collapsed"]
+    assert len(hidden) == 3000 - result.text.count("=== ")
+    assert result.text.endswith(f"[... and {len(hidden)} more file(s), +{2 * len(hidden)}/-{len(hidden)} lines]")
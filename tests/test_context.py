@@ -0,0 +1,44 @@
+import math
+
+from bettergit.llm import context
+
+
+def test_keep_alive_seconds():
+    assert context.keep_alive_seconds("30m") == 1800
+    assert context.keep_alive_seconds("1h30m") == 5400
+    assert context.keep_alive_seconds("90") == 90
+    assert context.keep_alive_seconds("-1") == math.inf
+    assert context.keep_alive_seconds(None) == 300
+    assert context.keep_alive_seconds("soon") == 300
+
+
+def test_reuses_loaded_bucket_until_it_expires(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(context.time, "time", lambda: now[0])
+    sizer = context.ContextSizer(tmp_path, [8192, 2048, 4096], keep_alive_s=60)
+    key = "http://localhost:11434|m"
+
+    assert sizer.choose(key, 1500) == 2048
+    assert sizer.choose(key, 3000) == 4096
+    # A smaller prompt keeps the loaded 4096 window instead of reloading at 2048.
+    assert sizer.choose(key, 1500) == 4096
+    assert sizer.choose(key, 50_000) == 8192
+
+    # State is shared with the next run; after keep_alive the model is gone.
+    later = context.ContextSizer(tmp_path, [2048, 4096, 8192], keep_alive_s=60)
+    assert later.loaded(key) == 8192
+    now[0] += 61
+    assert later.loaded(key) is None
+    assert later.expected(key) == 8192
+    now[0] += 61
+    assert later.choose(key, 1500) == 2048
+
+    assert context.ContextSizer(None, []).choose(key, 1500) is None
+
+
+def test_predict_tokens_fits_the_window():
+    user = "x" * 4000  # ~1000 tokens
+    assert context.predict_tokens("", user, None, 256) == 256
+    assert context.predict_tokens("", user, 4096, 256) == 256
+    assert context.predict_tokens("", user, 1400, 256) == 1400 - context.tokens_needed("", user, 0)
+    assert context.predict_tokens("", user, 1024, 256) == 64
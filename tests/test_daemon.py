@@ -0,0 +1,49 @@
+import os
+import socket
+import subprocess
+import sys
+
+import pytest
+
+from bettergit.cli import thin
+from bettergit.cli.daemon import spawn
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "send_fds"), reason="needs Unix fd passing")
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def _bgc(cwd, env, *args):
+    process = subprocess.run(
+        [sys.executable, "-m", "bettergit.cli.thin", *args], cwd=cwd, env=env, capture_output=True, text=True
+    )
+    return process.returncode, process.stdout
+
+
+def test_daemon_runs_commands_with_fresh_refs(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q", "-b", "main")
+    _git(repo, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "--allow-empty", "-m", "init")
+    _git(repo, "branch", "alpha")
+    path = tmp_path / "d.sock"
+    env = dict(os.environ, BETTERGIT_DAEMON_SOCKET=str(path))
+    env.pop("BETTERGIT_NO_DAEMON", None)
+
+    spawn(path, idle_timeout=60)
+    try:
+        local = _bgc(repo, dict(env, BETTERGIT_NO_DAEMON="1"), "branch")
+        assert _bgc(repo, env, "branch") == local
+        assert "alpha" in local[1]
+
+        # A ref written behind the daemon's back must show up on the next call.
+        _git(repo, "branch", "beta")
+        code, output = _bgc(repo, env, "branch")
+        assert code == 0 and "beta" in output
+
+        assert _bgc(repo, env, "no-such-command")[0] == 2
+        assert thin.request({"control": "ping"}, str(path))["served"] == 3
+    finally:
+        thin.request({"control": "stop"}, str(path))
@@ -0,0 +1,50 @@
+from bettergit.core import diffparse
+
+PATCH = """\
+diff --git a/src/app.py b/src/app.py
+index 1111111..2222222 100644
+--- a/src/app.py
++++ b/src/app.py
+@@ -10,2 +10,4 @@ def handler(event):
+     value = event["x"]
+-    return value
++    if value is None:
++        raise ValueError("missing")
++    return value
+diff --git a/docs/old name.md b/docs/new name.md
+similarity index 90%
+rename from docs/old name.md
+rename to docs/new name.md
+--- a/docs/old name.md\t
++++ b/docs/new name.md\t
+@@ -1 +1 @@
+-Title
++New title
+\\ No newline at end of file
+diff --git a/logo.png b/logo.png
+new file mode 100644
+index 0000000..3333333
+Binary files /dev/null and b/logo.png differ
+"""
+
+
+def test_parse_structure():
+    diff = diffparse.parse(PATCH.splitlines(), keywords=["error"])
+
+    app, doc, logo = diff.files
+    assert (app.path, app.status, app.added, app.removed) == ("src/app.py", "M", 3, 1)
+    assert app.hunks[0].header == "def handler(event):"
+    assert (app.hunks[0].old_start, app.hunks[0].new_count) == (10, 4)
+    assert app.mentions and diff.keyword_paths == ["src/app.py"]
+    assert (doc.path, doc.old_path, doc.status) == ("docs/new name.md", "docs/old name.md", "R")
+    assert (logo.status, logo.binary) == ("A", True)
+    assert (diff.added, diff.removed) == (4, 2)
+
+
+def test_retention_limits_keep_counts_exact():
+    diff = diffparse.parse(PATCH.splitlines(), max_hunk_lines=1)
+
+    assert diff.files[0].hunks[0].lines == ['     value = event["x"]']
+    assert not diff.complete
+    assert (diff.added, diff.removed) == (4, 2)
+    assert diff.render(60).endswith(diffparse.TRUNCATION_MARKER)
@@ -0,0 +1,40 @@
+import subprocess
+
+from bettergit.core import gitbatch
+
+
+def _git(cwd, *args):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def test_lookups_missing_objects_and_restart(tmp_path):
+    _git(tmp_path, "init", "-q", "-b", "main")
+    (tmp_path / "notes.txt").write_text("hello\n")
+    _git(tmp_path, "add", "notes.txt")
+    _git(tmp_path, "-c", "user.name=Ada", "-c", "user.email=a@b", "commit", "-q", "-m", "Add notes\n\nBody.")
+    head = _git(tmp_path, "rev-parse", "HEAD")
+    batch = gitbatch.GitBatch(["git"], str(tmp_path))
+    try:
+        assert batch.resolve("HEAD") == head
+        oid, kind, content = batch.read_object("HEAD:notes.txt")
+        assert (kind, content) == ("blob", b"hello\n")
+        assert oid == _git(tmp_path, "rev-parse", "HEAD:notes.txt")
+        summary = batch.last_commit("main")
+        assert (summary.sha, summary.author, summary.title) == (head, "Ada", "Add notes")
+        assert summary.date == _git(tmp_path, "log", "-1", "--format=%ad")
+
+        # Missing objects are answered on the same pipe without killing the helper.
+        first = batch._process
+        assert batch.resolve("refs/heads/nope") is None
+        assert batch.read_object("0" * 40) is None
+        assert batch.last_commit("HEAD:notes.txt") is None
+        assert batch._process is first
+
+        # A helper that died is replaced transparently on the next query.
+        first.kill()
+        first.wait()
+        assert batch.resolve("HEAD") == head
+        assert batch._process is not first and batch._process.poll() is None
+    finally:
+        batch.close()
+    assert batch._process is None
@@ -0,0 +1,102 @@
+import subprocess
+
+import pytest
+
+from bettergit.core import gitio
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def test_branch_infos_tracking_and_patterns(tmp_path, monkeypatch):
+    _git(tmp_path, "init", "-q", "-b", "main")
+    _git(tmp_path, "commit", "-q", "--allow-empty", "-m", "init")
+    _git(tmp_path, "remote", "add", "origin", str(tmp_path / "missing"))
+    for name in ("feature/ahead", "feature/behind", "gone"):
+        _git(tmp_path, "branch", name)
+    _git(tmp_path, "branch", "--set-upstream-to=main", "feature/ahead")
+    _git(tmp_path, "branch", "--set-upstream-to=main", "feature/behind")
+    _git(tmp_path, "config", "branch.gone.remote", "origin")
+    _git(tmp_path, "config", "branch.gone.merge", "refs/heads/gone")
+    _git(tmp_path, "checkout", "-q", "feature/ahead")
+    _git(tmp_path, "commit", "-q", "--allow-empty", "-m", "one")
+    _git(tmp_path, "commit", "-q", "--allow-empty", "-m", "two")
+    _git(tmp_path, "checkout", "-q", "main")
+    _git(tmp_path, "commit", "-q", "--allow-empty", "-m", "main moves")
+    monkeypatch.chdir(tmp_path)
+
+    infos = {info.name: info for info in gitio.branch_infos()}
+    assert set(infos) == {"main", "feature/ahead", "feature/behind", "gone"}
+    ahead = infos["feature/ahead"]
+    assert (ahead.tracking, ahead.ahead, ahead.behind, ahead.upstream_gone) == ("main", 2, 1, False)
+    assert ahead.last_commit_title == "two" and ahead.last_commit_author == "t"
+    behind = infos["feature/behind"]
+    assert (behind.ahead, behind.behind) == (0, 1)
+    gone = infos["gone"]
+    assert (gone.tracking, gone.upstream_gone) == (None, True)
+    assert (infos["main"].tracking, infos["main"].ahead, infos["main"].behind) == (None, 0, 0)
+
+    assert [info.name for info in gitio.branch_infos(["feature"])] == ["feature/ahead", "feature/behind"]
+    assert [info.name for info in gitio.branch_infos(["feature/b*", "refs/heads/main"])] == ["feature/behind", "main"]
+    assert gitio.branch_infos(["nothing*"]) == []
+
+    # Branches with an upstream take the for-each-ref pass; the others are read without forking git.
+    assert gitio.branch_info("feature/ahead") == ahead
+    assert gitio.branch_info("gone").upstream_gone
+
+    def no_fork(*args, **kwargs):
+        raise AssertionError("git was forked")
+
+    monkeypatch.setattr(gitio, "_run_git_unchecked", no_fork)
+    monkeypatch.setattr(gitio, "_stream_git", no_fork)
+    assert gitio.branch_info("main") == infos["main"]
+    assert gitio.local_oid("refs/heads/main") == infos["main"].last_commit_sha
+
+
+def test_branch_info_unknown_branch(tmp_path, monkeypatch):
+    _git(tmp_path, "init", "-q", "-b", "main")
+    monkeypatch.chdir(tmp_path)
+    # An unborn branch has no data yet but is not an error.
+    assert gitio.branch_info().last_commit_sha is None
+
+    _git(tmp_path, "commit", "-q", "--allow-empty", "-m", "init")
+    with pytest.raises(gitio.GitError):
+        gitio.branch_info("nope")
+
+
+def test_parse_track():
+    assert gitio._parse_track("") == (0, 0, False)
+    assert gitio._parse_track("ahead 3") == (3, 0, False)
+    assert gitio._parse_track("ahead 2, behind 10") == (2, 10, False)
+    assert gitio._parse_track("gone") == (0, 0, True)
+
+
+def test_staged_numstat_and_keyword_search(tmp_path, monkeypatch):
+    _git(tmp_path, "init", "-q", "-b", "main")
+    body = "".join(f"line {i}\n" for i in range(20))
+    (tmp_path / "old name.txt").write_text(body)
+    (tmp_path / "keep.py").write_text("x = 1\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "init")
+
+    _git(tmp_path, "mv", "old name.txt", "new\tname.txt")
+    (tmp_path / "new\tname.txt").write_text(body + "extra\n")
+    (tmp_path / "logo.bin").write_bytes(b"\x00\x01\x02binary\x00")
+    (tmp_path / "keep.py").write_text("x = 1\n# TODO: Fix the Crash\n")
+    (tmp_path / "unstaged.py").write_text("# fix me\n")
+    _git(tmp_path, "add", "new\tname.txt", "logo.bin", "keep.py")
+    monkeypatch.chdir(tmp_path)
+
+    entries = {entry.path: entry for entry in gitio.get_staged_numstat()}
+    assert set(entries) == {"new\tname.txt", "logo.bin", "keep.py"}
+    renamed = entries["new\tname.txt"]
+    assert (renamed.old_path, renamed.added, renamed.removed) == ("old name.txt", 1, 0)
+    assert entries["logo.bin"].binary and entries["logo.bin"].removed is None
+    assert (entries["keep.py"].added, entries["keep.py"].old_path) == (1, None)
+    assert [entries[path].status for path in ("new\tname.txt", "logo.bin", "keep.py")] == ["R", "A", "M"]
+
+    assert gitio.get_staged_paths_matching(["crash"]) == ["keep.py"]
+    assert gitio.get_staged_paths_matching(["extra", "a.b"]) == ["new\tname.txt"]
+    assert gitio.get_staged_paths_matching(["fix me"]) == []
+    assert gitio.get_staged_paths_matching([]) == []
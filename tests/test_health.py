@@ -0,0 +1,63 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bettergit.llm.health import CircuitBreaker
+
+
+def _dead_host() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def test_breaker_opens_after_threshold_and_persists(tmp_path):
+    host = _dead_host()
+    first = CircuitBreaker(tmp_path, threshold=2, cooldown_s=60)
+    assert "not reachable" in first.check(host, 0.2)
+    # Within one invocation the unreachable host is neither probed nor counted again.
+    assert "not reachable" in first.check(host, 0.2)
+    assert first.open_for == 0
+
+    breaker = CircuitBreaker(tmp_path, threshold=2, cooldown_s=60)
+    assert "not reachable" in breaker.check(host, 0.2)
+    assert breaker.check(host, 0.2).startswith("circuit open")
+
+    # A new process sees the same state without probing.
+    assert CircuitBreaker(tmp_path, threshold=2, cooldown_s=60).open_for > 0
+
+
+def test_recent_success_skips_probe(tmp_path):
+    breaker = CircuitBreaker(tmp_path, probe_ttl_s=30)
+    breaker.success()
+
+    assert breaker.check(_dead_host(), 0.2) is None
+
+
+class _VersionOnly(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = b'{"version": "0"}'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def test_probe_success_does_not_reset_failures(tmp_path):
+    # A server that answers the probe but whose requests keep failing must still open the breaker.
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _VersionOnly)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        for _ in range(2):
+            breaker = CircuitBreaker(tmp_path, threshold=2, cooldown_s=60)
+            assert breaker.check(host, 1.0) is None
+            breaker.failure()
+        assert CircuitBreaker(tmp_path, threshold=2, cooldown_s=60).check(host, 1.0).startswith("circuit open")
+    finally:
+        server.shutdown()
+        server.server_close()
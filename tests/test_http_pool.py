@@ -0,0 +1,98 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bettergit.llm.http import ConnectionPool
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    peers: list = []
+    drop = False
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.peers.append(self.client_address)
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Close without announcing it, like a server dropping an idle keep-alive socket.
+        self.close_connection = self.drop
+
+
+def _serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_pool_reuses_and_reconnects():
+    _Handler.peers = []
+    server = _serve()
+    pool = ConnectionPool(f"http://127.0.0.1:{server.server_address[1]}", size=2)
+    try:
+        for _ in range(3):
+            with pool.request("POST", "/api/chat", b"{}", timeout=5) as response:
+                assert response.read() == b'{"ok": true}'
+        assert pool.connections_opened == 1
+        assert len(set(_Handler.peers)) == 1
+
+        _Handler.drop = True
+        with pool.request("POST", "/api/chat", b"{}", timeout=5) as response:
+            response.read()
+        _Handler.drop = False
+        time.sleep(0.1)
+        with pool.request("POST", "/api/chat", b"{}", timeout=5) as response:
+            assert response.read() == b'{"ok": true}'
+        assert pool.connections_opened == 2
+    finally:
+        pool.close()
+        server.shutdown()
+
+
+def test_close_aborts_request_in_flight():
+    class Stalled(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            time.sleep(5)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Stalled)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    pool = ConnectionPool(f"http://127.0.0.1:{server.server_address[1]}")
+    errors = []
+
+    def send():
+        try:
+            with pool.request("POST", "/api/chat", b"{}", timeout=10, connect_timeout=1) as response:
+                response.read()
+        except OSError as exc:
+            errors.append(exc)
+
+    worker = threading.Thread(target=send)
+    started = time.monotonic()
+    worker.start()
+    time.sleep(0.2)
+    pool.close()
+    worker.join(5)
+    try:
+        assert not worker.is_alive() and errors
+        assert time.monotonic() - started < 2
+        try:
+            with pool.request("POST", "/api/chat", b"{}", timeout=1):
+                pass
+        except ConnectionAbortedError:
+            pass
+        else:
+            raise AssertionError("a closed pool must refuse new requests")
+    finally:
+        server.shutdown()
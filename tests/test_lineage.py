@@ -0,0 +1,90 @@
+import subprocess
+
+from bettergit.core import gitio, lineage
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def _commit(cwd, message):
+    _git(cwd, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "--allow-empty", "-m", message)
+
+
+def _parents(result):
+    return {name: item.parent for name, item in result.items()}
+
+
+def test_infers_parents_and_reuses_cached_pairs(tmp_path, monkeypatch):
+    _git(tmp_path, "init", "-q", "-b", "main")
+    _commit(tmp_path, "c1")
+    _commit(tmp_path, "c2")
+    _git(tmp_path, "checkout", "-q", "-b", "develop")
+    _commit(tmp_path, "d1")
+    _commit(tmp_path, "d2")
+    _commit(tmp_path, "d3")
+    _git(tmp_path, "checkout", "-q", "-b", "feature", "develop~1")
+    _commit(tmp_path, "f1")
+    _git(tmp_path, "checkout", "-q", "main")
+    _commit(tmp_path, "c3")
+    _git(tmp_path, "branch", "same")
+    monkeypatch.chdir(tmp_path)
+
+    expected = {"develop": "main", "feature": "develop", "same": "main"}
+    assert _parents(lineage.infer_parents()) == expected
+    assert (tmp_path / ".git" / "bettergit" / "lineage.json").exists()
+
+    # Nothing moved: answered from the cache without loading the graph.
+    calls = []
+    real = gitio.iter_commit_parents
+    monkeypatch.setattr(gitio, "iter_commit_parents", lambda tips, exclude=(): calls.append(tips) or real(tips, exclude))
+    assert _parents(lineage.infer_parents()) == expected
+    assert calls == []
+
+    _git(tmp_path, "checkout", "-q", "-b", "topic", "feature")
+    _commit(tmp_path, "t1")
+    assert _parents(lineage.infer_parents()) == {**expected, "topic": "feature"}
+    assert len(calls) == 1
+
+
+def test_graph_leaves_out_shared_history(tmp_path, monkeypatch):
+    _git(tmp_path, "init", "-q", "-b", "main")
+    for index in range(20):
+        _commit(tmp_path, f"old {index}")
+    _git(tmp_path, "checkout", "-q", "-b", "feature")
+    _commit(tmp_path, "f1")
+    _git(tmp_path, "checkout", "-q", "-b", "topic")
+    _commit(tmp_path, "t1")
+    _git(tmp_path, "checkout", "-q", "main")
+    _commit(tmp_path, "m1")
+    monkeypatch.chdir(tmp_path)
+
+    tips = gitio.branch_tips()
+    graph = lineage._Graph(tips.values())
+    # Only m1, f1 and t1 are loaded; the 20 shared commits are not.
+    assert len(graph.first_parent) == 3
+    assert _parents(lineage.infer_parents(tips)) == {"feature": "main", "topic": "feature"}
+
+
+def test_orphan_branch_does_not_load_shared_history(tmp_path, monkeypatch):
+    _git(tmp_path, "init", "-q", "-b", "main")
+    for index in range(20):
+        _commit(tmp_path, f"old {index}")
+    _git(tmp_path, "checkout", "-q", "-b", "feature")
+    _commit(tmp_path, "f1")
+    _git(tmp_path, "checkout", "-q", "--orphan", "gh-pages")
+    for index in range(5):
+        _commit(tmp_path, f"site {index}")
+    _git(tmp_path, "checkout", "-q", "-b", "site-fix")
+    _commit(tmp_path, "s1")
+    _git(tmp_path, "checkout", "-q", "main")
+    _commit(tmp_path, "m1")
+    monkeypatch.chdir(tmp_path)
+
+    tips = gitio.branch_tips()
+    graph = lineage._Graph(tips.values())
+    # m1, f1 and s1; neither history is walked past the merge base of its group.
+    assert len(graph.first_parent) == 3
+    parents = lineage.infer_parents(tips)
+    assert _parents(parents) == {"feature": "main", "site-fix": "gh-pages"}
+    assert parents["site-fix"].distance == 1
@@ -0,0 +1,39 @@
+from bettergit.core import diffparse
+from bettergit.llm import mapreduce
+
+
+def _file(path: str, lines: int) -> list[str]:
+    return [
+        f"diff --git a/{path} b/{path}",
+        f"--- a/{path}",
+        f"+++ b/{path}",
+        f"@@ -0,0 +1,{lines} @@",
+        *[f"+line {i} of {path}" for i in range(lines)],
+    ]
+
+
+def _diff():
+    return diffparse.parse(
+        _file("src/a.py", 10) + _file("src/b.py", 10) + _file("docs/big.md", 200) + _file("setup.py", 5)
+    )
+
+
+def test_split_keeps_directories_together_and_isolates_big_files():
+    chunks = mapreduce.split(_diff(), budget_tokens=300)
+
+    assert [chunk.paths for chunk in chunks] == [["src/a.py", "src/b.py"], ["docs/big.md"], ["setup.py"]]
+
+
+class _Client:
+    def generate(self, system, user, schema=None):
+        if "setup.py" in user:
+            raise OSError("boom")
+        return {"type": "feat", "summary": "did things"}
+
+
+def test_summarize_preserves_order_and_survives_failures():
+    lines = mapreduce.summarize(_Client(), mapreduce.split(_diff(), 300), budget_tokens=300, workers=3)
+
+    assert lines[0].startswith("- [feat] did things; files: src/a.py, src/b.py")
+    assert lines[2] == "- (no summary) setup.py (+5/-0)"
+    assert len(lines) == 3
@@ -0,0 +1,21 @@
+from bettergit.llm.metrics import MetricsLog, RequestStats, percentile, stats_from_response
+
+
+def test_log_rotates_and_reads_back_in_order(tmp_path):
+    log = MetricsLog(tmp_path, max_bytes=400, backups=1)
+    for index in range(12):
+        log.append(RequestStats("m", wall_s=float(index)))
+
+    walls = [item.wall_s for item in log]
+    assert walls == sorted(walls) and walls[-1] == 11.0
+    assert len(walls) < 12  # the oldest file was dropped
+    assert (tmp_path / "bettergit" / "llm-metrics.jsonl.1").exists()
+
+
+def test_ollama_fields_and_percentiles():
+    stats = stats_from_response(
+        RequestStats("m"), {"load_duration": 2_000_000_000, "eval_count": 50, "eval_duration": 500_000_000}
+    )
+    assert (stats.load_s, stats.eval_tps, stats.prompt_tps) == (2.0, 100.0, None)
+    assert percentile([5, 1, 3, 2, 4], 50) == 3
+    assert percentile([], 90) is None
@@ -0,0 +1,11 @@
+from bettergit.llm.partial import FieldStream
+
+
+def test_field_stream_decodes_across_fragments():
+    document = '{"type": "feat", "summary": "caf\\u00e9 \\"quoted\\"\\nnext", "body": "ignored"}'
+    stream = FieldStream("summary")
+
+    pieces = [stream.feed(document[i : i + 3]) for i in range(0, len(document), 3)]
+
+    assert "".join(pieces) == 'café "quoted"\nnext'
+    assert stream.done
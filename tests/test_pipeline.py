@@ -0,0 +1,78 @@
+import threading
+
+from bettergit.config import Config, LLMConfig
+from bettergit.llm import health, pipeline
+from bettergit.llm.health import CircuitBreaker
+
+
+class _StubClient:
+    def __init__(self):
+        self.num_ctx = None
+        self.preloads = 0
+        self.release = threading.Event()
+
+    def preload(self):
+        self.preloads += 1
+        self.release.wait(5)
+
+
+def test_warm_up_preloads_once_in_the_background(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    probes = []
+    monkeypatch.setattr(health, "probe", lambda host, timeout: probes.append(host) or True)
+    client = _StubClient()
+    monkeypatch.setattr(pipeline, "_client", lambda cfg: client)
+    cfg = Config(llm=LLMConfig(context_buckets=(2048, 4096), metrics_enabled=False))
+    breaker = CircuitBreaker(None)
+
+    thread = pipeline.warm_up(cfg, breaker)
+    # The caller gets control back while the model is still loading.
+    assert thread.daemon and thread.is_alive()
+    client.release.set()
+    thread.join(5)
+    assert client.preloads == 1 and client.num_ctx == 2048
+    assert len(probes) == 1
+
+    # The generation that follows trusts the warm-up's probe.
+    assert breaker.check(cfg.llm.ollama_host, cfg.llm.probe_timeout) is None
+    assert len(probes) == 1
+
+
+def test_warm_up_skipped_when_breaker_is_open(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    probes = []
+    monkeypatch.setattr(health, "probe", lambda host, timeout: probes.append(host) or True)
+    client = _StubClient()
+    monkeypatch.setattr(pipeline, "_client", lambda cfg: client)
+    cfg = Config(llm=LLMConfig(metrics_enabled=False))
+    breaker = CircuitBreaker(None, threshold=1, cooldown_s=60)
+    breaker.failure()
+
+    pipeline.warm_up(cfg, breaker).join(5)
+    assert client.preloads == 0 and probes == []
+
+
+def test_local_prompt_errors_do_not_count_against_the_breaker(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(pipeline, "_client", lambda cfg: _StubClient())
+    cfg = Config(llm=LLMConfig(cache_enabled=False, metrics_enabled=False))
+    breaker = CircuitBreaker(None, threshold=1, cooldown_s=60)
+    breaker.success()
+
+    def broken_diff():
+        raise pipeline.GitError("git diff failed")
+
+    result = pipeline.generate_commit(broken_diff, ["a.py"], "fix", None, 1, 0, cfg, breaker=breaker)
+    assert result["type"] == "fix"
+    assert breaker.open_for == 0 and breaker._state["failures"] == 0
+
+
+def test_skip_notice_goes_to_stderr(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    cfg = Config(llm=LLMConfig(cache_enabled=False, metrics_enabled=False))
+    breaker = CircuitBreaker(None, threshold=1, cooldown_s=60)
+    breaker.failure()
+
+    pipeline.generate_commit("", ["a.py"], "fix", None, 1, 0, cfg, breaker=breaker)
+    out, err = capsys.readouterr()
+    assert out == "" and "LLM SKIPPED" in err
@@ -0,0 +1,92 @@
+import threading
+import time
+
+from bettergit.config import Config, LLMConfig
+from bettergit.llm import pipeline
+from bettergit.llm.prefetch import Prefetcher
+
+
+def test_takes_in_order_and_keeps_depth_in_flight():
+    produced = []
+    lock = threading.Lock()
+
+    def produce():
+        with lock:
+            produced.append(len(produced))
+            return produced[-1]
+
+    prefetcher = Prefetcher(produce, depth=2)
+    prefetcher.start()
+    assert prefetcher.take() == 0
+    assert prefetcher.take() == 1
+    assert prefetcher.take() == 2
+    prefetcher.cancel()
+    # Three taken plus two replacements scheduled at most.
+    assert len(produced) <= 5
+
+
+def test_errors_surface_on_take_and_depth_zero_runs_inline():
+    def fail():
+        raise ValueError("boom")
+
+    prefetcher = Prefetcher(fail)
+    prefetcher.start()
+    try:
+        prefetcher.take()
+    except ValueError as exc:
+        assert str(exc) == "boom"
+    else:
+        raise AssertionError("the worker's error must reach take()")
+
+    calls = []
+    inline = Prefetcher(lambda: calls.append(threading.current_thread()) or len(calls), depth=0)
+    inline.start()
+    assert not inline.ready()
+    assert inline.take() == 1 and calls == [threading.current_thread()]
+
+
+def test_cancel_aborts_work_in_flight():
+    started, release = threading.Event(), threading.Event()
+    finished = []
+
+    def produce():
+        started.set()
+        release.wait(5)
+        finished.append(release.is_set())
+
+    prefetcher = Prefetcher(produce, on_cancel=release.set)
+    prefetcher.start()
+    assert started.wait(5)
+    assert not prefetcher.ready()
+    started_at = time.monotonic()
+    prefetcher.cancel()
+    # The hook unblocked the worker, and cancel() returned only once it was done.
+    assert finished == [True]
+    assert time.monotonic() - started_at < 2
+    assert not prefetcher.ready()
+
+
+class _StubClient:
+    num_ctx = None
+
+    class pool:
+        closed = False
+
+    def generate(self, system, user, on_text=None, schema=None, **overrides):
+        return {"type": "feat", "summary": f"seed {overrides.get('seed')}"}
+
+
+def test_shared_prompt_is_built_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    built = []
+    monkeypatch.setattr(pipeline, "_build_prompt", lambda *args: built.append(args) or "prompt")
+    monkeypatch.setattr(pipeline, "_unavailable", lambda cfg, breaker: False)
+    cfg = Config(llm=LLMConfig(context_buckets=(), metrics_enabled=False, cache_enabled=False))
+    shared = pipeline.SharedPrompt()
+
+    for _ in range(3):
+        answers = pipeline.generate_candidates(
+            "", ["a.py"], "feat", None, 1, 0, cfg, count=1, prompt=shared, client=_StubClient()
+        )
+        assert answers[0]["summary"] == "seed None"
+    assert len(built) == 1
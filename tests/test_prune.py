@@ -0,0 +1,41 @@
+import subprocess
+
+from bettergit.core import branchmeta, gitio
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def test_bulk_delete_reports_each_branch(tmp_path, monkeypatch):
+    _git(tmp_path, "init", "-q", "-b", "main")
+    _git(tmp_path, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "--allow-empty", "-m", "init")
+    for name in ("done-1", "done-2", "wip"):
+        _git(tmp_path, "branch", name)
+    _git(tmp_path, "checkout", "-q", "wip")
+    _git(tmp_path, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "--allow-empty", "-m", "wip")
+    _git(tmp_path, "checkout", "-q", "main")
+    monkeypatch.chdir(tmp_path)
+    for name in ("done-1", "done-2", "wip"):
+        branchmeta.record_origin(name, "main")
+
+    assert gitio.merged_refs("main", ["refs/heads"]) == {"refs/heads/main", "refs/heads/done-1", "refs/heads/done-2"}
+
+    deleted, kept = gitio.delete_branches(["done-1", "wip", "done-2", "missing"])
+    assert deleted == ["done-1", "done-2"]
+    assert set(kept) == {"wip", "missing"} and "not fully merged" in kept["wip"]
+
+    branchmeta.forget(deleted)
+    assert branchmeta.load_all() == {"wip": "main"}
+
+
+def test_bulk_delete_ignores_the_user_locale(tmp_path, monkeypatch):
+    _git(tmp_path, "init", "-q", "-b", "main")
+    _git(tmp_path, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "--allow-empty", "-m", "init")
+    _git(tmp_path, "branch", "done")
+    monkeypatch.chdir(tmp_path)
+    # Git translates "Deleted branch ..." when a translation is installed.
+    monkeypatch.setenv("LC_ALL", "C.UTF-8")
+    monkeypatch.setenv("LANGUAGE", "de")
+
+    assert gitio.delete_branches(["done", "missing"]) == (["done"], {"missing": "branch 'missing' not found."})
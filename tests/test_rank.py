@@ -0,0 +1,19 @@
+from bettergit.llm.rank import rank_candidates
+
+
+def test_rank_prefers_consistent_short_headers_and_drops_duplicates():
+    files = ["src/parser/lexer.py"]
+    candidates = [
+        {"type": "feat", "scope": "ui", "summary": "add a token type to the lexer"},
+        {"type": "fix", "scope": "parser", "summary": "handle unterminated strings in the lexer"},
+        {"type": "fix", "scope": "parser", "summary": "handle unterminated strings in lexer"},
+        {"type": "fix", "scope": "parser", "summary": "x" * 80},
+    ]
+
+    ranked = rank_candidates(candidates, "fix", "src", files)
+
+    assert [item["summary"] for item in ranked] == [
+        "handle unterminated strings in the lexer",
+        "add a token type to the lexer",
+        "x" * 80,
+    ]
@@ -0,0 +1,97 @@
+import subprocess
+from pathlib import Path
+
+from bettergit.core import refs
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def test_packed_refs_bisect(tmp_path):
+    names = sorted(f"refs/heads/b{i:05d}" for i in range(2000))
+    lines = ["# pack-refs with: peeled fully-peeled sorted "]
+    for i, name in enumerate(names):
+        lines.append(f"{i:040x} {name}")
+        if i % 7 == 0:
+            lines.append(f"^{i + 1:040x}")
+    path = tmp_path / "packed-refs"
+    path.write_text("\n".join(lines) + "\n")
+
+    packed = refs._PackedRefs(path)
+    assert packed.lookup("refs/heads/b01234") == f"{1234:040x}"
+    assert packed.lookup("refs/heads/b01234x") is None
+    assert packed.lookup("refs/heads/a") is None
+    assert [name for name, _ in packed.iter_prefix("refs/heads/b0199")] == names[1990:2000]
+
+
+def test_matches_git_branch(tmp_path, monkeypatch):
+    _git(tmp_path, "init", "-q", "-b", "main")
+    _git(tmp_path, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "--allow-empty", "-m", "init")
+    for name in ("feature/x", "zeta", "alpha"):
+        _git(tmp_path, "branch", name)
+    _git(tmp_path, "pack-refs", "--all")
+    _git(tmp_path, "branch", "loose")
+    _git(tmp_path, "config", "branch.zeta.remote", ".")
+    _git(tmp_path, "config", "branch.zeta.merge", "refs/heads/main")
+    monkeypatch.chdir(tmp_path)
+    refs._STORES.clear()
+
+    expected = subprocess.run(
+        ["git", "for-each-ref", "--format=%(refname:short)", "refs/heads"],
+        cwd=tmp_path, capture_output=True, text=True, check=True,
+    ).stdout.split()
+    assert refs.list_branches() == expected
+    assert refs.current_branch() == "main"
+    assert refs.upstream("zeta") == "main"
+    assert refs.upstream("alpha") is None
+
+
+def test_config_matches_git_and_packed_map_is_closed(tmp_path):
+    _git(tmp_path, "init", "-q", "-b", "main")
+    config = tmp_path / ".git" / "config"
+    config.write_text(
+        config.read_text()
+        + '[branch "zeta"] remote = .\n'
+        + "\tmerge = refs/heads/\\\n  main ; comment\n"
+        + '[alias]\n\tsay = "!echo \\"a;b\\"" # trailing\n'
+    )
+    expected = subprocess.run(
+        ["git", "config", "--file", str(config), "--list"], capture_output=True, text=True, check=True,
+    ).stdout.splitlines()
+    parsed = refs._parse_config(config)
+    assert sorted(f"{key}={value}" for key, values in parsed.items() for value in values) == sorted(expected)
+
+    broken = tmp_path / "broken"
+    broken.write_text("[core]\n\tbare = \\q\n")
+    try:
+        refs._parse_config(broken)
+    except refs.UnsupportedRepository:
+        pass
+    else:
+        raise AssertionError("an unknown escape must fall back to git")
+
+    _git(tmp_path, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "--allow-empty", "-m", "init")
+    _git(tmp_path, "pack-refs", "--all")
+    store = refs.RefStore(tmp_path / ".git", tmp_path / ".git")
+    first = store._packed_refs()
+    (tmp_path / ".git" / "packed-refs").write_text("# pack-refs with: peeled sorted \n")
+    assert store._packed_refs() is not first
+    assert first._data == b""
+
+
+def test_store_registry_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(refs, "_MAX_STORES", 2)
+    monkeypatch.setattr(refs, "_STORES", {})
+    repos = []
+    for name in ("a", "b", "c"):
+        repo = tmp_path / name
+        repo.mkdir()
+        _git(repo, "init", "-q")
+        repos.append(repo)
+
+    first = refs.discover(repos[0])
+    refs.discover(repos[1])
+    assert refs.discover(repos[0]) is first  # a hit makes "a" the most recent
+    refs.discover(repos[2])
+    assert [Path(key).parent.name for key in refs._STORES] == ["a", "c"]
@@ -0,0 +1,83 @@
+import subprocess
+
+from bettergit.core import gitio, remotes
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def test_snapshot_answers_lookups_and_follows_our_pushes(tmp_path, monkeypatch):
+    bare = tmp_path / "remote.git"
+    repo = tmp_path / "work"
+    _git(tmp_path, "init", "-q", "--bare", str(bare))
+    _git(tmp_path, "init", "-q", "-b", "main", str(repo))
+    _git(repo, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "--allow-empty", "-m", "init")
+    _git(repo, "remote", "add", "origin", str(bare))
+    _git(repo, "tag", "v1")
+    _git(repo, "push", "-q", "origin", "main", "v1")
+    monkeypatch.chdir(repo)
+
+    calls = []
+    real = gitio.ls_remote
+    monkeypatch.setattr(gitio, "ls_remote", lambda remote: calls.append(remote) or real(remote))
+
+    assert remotes.branch_exists("main", "origin")
+    assert remotes.find_tag("v1", "origin") is not None
+    assert remotes.find_tag("v2", "origin") is None
+    assert calls == ["origin"]
+
+    # Our own pushes and deletions update the snapshot without another ls-remote.
+    _git(repo, "tag", "v2")
+    gitio.push_tag("v2", "origin")
+    remotes.record_push("origin", ["refs/tags/v2"])
+    gitio.delete_remote_tag("v1", "origin")
+    remotes.record_updates("origin", {"refs/tags/v1": None})
+    assert remotes.find_tag("v2", "origin") == gitio.find_tag("v2", "origin") == gitio.local_oid("refs/tags/v2")
+    assert remotes.find_tag("v1", "origin") is None and gitio.find_tag("v1", "origin") is None
+    assert calls == ["origin"]
+
+    # Changes made behind our back show up after --refresh or once the TTL expires.
+    _git(bare, "branch", "other", "main")
+    assert not remotes.branch_exists("other", "origin")
+    assert gitio.remote_branch_exists("origin", "other")
+    assert remotes.branch_exists("other", "origin", refresh=True)
+    assert remotes.branch_exists("other", "origin", max_age=0)
+    assert calls == ["origin"] * 3
+    assert sorted(remotes.snapshot("origin").refs) == ["refs/heads/main", "refs/heads/other", "refs/tags/v2"]
+
+
+def test_bulk_delete_resolves_globs_and_reports_each_ref(tmp_path, monkeypatch):
+    bare = tmp_path / "remote.git"
+    repo = tmp_path / "work"
+    _git(tmp_path, "init", "-q", "--bare", str(bare))
+    _git(tmp_path, "init", "-q", "-b", "main", str(repo))
+    _git(repo, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "--allow-empty", "-m", "init")
+    _git(repo, "remote", "add", "origin", str(bare))
+    for name in ("v1.0", "v1.1", "v1.2", "v2.0"):
+        _git(repo, "tag", name)
+    _git(repo, "push", "-q", "origin", "main", "--tags")
+    monkeypatch.chdir(repo)
+
+    refnames, unmatched = remotes.snapshot("origin").match("refs/tags/", ["v1.*", "v3"])
+    assert refnames == ["refs/tags/v1.0", "refs/tags/v1.1", "refs/tags/v1.2"] and unmatched == ["v3"]
+
+    # Chunks of two: two pushes, one result per ref, and the snapshot follows along.
+    _git(bare, "tag", "-d", "v1.1")  # gone behind our back; git still reports it deleted
+    results = gitio.delete_remote_refs("origin", refnames, chunk_size=2)
+    remotes.record_deletions("origin", results)
+    assert [(result.ref, result.ok, result.summary) for result in results] == [
+        ("refs/tags/v1.0", True, "deleted"),
+        ("refs/tags/v1.1", True, "deleted"),
+        ("refs/tags/v1.2", True, "deleted"),
+    ]
+    assert remotes.snapshot("origin").tags() == ["v2.0"]
+    assert sorted(gitio.ls_remote("origin")) == ["refs/heads/main", "refs/tags/v2.0"]
+
+    results = gitio.delete_remote_refs("nowhere", ["refs/tags/v2.0"])
+    assert not results[0].ok and results[0].summary
+    # A push that failed outright leaves the remote's state unknown.
+    remotes.record_deletions("origin", [gitio.RefUpdate("refs/tags/v2.0", False, results[0].summary)])
+    calls = []
+    monkeypatch.setattr(gitio, "ls_remote", lambda remote: calls.append(remote) or {})
+    assert remotes.snapshot("origin").refs == {} and calls == ["origin"]
@@ -0,0 +1,28 @@
+from typing import Literal, Optional, TypedDict
+
+from bettergit.llm.schema import extract_object, schema_for, subschema, validate
+
+
+class _Answer(TypedDict, total=False):
+    type: Literal["feat", "fix"]
+    summary: str
+    body: Optional[str]
+    breaking: bool
+
+
+def test_schema_from_typed_dict_and_validation():
+    schema = schema_for(_Answer, required=("type", "summary"), max_lengths={"summary": 10})
+
+    assert schema["properties"]["type"] == {"type": "string", "enum": ["feat", "fix"]}
+    assert schema["properties"]["body"] == {"type": ["string", "null"]}
+    problems = validate({"type": "feature", "summary": "x" * 11, "body": None, "breaking": "no"}, schema)
+    assert set(problems) == {"type", "summary", "breaking"}
+    assert subschema(schema, problems)["required"] == ["type", "summary", "breaking"]
+
+
+def test_extract_object_tolerates_chatter_commas_and_truncation():
+    assert extract_object('Sure:\n```json\n{"a": [1, 2,], "b": "}",}\n```') == {"a": [1, 2], "b": "}"}
+    assert extract_object('{"type": "fix", "breaking": false, "summary": "cut off, mid') == {
+        "type": "fix",
+        "breaking": False,
+    }
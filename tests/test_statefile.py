@@ -0,0 +1,23 @@
+from bettergit.core.statefile import FileStamp, load_json, save_json
+
+
+def test_round_trip_and_fallbacks(tmp_path):
+    path = tmp_path / "bettergit" / "state.json"
+    assert load_json(path) == {} and FileStamp.of(path) is None
+
+    assert save_json(path, {"a": [1, 2]})
+    assert load_json(path) == {"a": [1, 2]}
+    assert [item.name for item in path.parent.iterdir()] == ["state.json"]
+    stamp = FileStamp.of(path)
+    assert save_json(path, {"a": [1, 2, 3]})
+    assert FileStamp.of(path) != stamp
+
+    path.write_text("[1, 2]")
+    assert load_json(path) == {}
+    path.write_text("{broken")
+    assert load_json(path) == {}
+    assert load_json(None) == {} and not save_json(None, {})
+
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    assert not save_json(blocker / "state.json", {})